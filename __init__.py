@@ -1,7 +1,8 @@
 """Binance USDT-M Futures Trading Bot"""
 __version__ = "1.0.0"
 
+from .async_client import AsyncBinanceClient
 from .basic_bot import BasicBot
 from .binance_client import BinanceClient
 
-__all__ = ["BasicBot", "BinanceClient"]
+__all__ = ["AsyncBinanceClient", "BasicBot", "BinanceClient"]
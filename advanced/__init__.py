@@ -0,0 +1 @@
+"""Advanced order types built on top of BinanceClient (TWAP, OCO)."""
@@ -0,0 +1,353 @@
+"""
+OCO (one-cancels-other) orders.
+USDT-M futures has no native OCO, so a take-profit and a stop-loss are placed
+as two reduce-only orders and the manager cancels one as soon as the user
+data stream reports that the other one traded.
+"""
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, List, Optional
+
+# Handle both direct execution and module execution
+try:
+    from ..binance_client import BinanceClient
+    from ..logger import logger
+    from ..retry import UNKNOWN_ORDER, error_code
+    from ..user_stream import AccountMirror, UserDataStream
+    from ..validators import apply_symbol_filters, format_decimal, parse_oco_args, round_to_step
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from binance_client import BinanceClient
+    from logger import logger
+    from retry import UNKNOWN_ORDER, error_code
+    from user_stream import AccountMirror, UserDataStream
+    from validators import apply_symbol_filters, format_decimal, parse_oco_args, round_to_step
+
+
+# Client order IDs of OCO legs: oco-<pair id>-tp / oco-<pair id>-sl
+LEG_ID_PATTERN = re.compile(r"^oco-([0-9a-f]+)-(tp|sl)$")
+
+# Pairs this young may be missing from a snapshot just because it was taken before they were placed
+RECONCILE_GRACE_MS = 5000
+
+
+class OcoPair:
+    """A linked take-profit / stop-loss pair protecting one position."""
+
+    __slots__ = ("pair_id", "symbol", "side", "quantity", "take_profit", "stop_loss",
+                 "tp_order_id", "sl_order_id", "status", "closed_by", "created_at")
+
+    def __init__(self, symbol: str, side: str, quantity: Decimal, take_profit: Decimal, stop_loss: Decimal,
+                 pair_id: Optional[str] = None):
+        self.pair_id = pair_id or secrets.token_hex(8)
+        self.symbol = symbol
+        self.side = side  # Side of the position - the legs trade the other way
+        self.quantity = quantity
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+        self.tp_order_id: Optional[int] = None
+        self.sl_order_id: Optional[int] = None
+        self.status = "ACTIVE"  # -> TAKE_PROFIT / STOP_LOSS / CANCELED / FAILED
+        self.closed_by: Optional[str] = None
+        self.created_at = int(time.time() * 1000)
+
+    @property
+    def exit_side(self) -> str:
+        return "SELL" if self.side == "BUY" else "BUY"
+
+    @property
+    def tp_client_id(self) -> str:
+        return f"oco-{self.pair_id}-tp"
+
+    @property
+    def sl_client_id(self) -> str:
+        return f"oco-{self.pair_id}-sl"
+
+    def order_id(self, leg: str) -> Optional[int]:
+        return self.tp_order_id if leg == "tp" else self.sl_order_id
+
+    def client_id(self, leg: str) -> str:
+        return self.tp_client_id if leg == "tp" else self.sl_client_id
+
+
+class OcoManager:
+    """
+    Places OCO pairs and keeps them linked.
+
+    Pairs are indexed by both legs' exchange order IDs and client order IDs,
+    so each ORDER_TRADE_UPDATE is matched with one dict lookup, however many
+    pairs are open. When one leg trades (or disappears) the sibling's cancel
+    is handed to a thread pool straight away, so it goes out one round trip
+    after the event arrives without holding up the stream.
+
+    After every user stream resync the open orders are checked against the
+    known pairs, which also picks up pairs left over from an earlier run.
+    """
+
+    def __init__(self, client: BinanceClient, mirror: AccountMirror, max_workers: int = 4):
+        """
+        Args:
+            client: Client used to place and cancel the legs
+            mirror: Account mirror fed by a running UserDataStream
+            max_workers: Cancels that can be in flight at once
+        """
+        self.client = client
+        self.mirror = mirror
+        self.pairs: Dict[str, OcoPair] = {}
+        self._by_order_id: Dict[int, OcoPair] = {}
+        self._by_client_id: Dict[str, OcoPair] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="oco")
+        # Set whenever a pair closes, for callers waiting on one
+        self.changed = threading.Condition(self._lock)
+
+        mirror.add_listener(self._on_event)
+
+    def close(self) -> None:
+        """Stop reacting to events. Open legs stay on the exchange."""
+        self.mirror.remove_listener(self._on_event)
+        self._pool.shutdown(wait=True)
+
+    def place(self, symbol: str, side: str, quantity: Any, take_profit: Any, stop_loss: Any) -> OcoPair:
+        """
+        Protect a position with a take-profit and a stop-loss.
+
+        Both legs are reduce-only TAKE_PROFIT_MARKET / STOP_MARKET orders on
+        the exit side, sent together in one batch request.
+
+        Args:
+            symbol: Trading pair symbol
+            side: Side of the position (BUY for a long, SELL for a short)
+            quantity: Quantity to close
+            take_profit: Trigger price for the take-profit leg
+            stop_loss: Trigger price for the stop-loss leg
+
+        Returns:
+            The pair - status FAILED if either leg was rejected
+
+        Raises:
+            ValueError: If the prices are on the wrong side of each other or
+                        the order breaks an exchange filter
+        """
+        filters = self.client.get_symbol_filters(symbol)
+        take_profit = round_to_step(Decimal(take_profit), filters.tick_size, ROUND_HALF_UP)
+        stop_loss = round_to_step(Decimal(stop_loss), filters.tick_size, ROUND_HALF_UP)
+        if (take_profit <= stop_loss) if side == "BUY" else (take_profit >= stop_loss):
+            raise ValueError(f"Take-profit {format_decimal(take_profit)} is on the wrong side of "
+                             f"stop-loss {format_decimal(stop_loss)} for a {side} position")
+
+        exit_side = "SELL" if side == "BUY" else "BUY"
+        quantity, _ = apply_symbol_filters(filters, exit_side, "MARKET", quantity,
+                                           reference_price=min(take_profit, stop_loss))
+        pair = OcoPair(symbol, side, quantity, take_profit, stop_loss)
+
+        # Index by client ID first - a fill can be reported before the place call returns
+        with self._lock:
+            self.pairs[pair.pair_id] = pair
+            self._by_client_id[pair.tp_client_id] = pair
+            self._by_client_id[pair.sl_client_id] = pair
+
+        legs = [
+            {"symbol": symbol, "side": exit_side, "order_type": "TAKE_PROFIT_MARKET", "quantity": quantity,
+             "stopPrice": take_profit, "reduceOnly": "true", "newClientOrderId": pair.tp_client_id},
+            {"symbol": symbol, "side": exit_side, "order_type": "STOP_MARKET", "quantity": quantity,
+             "stopPrice": stop_loss, "reduceOnly": "true", "newClientOrderId": pair.sl_client_id},
+        ]
+        logger.info("Placing OCO %s: %s %s %s TP %s / SL %s", pair.pair_id, exit_side, format_decimal(quantity),
+                    symbol, format_decimal(take_profit), format_decimal(stop_loss))
+        tp_result, sl_result = self.client.place_orders(legs)
+
+        failed = [result for result in (tp_result, sl_result) if "orderId" not in result]
+        with self._lock:
+            pair.tp_order_id = tp_result.get("orderId")
+            pair.sl_order_id = sl_result.get("orderId")
+            for order_id in (pair.tp_order_id, pair.sl_order_id):
+                if order_id is not None:
+                    self._by_order_id[order_id] = pair
+
+        if failed:
+            logger.error("OCO %s leg rejected: %s", pair.pair_id, failed[0].get("msg"))
+            # A lone leg isn't an OCO - take the other one back off
+            for leg, result in (("tp", tp_result), ("sl", sl_result)):
+                if "orderId" in result:
+                    self._cancel_leg(pair, leg)
+            self._finish(pair, "FAILED", None)
+        return pair
+
+    def cancel(self, pair_id: str) -> None:
+        """Cancel both legs of a pair."""
+        pair = self.pairs.get(pair_id)
+        if pair is None or not self._finish(pair, "CANCELED", None):
+            return
+        for future in [self._pool.submit(self._cancel_leg, pair, leg) for leg in ("tp", "sl")]:
+            future.result()
+
+    def active_pairs(self) -> List[OcoPair]:
+        with self._lock:
+            return [pair for pair in self.pairs.values() if pair.status == "ACTIVE"]
+
+    def wait(self, pair: OcoPair, timeout: Optional[float] = None) -> bool:
+        """Block until the pair closes. Returns False on timeout."""
+        with self.changed:
+            return self.changed.wait_for(lambda: pair.status != "ACTIVE", timeout)
+
+    def _on_event(self, event: Dict[str, Any]) -> None:
+        if event.get("e") == "SNAPSHOT":
+            self.reconcile(self.mirror.get_open_orders())
+            return
+        if event.get("e") != "ORDER_TRADE_UPDATE":
+            return
+
+        data = event.get("o", {})
+        client_id = data.get("c", "")
+        with self._lock:
+            pair = self._by_order_id.get(data.get("i")) or self._by_client_id.get(client_id)
+        if pair is None or pair.status != "ACTIVE":
+            return
+
+        leg = "tp" if client_id == pair.tp_client_id or data.get("i") == pair.tp_order_id else "sl"
+        if data.get("x") == "TRADE" or data.get("X") in ("PARTIALLY_FILLED", "FILLED"):
+            self._close(pair, leg, "TAKE_PROFIT" if leg == "tp" else "STOP_LOSS")
+        elif data.get("X") in ("CANCELED", "EXPIRED", "REJECTED"):
+            # One leg went away on its own (e.g. cancelled by hand) - the other can't stay alone
+            self._close(pair, leg, "CANCELED")
+
+    def _close(self, pair: OcoPair, leg: str, status: str) -> None:
+        """One leg traded or vanished - cancel the other one right away."""
+        if not self._finish(pair, status, leg):
+            return
+        sibling = "sl" if leg == "tp" else "tp"
+        logger.info("OCO %s: %s leg %s - cancelling %s leg", pair.pair_id, leg, status.lower().replace("_", " "),
+                    sibling)
+        self._pool.submit(self._cancel_leg, pair, sibling)
+
+    def _finish(self, pair: OcoPair, status: str, leg: Optional[str]) -> bool:
+        """Mark a pair closed and drop it from the indexes. False if it already was."""
+        with self._lock:
+            if pair.status != "ACTIVE":
+                return False
+            pair.status = status
+            pair.closed_by = leg
+            for key in (pair.tp_order_id, pair.sl_order_id):
+                self._by_order_id.pop(key, None)
+            self._by_client_id.pop(pair.tp_client_id, None)
+            self._by_client_id.pop(pair.sl_client_id, None)
+            self.changed.notify_all()
+        return True
+
+    def _cancel_leg(self, pair: OcoPair, leg: str) -> None:
+        try:
+            self.client.cancel_order(pair.symbol, order_id=pair.order_id(leg), orig_client_order_id=pair.client_id(leg))
+        except Exception as e:
+            if error_code(e) == UNKNOWN_ORDER:
+                return  # Already gone - filled at the same time, or cancelled elsewhere
+            logger.error("OCO %s: cancelling %s leg failed: %s", pair.pair_id, leg, e)
+
+    def reconcile(self, open_orders: List[Dict[str, Any]]) -> None:
+        """
+        Line the pairs up with the exchange's open orders.
+
+        Called after every snapshot, when events may have been missed. A
+        known pair with a leg missing gets the other leg cancelled. Legs
+        from an earlier run are adopted, or cancelled if their sibling is gone.
+        """
+        legs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for order in open_orders:
+            match = LEG_ID_PATTERN.match(order.get("clientOrderId") or "")
+            if match:
+                legs.setdefault(match.group(1), {})[match.group(2)] = order
+
+        cutoff = int(time.time() * 1000) - RECONCILE_GRACE_MS
+        for pair in self.active_pairs():
+            if pair.created_at > cutoff or pair.tp_order_id is None or pair.sl_order_id is None:
+                continue
+            found = legs.get(pair.pair_id, {})
+            if len(found) == 2:
+                continue
+            # We can't tell from here whether the missing leg filled or was cancelled
+            missing = "tp" if "tp" not in found else "sl"
+            if not found:
+                self._finish(pair, "CANCELED", missing)
+            else:
+                self._close(pair, missing, "CANCELED")
+
+        for pair_id, found in legs.items():
+            if pair_id in self.pairs:
+                continue
+            if len(found) == 2:
+                self._adopt(pair_id, found["tp"], found["sl"])
+            else:
+                orphan = next(iter(found.values()))
+                logger.warning("Cancelling orphaned OCO leg %s", orphan["clientOrderId"])
+                self._pool.submit(self.client.cancel_order, orphan["symbol"], orphan["orderId"])
+
+    def _adopt(self, pair_id: str, tp: Dict[str, Any], sl: Dict[str, Any]) -> None:
+        side = "BUY" if tp["side"] == "SELL" else "SELL"
+        pair = OcoPair(tp["symbol"], side, Decimal(tp["origQty"]), Decimal(tp["stopPrice"]),
+                       Decimal(sl["stopPrice"]), pair_id=pair_id)
+        pair.tp_order_id, pair.sl_order_id = tp["orderId"], sl["orderId"]
+        pair.created_at = 0
+        with self._lock:
+            self.pairs[pair_id] = pair
+            self._by_order_id[pair.tp_order_id] = pair
+            self._by_order_id[pair.sl_order_id] = pair
+            self._by_client_id[pair.tp_client_id] = pair
+            self._by_client_id[pair.sl_client_id] = pair
+        logger.info("Adopted OCO %s from open orders", pair_id)
+
+
+def main():
+    """Entry point when running as a script."""
+    try:
+        symbol, side, quantity, take_profit, stop_loss = parse_oco_args(sys.argv[1:])
+    except ValueError as e:
+        print(f"\n{e}\n")
+        sys.exit(1)
+
+    try:
+        client = BinanceClient()
+        stream = UserDataStream(client)
+        # Stream first, so a leg that triggers straight away is still seen
+        if not stream.start():
+            logger.warning("User data stream not synced yet - fills will be picked up once it is")
+        manager = OcoManager(client, stream.mirror)
+        pair = manager.place(symbol, side, quantity, take_profit, stop_loss)
+    except ValueError as e:
+        logger.error("Invalid input: %s", e)
+        print(f"\nError: {e}\n")
+        sys.exit(1)
+    except Exception as e:
+        logger.error("OCO failed: %s", e)
+        logger.error(traceback.format_exc())
+        print(f"\nSomething went wrong while placing the OCO - check logs for details\n")
+        sys.exit(1)
+
+    if pair.status == "FAILED":
+        print(f"\nOCO rejected by the exchange - check logs for details\n")
+        stream.stop()
+        sys.exit(1)
+
+    print(f"\nOCO placed on {'testnet' if client.testnet else 'production'}")
+    print(f"  Take profit: {format_decimal(pair.take_profit)} (order {pair.tp_order_id})")
+    print(f"  Stop loss:   {format_decimal(pair.stop_loss)} (order {pair.sl_order_id})")
+    print(f"  Watching for fills - Ctrl+C stops watching (both orders stay open)\n")
+
+    try:
+        manager.wait(pair)
+        print(f"OCO closed: {pair.status.lower().replace('_', ' ')}\n")
+    except KeyboardInterrupt:
+        print(f"\nStopped watching - cancel the other leg by hand if one fills\n")
+    finally:
+        manager.close()
+        stream.stop()
+
+
+if __name__ == "__main__":
+    main()
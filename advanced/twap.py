@@ -0,0 +1,339 @@
+"""
+TWAP (time-weighted average price) execution.
+Splits a parent order into child market orders sent at fixed intervals, so a
+big trade is spread out over time instead of hitting the book all at once.
+"""
+import asyncio
+import os
+import secrets
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import requests
+
+# Handle both direct execution and module execution
+try:
+    from ..binance_client import BinanceClient
+    from ..logger import logger
+    from ..retry import ORDER_DOES_NOT_EXIST, error_code, is_ambiguous
+    from ..validators import format_decimal, parse_twap_args
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from binance_client import BinanceClient
+    from logger import logger
+    from retry import ORDER_DOES_NOT_EXIST, error_code, is_ambiguous
+    from validators import format_decimal, parse_twap_args
+
+# A child order in one of these can still fill, so its unfilled part isn't carried
+OPEN_STATUSES = ("NEW", "PARTIALLY_FILLED")
+
+
+def is_rejected(e: Exception) -> bool:
+    """
+    True if an order definitely never became an order - refused locally
+    (validation, risk) or answered with a 4xx and a Binance error code.
+    Anything else (timeouts, 5xx) may have been executed.
+    """
+    if isinstance(e, ValueError) or isinstance(e, requests.exceptions.ConnectTimeout):
+        return True
+    response = getattr(e, "response", None)
+    if response is None or not 400 <= response.status_code < 500:
+        return False
+    return error_code(e) is not None and not is_ambiguous(e)
+
+
+def split_quantity(quantity: Decimal, slices: int, step: Decimal, min_qty: Decimal) -> List[Decimal]:
+    """
+    Split quantity into slices that are whole multiples of step.
+
+    Slices differ by at most one step, bigger ones first. Anything below one
+    step can't be traded and is dropped.
+
+    Raises:
+        ValueError: If the smallest slice would be below min_qty
+    """
+    steps = int(quantity / step)
+    base, extra = divmod(steps, slices)
+    sizes = [step * (base + 1 if i < extra else base) for i in range(slices)]
+    if sizes[-1] < min_qty:
+        raise ValueError(
+            f"{format_decimal(quantity)} split {slices} ways gives slices of {format_decimal(sizes[-1])}, "
+            f"below the minimum of {format_decimal(min_qty)} - use fewer slices"
+        )
+    return sizes
+
+
+class TwapOrder:
+    """State of one parent TWAP order - its slices, fills and what's left."""
+
+    def __init__(self, symbol: str, side: str, quantity: Decimal, slices: int, interval: float,
+                 reduce_only: bool = False, parent_id: Optional[str] = None):
+        self.parent_id = parent_id or secrets.token_hex(8)
+        self.symbol = symbol
+        self.side = side
+        self.quantity = quantity
+        self.slices = slices
+        self.interval = interval
+        self.reduce_only = reduce_only
+
+        self.status = "PENDING"  # -> RUNNING -> DONE / PARTIAL / CANCELED / FAILED
+        self.slice_quantities: List[Decimal] = []
+        self.filled_qty = Decimal("0")
+        self.filled_notional = Decimal("0")
+        # Quantity earlier slices failed to fill, added to the next slice
+        self.carry = Decimal("0")
+        self.children: List[Dict[str, Any]] = []
+        self.errors: List[str] = []
+        # How late each slice fired compared to its schedule
+        self.jitter_ms: List[float] = []
+
+    @property
+    def remaining(self) -> Decimal:
+        return self.quantity - self.filled_qty
+
+    @property
+    def avg_price(self) -> Optional[Decimal]:
+        if not self.filled_qty:
+            return None
+        return self.filled_notional / self.filled_qty
+
+    def client_order_id(self, index: int) -> str:
+        """Child order ID - stable per slice, so a retried slice can't fill twice."""
+        return f"twap-{self.parent_id}-{index}"
+
+    def record_fill(self, response: Dict[str, Any]) -> Decimal:
+        """Add a child order response to the totals. Returns the filled quantity."""
+        self.children.append(response)
+        filled = Decimal(response.get("executedQty") or "0")
+        if filled:
+            self.filled_qty += filled
+            self.filled_notional += filled * Decimal(response.get("avgPrice") or "0")
+        return filled
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "parent_id": self.parent_id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "status": self.status,
+            "quantity": format_decimal(self.quantity),
+            "filled": format_decimal(self.filled_qty),
+            "remaining": format_decimal(self.remaining),
+            "avg_price": format_decimal(self.avg_price) if self.avg_price is not None else None,
+            "child_orders": len(self.children),
+            "errors": len(self.errors),
+            "max_jitter_ms": max(self.jitter_ms) if self.jitter_ms else None,
+        }
+
+
+class TwapExecutor:
+    """
+    Runs any number of TWAP orders on one asyncio event loop.
+
+    Each parent order is a task that sleeps until its next slice is due.
+    Slice times are fixed offsets from the start, so a slow order never
+    pushes the rest of the schedule back. The actual sends go through a small
+    shared thread pool running BinanceClient.place_order, so children get the
+    usual rate limiting and idempotent retries.
+
+    Whatever a slice fails to fill is added to the next slice that goes out
+    after it finished - but only when the exchange definitely didn't take
+    it. A slice that failed in a way that leaves it unclear is looked up by
+    its client order ID first, and if that doesn't settle it the quantity
+    is dropped rather than risking a double fill.
+    """
+
+    def __init__(self, client: Optional[BinanceClient] = None, max_workers: int = 8):
+        """
+        Args:
+            client: Client used to place child orders
+            max_workers: Child orders that can be in flight at once, across all TWAPs
+        """
+        self.client = client or BinanceClient()
+        self.orders: Dict[str, TwapOrder] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="twap")
+
+    def submit(self, symbol: str, side: str, quantity: Decimal, slices: int, interval: float,
+               reduce_only: bool = False) -> TwapOrder:
+        """
+        Start a TWAP on the running event loop and return its state right away.
+
+        Args:
+            symbol: Trading pair symbol
+            side: BUY or SELL
+            quantity: Total quantity
+            slices: Number of child orders
+            interval: Seconds between child orders
+            reduce_only: Only ever reduce the position
+        """
+        order = TwapOrder(symbol, side, Decimal(quantity), slices, interval, reduce_only)
+        self.orders[order.parent_id] = order
+        self._tasks[order.parent_id] = asyncio.ensure_future(self.execute(order))
+        return order
+
+    def cancel(self, parent_id: str) -> None:
+        """Stop sending slices for a TWAP. A slice already in flight still counts."""
+        task = self._tasks.get(parent_id)
+        if task is not None:
+            task.cancel()
+        # A task cancelled before it first ran never gets to say so itself
+        order = self.orders.get(parent_id)
+        if order is not None and order.status == "PENDING":
+            order.status = "CANCELED"
+
+    async def wait(self) -> List[TwapOrder]:
+        """Wait for every submitted TWAP to finish."""
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        return list(self.orders.values())
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    async def execute(self, order: TwapOrder) -> TwapOrder:
+        """Run one TWAP to completion."""
+        loop = asyncio.get_running_loop()
+        try:
+            filters = await loop.run_in_executor(self._pool, self.client.get_symbol_filters, order.symbol)
+            order.slice_quantities = split_quantity(order.quantity, order.slices,
+                                                    filters.market_step_size, filters.market_min_qty)
+        except asyncio.CancelledError:
+            order.status = "CANCELED"
+            logger.info("TWAP %s cancelled before it started", order.parent_id)
+            return order
+        except Exception as e:
+            order.status = "FAILED"
+            order.errors.append(str(e))
+            logger.error("TWAP %s not started: %s", order.parent_id, e)
+            return order
+
+        tradable = sum(order.slice_quantities)
+        if tradable < order.quantity:
+            logger.warning("TWAP %s: %s rounded down to %s to fit the step size",
+                           order.parent_id, format_decimal(order.quantity), format_decimal(tradable))
+            order.quantity = tradable
+
+        order.status = "RUNNING"
+        logger.info("TWAP %s started: %s %s %s in %d slices every %ss", order.parent_id, order.side,
+                    format_decimal(order.quantity), order.symbol, len(order.slice_quantities), order.interval)
+
+        start = loop.time()
+        in_flight: List[asyncio.Future] = []
+        try:
+            for index, slice_qty in enumerate(order.slice_quantities):
+                due = start + index * order.interval
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                order.jitter_ms.append((loop.time() - due) * 1000)
+
+                # Slices don't wait for each other, so a slow send never delays the schedule
+                qty, order.carry = slice_qty + order.carry, Decimal("0")
+                future = loop.run_in_executor(self._pool, self._send_slice, order, index, qty)
+                future.add_done_callback(lambda f, qty=qty: self._slice_done(order, qty, f))
+                in_flight.append(future)
+            await asyncio.shield(asyncio.gather(*in_flight))
+        except asyncio.CancelledError:
+            # Slices that already left still count
+            await asyncio.gather(*in_flight)
+            order.status = "CANCELED"
+            logger.info("TWAP %s cancelled - filled %s", order.parent_id, format_decimal(order.filled_qty))
+            return order
+
+        order.status = "DONE" if order.remaining <= 0 else "PARTIAL"
+        avg_price = format_decimal(order.avg_price) if order.avg_price is not None else "N/A"
+        logger.info("TWAP %s %s - filled %s of %s @ %s", order.parent_id, order.status.lower(),
+                    format_decimal(order.filled_qty), format_decimal(order.quantity), avg_price)
+        return order
+
+    def _send_slice(self, order: TwapOrder, index: int, qty: Decimal) -> Dict[str, Any]:
+        """
+        Place one child order (runs on the thread pool).
+
+        Returns the order, or {"error", "unsent"} where unsent says whether
+        the quantity is known to be free to send again.
+        """
+        client_order_id = order.client_order_id(index)
+        kwargs = {"newClientOrderId": client_order_id, "newOrderRespType": "RESULT"}
+        if order.reduce_only:
+            kwargs["reduceOnly"] = "true"
+        try:
+            return self.client.place_order(order.symbol, order.side, "MARKET", qty, **kwargs)
+        except Exception as e:
+            logger.error("TWAP %s slice %d failed: %s", order.parent_id, index, e)
+            if is_rejected(e):
+                return {"error": f"slice {index}: {e}", "unsent": True}
+            failure = e
+
+        # The slice may have been executed anyway - ask before sending the quantity again
+        try:
+            return self.client.get_order(order.symbol, orig_client_order_id=client_order_id)
+        except requests.exceptions.HTTPError as e:
+            if error_code(e) == ORDER_DOES_NOT_EXIST:
+                return {"error": f"slice {index}: {failure}", "unsent": True}
+            lookup_error = e
+        except Exception as e:
+            lookup_error = e
+        logger.error("TWAP %s slice %d: can't tell whether %s was executed (%s) - not sending it again",
+                     order.parent_id, index, client_order_id, lookup_error)
+        return {"error": f"slice {index}: {failure}", "unsent": False}
+
+    def _slice_done(self, order: TwapOrder, qty: Decimal, future: asyncio.Future) -> None:
+        """Book a finished slice (on the event loop, so order state has one writer)."""
+        response = future.result()
+        if "error" in response:
+            order.errors.append(response["error"])
+            if response["unsent"]:
+                order.carry += qty
+            return
+        filled = order.record_fill(response)
+        if response.get("status") not in OPEN_STATUSES:
+            order.carry += qty - filled
+
+
+async def run_twap(symbol: str, side: str, quantity: Decimal, slices: int, interval: float) -> TwapOrder:
+    executor = TwapExecutor()
+    try:
+        order = executor.submit(symbol, side, quantity, slices, interval)
+        await executor.wait()
+        return order
+    finally:
+        executor.close()
+
+
+def main():
+    """Entry point when running as a script."""
+    try:
+        symbol, side, quantity, slices, interval = parse_twap_args(sys.argv[1:])
+    except ValueError as e:
+        print(f"\n{e}\n")
+        sys.exit(1)
+
+    try:
+        started = time.monotonic()
+        order = asyncio.run(run_twap(symbol, side, quantity, slices, interval))
+    except Exception as e:
+        logger.error("TWAP failed: %s", e)
+        logger.error(traceback.format_exc())
+        print(f"\nSomething went wrong while running the TWAP - check logs for details\n")
+        sys.exit(1)
+
+    if order.status == "FAILED":
+        print(f"\nError: {order.errors[0]}\n")
+        sys.exit(1)
+
+    summary = order.summary()
+    print(f"\nTWAP {summary['status'].lower()} after {time.monotonic() - started:.1f}s")
+    print(f"  {side} {summary['filled']} of {summary['quantity']} {symbol}")
+    print(f"  Child orders: {summary['child_orders']} ({summary['errors']} failed)")
+    print(f"  Average Price: {summary['avg_price'] or 'N/A'}\n")
+    if order.remaining > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
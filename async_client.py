@@ -0,0 +1,428 @@
+"""
+Asyncio version of the Binance Futures client.
+Same methods as BinanceClient, but every call is a coroutine so several
+requests can be in flight at once over a shared keep-alive connection pool.
+"""
+import asyncio
+import json
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import aiohttp
+from yarl import URL
+
+# Handle both direct execution and module execution
+try:
+    from .binance_client import (batch_error, build_order_params, encode_batch_orders, prepare_order_batches,
+                                 resolve_credentials, sign_params)
+    from .rate_limiter import RateLimiter, request_cost, request_priority
+    from .retry import (ORDER_DOES_NOT_EXIST, TRANSIENT_ERROR_CODES, UNKNOWN_STATUS_ERROR_CODES, RetryPolicy,
+                        make_client_order_id)
+    from .config import config
+    from .journal import open_journal
+    from .logger import logger
+    from .metrics import metrics
+except ImportError:
+    from binance_client import (batch_error, build_order_params, encode_batch_orders, prepare_order_batches,
+                                resolve_credentials, sign_params)
+    from rate_limiter import RateLimiter, request_cost, request_priority
+    from retry import (ORDER_DOES_NOT_EXIST, TRANSIENT_ERROR_CODES, UNKNOWN_STATUS_ERROR_CODES, RetryPolicy,
+                       make_client_order_id)
+    from config import config
+    from journal import open_journal
+    from logger import logger
+    from metrics import metrics
+
+
+def _error_body(body: str) -> Dict[str, Any]:
+    """Binance error JSON, or a generic error when the body isn't JSON (e.g. a proxy page)."""
+    try:
+        return json.loads(body)
+    except ValueError:
+        return {"code": -1000, "msg": body}
+
+
+def _error_code(e: Exception) -> Optional[int]:
+    """Binance error code of a failed request (_request keeps the body as the message)."""
+    if not isinstance(e, aiohttp.ClientResponseError):
+        return None
+    code = _error_body(e.message).get("code")
+    return code if isinstance(code, int) else None
+
+
+def _is_transient(e: Exception) -> bool:
+    """Same rules as retry.is_transient, for aiohttp errors."""
+    if isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+        return True
+    if not isinstance(e, aiohttp.ClientResponseError):
+        return False
+    return e.status == 429 or e.status >= 500 or _error_code(e) in TRANSIENT_ERROR_CODES
+
+
+def _is_ambiguous(e: Exception) -> bool:
+    """Same rules as retry.is_ambiguous: the request may have reached the exchange."""
+    # Never connected, so the request never left
+    if isinstance(e, aiohttp.ClientConnectorError):
+        return False
+    if isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+        return True
+    if not isinstance(e, aiohttp.ClientResponseError):
+        return False
+    return e.status >= 500 or _error_code(e) in UNKNOWN_STATUS_ERROR_CODES
+
+
+class AsyncBinanceClient:
+    """
+    Async wrapper around Binance Futures API.
+
+    Calls can be fanned out with asyncio.gather, e.g.
+
+        account, positions = await asyncio.gather(
+            client.get_account_info(), client.get_position_info()
+        )
+
+    The aiohttp session is created lazily on the first request, so the client
+    can be built outside of a running event loop. Call close() when done
+    (or use it as an async context manager).
+    """
+
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 testnet: Optional[bool] = None, pool_size: int = 20, keepalive_timeout: float = 60.0,
+                 base_url: Optional[str] = None):
+        # Allow explicit credentials or fall back to env vars
+        self.api_key, self.api_secret, self.testnet, self.base_url = resolve_credentials(
+            api_key, api_secret, testnet, base_url
+        )
+
+        # Max number of sockets open to the exchange at once - requests
+        # beyond this wait for a free connection instead of opening new ones
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.recv_window = config.recv_window
+        # Set this to a shared TimeSync (e.g. BinanceClient.time_sync) to
+        # timestamp signed requests with the server clock estimate
+        self.time_sync = None
+        # Set this to BinanceClient.rate_limiter when both clients share an
+        # IP and account, so their requests count against one budget
+        self.rate_limiter = RateLimiter()
+        self.retry_policy = RetryPolicy()
+        # Shared with BinanceClient - see journal.py and metrics.py
+        self.journal = open_journal()
+        self.metrics = metrics
+        # Set this to a shared OrderTracker (e.g. BinanceClient.orders) to
+        # track orders placed from here too
+        self.orders = None
+        # Likewise a shared RiskEngine (BinanceClient.risk) to check orders
+        # placed from here against the same limits
+        self.risk = None
+
+        logger.info("Async client for %s - %s", "testnet" if self.testnet else "production", self.base_url)
+
+    async def __aenter__(self) -> "AsyncBinanceClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the pooled session on first use (must happen inside the loop)."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=config.dns_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"X-MBX-APIKEY": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=10),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the underlying connection pool."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                       signed: bool = False, retry: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Internal method to make API calls.
+        Handles signing for authenticated endpoints.
+
+        Works like BinanceClient._request: the rate limiter is charged
+        before sending and corrected from the response headers, a -1021
+        re-syncs the clock (when time_sync is set) and resends once, and
+        transient failures of GET and DELETE are retried with backoff.
+        """
+        params = params or {}
+        if retry is None:
+            retry = method in ("GET", "DELETE")
+        max_attempts = self.retry_policy.max_attempts if retry else 1
+
+        attempt = 0
+        clock_resynced = False
+        while True:
+            try:
+                return await self._send(method, endpoint, params, signed)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if signed and not clock_resynced and self.time_sync is not None and _error_code(e) == -1021:
+                    logger.warning("Timestamp outside recvWindow - re-syncing clock and retrying")
+                    await asyncio.get_running_loop().run_in_executor(None, self.time_sync.sync)
+                    clock_resynced = True
+                    continue
+                attempt += 1
+                if attempt >= max_attempts or not _is_transient(e):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                logger.warning("Retrying %s in %.2fs (attempt %d/%d)", endpoint, delay, attempt + 1, max_attempts)
+                await asyncio.sleep(delay)
+
+    async def _send(self, method: str, endpoint: str, params: Dict[str, Any], signed: bool) -> Dict[str, Any]:
+        """Sign (if needed) and send one request."""
+        url = f"{self.base_url}{endpoint}"
+        timer = self.metrics.timer(endpoint)
+        costs = request_cost(method, endpoint, params)
+        priority = request_priority(method, endpoint, params)
+        # Only wait on a thread when the budget is short - acquire() blocks
+        if not self.rate_limiter.try_acquire(*costs, priority=priority):
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: self.rate_limiter.acquire(*costs, priority=priority))
+        timer.mark("rate_limit")
+
+        if signed:
+            params.pop("signature", None)
+            params.setdefault("recvWindow", self.recv_window)
+            params["timestamp"] = self.time_sync.now_ms() if self.time_sync else int(time.time() * 1000)
+            params["signature"] = sign_params(self.api_secret, params)
+
+        # Encode ourselves so the query string matches what was signed
+        query_string = urlencode(params)
+        if query_string:
+            url = f"{url}?{query_string}"
+        timer.mark("sign")
+
+        session = self._get_session()
+        started = time.perf_counter()
+        try:
+            # encoded=True stops yarl from re-quoting it (e.g. %3A back to :) after signing
+            async with session.request(method, URL(url, encoded=True)) as response:
+                timer.mark("first_byte")
+                self.rate_limiter.update_from_headers(response.headers)
+                if response.status in (418, 429):
+                    self.rate_limiter.on_rate_limited(response.status, response.headers.get("Retry-After"))
+                body = await response.text()
+                timer.mark("body")
+                data = json.loads(body) if response.status < 400 else _error_body(body)
+                timer.mark("decode")
+                if self.journal is not None:
+                    self.journal.record_request(method, endpoint, params, data,
+                                                int((time.perf_counter() - started) * 1e6), response.status)
+                    timer.mark("journal")
+                # 5xx and 429 may still have landed (or will be resent) - leave those to reconciliation
+                if self.orders is not None and response.status < 500 and response.status != 429:
+                    self.orders.record_response(method, endpoint, params, data, started)
+                if response.status >= 400:
+                    # Log the actual error from Binance before raising
+                    logger.error("Request to %s failed: HTTP %s", endpoint, response.status)
+                    logger.error("Binance error: %s", body)
+                    # Keep the body as the message so callers can read the Binance error code
+                    raise aiohttp.ClientResponseError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message=body,
+                        headers=response.headers,
+                    )
+                timer.done()
+                return data
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if self.journal is not None:
+                self.journal.record_request(method, endpoint, params, batch_error(e),
+                                            int((time.perf_counter() - started) * 1e6), 0)
+            if self.orders is not None:
+                self.orders.record_error(method, endpoint, params, e)
+            logger.error("Request to %s failed: %r", endpoint, e)
+            raise
+
+    async def get_exchange_info(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get exchange trading rules and symbol information.
+
+        Args:
+            symbol: Optional symbol to filter
+
+        Returns:
+            Exchange information
+        """
+        params = {}
+        if symbol:
+            params["symbol"] = symbol
+        return await self._request("GET", "/fapi/v1/exchangeInfo", params=params)
+
+    async def place_order(self, symbol: str, side: str, order_type: str, quantity: float,
+                          price: Optional[float] = None, time_in_force: str = "GTC", **kwargs) -> Dict[str, Any]:
+        """
+        Place an order on Binance Futures.
+        Takes the same arguments as BinanceClient.place_order.
+        """
+        params = await self._off_loop(self._admit_order, symbol, side, order_type, quantity, price,
+                                      time_in_force, kwargs)
+        quantity = params["quantity"]
+
+        logger.info("Placing %s order: %s %s %s%s", order_type, symbol, side, quantity, f" @ {price}" if price else "")
+        response = await self._place_with_retry(params)
+        logger.info("Order placed - ID: %s", response.get("orderId"))
+        return response
+
+    async def _place_with_retry(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a new order, retrying without ever placing it twice (see BinanceClient._place_with_retry)."""
+        symbol, client_order_id = params["symbol"], params["newClientOrderId"]
+        max_attempts = self.retry_policy.max_attempts
+
+        attempt = 0
+        while True:
+            try:
+                return await self._request("POST", "/fapi/v1/order", params=dict(params), signed=True, retry=False)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                attempt += 1
+                if attempt >= max_attempts or not _is_transient(e):
+                    logger.error("Giving up on order %s", client_order_id)
+                    raise
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+                if _is_ambiguous(e):
+                    # The order may have landed - resending blindly could double-fill
+                    existing = await self._lookup_order(symbol, client_order_id)
+                    if existing is not None:
+                        logger.info("Order %s reached the exchange - not resending", client_order_id)
+                        return existing
+                logger.warning("Resending order %s (attempt %d/%d)", client_order_id, attempt + 1, max_attempts)
+                if self.orders is not None:
+                    self.orders.submitted(params)
+
+    async def _lookup_order(self, symbol: str, client_order_id: str) -> Optional[Dict[str, Any]]:
+        """Find an order by client ID, or None if the exchange never got it."""
+        try:
+            return await self.get_order(symbol, orig_client_order_id=client_order_id)
+        except aiohttp.ClientResponseError as e:
+            if _error_code(e) == ORDER_DOES_NOT_EXIST:
+                return None
+            raise
+
+    async def get_order(self, symbol: str, order_id: Optional[int] = None,
+                        orig_client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the status of an order.
+        Takes the same arguments as BinanceClient.get_order.
+        """
+        if order_id is None and orig_client_order_id is None:
+            raise ValueError("Either order_id or orig_client_order_id is required")
+        params: Dict[str, Any] = {"symbol": symbol}
+        if order_id is not None:
+            params["orderId"] = order_id
+        if orig_client_order_id is not None:
+            params["origClientOrderId"] = orig_client_order_id
+        return await self._request("GET", "/fapi/v1/order", params=params, signed=True)
+
+    def _next_client_order_id(self, params: Dict[str, Any]) -> str:
+        return make_client_order_id(params)
+
+    async def _off_loop(self, func, *args):
+        """
+        Run the risk check and order bookkeeping. With a RiskEngine set this
+        happens on a worker thread: the risk lock may be held by a
+        BinanceClient thread, and a first check can fetch positions or a
+        price over REST - neither should stall the event loop.
+        """
+        if self.risk is None or not self.risk.limits.enabled:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _admit_order(self, symbol: str, side: str, order_type: str, quantity: Any, price: Any,
+                     time_in_force: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Risk check one order and record it as submitted. Returns its params."""
+        with self.risk.lock if self.risk is not None else nullcontext():
+            if self.risk is not None:
+                quantity = self.risk.check(symbol, side, quantity, price, clip=False,
+                                           reduce_only=str(kwargs.get("reduceOnly", "")).lower() == "true")
+            params = build_order_params(symbol, side, order_type, quantity, price, time_in_force, **kwargs)
+            params.setdefault("newClientOrderId", self._next_client_order_id(params))
+            if self.orders is not None:
+                self.orders.submitted(params)
+        return params
+
+    def _admit_batch(self, orders: List[Dict[str, Any]]) -> Tuple[List[Any], List[Any]]:
+        """Risk check a batch and record the orders that passed. Returns (results, chunks)."""
+        risk_errors: Dict[int, str] = {}
+        with self.risk.lock if self.risk is not None else nullcontext():
+            if self.risk is not None:
+                orders = list(orders)
+                for index, order in enumerate(orders):
+                    try:
+                        self.risk.check(order["symbol"], order["side"], order["quantity"], order.get("price"),
+                                        clip=False, reduce_only=str(order.get("reduceOnly", "")).lower() == "true")
+                    except KeyError:
+                        continue
+                    except ValueError as e:
+                        risk_errors[index] = str(e)
+                        orders[index] = None
+            results, chunks = prepare_order_batches(orders, client_order_id=self._next_client_order_id)
+            if self.orders is not None:
+                for _, chunk in chunks:
+                    for params in chunk:
+                        self.orders.submitted(params)
+        for index, message in risk_errors.items():
+            results[index] = {"code": -2010, "msg": message}
+        return results, chunks
+
+    async def place_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Place several orders through /fapi/v1/batchOrders.
+        Same behaviour as BinanceClient.place_orders, with all chunks
+        sent concurrently on the event loop.
+        """
+        results, chunks = await self._off_loop(self._admit_batch, orders)
+
+        async def send(indices: List[int], chunk: List[Dict[str, str]]) -> None:
+            try:
+                chunk_results = await self._request("POST", "/fapi/v1/batchOrders",
+                                                    params={"batchOrders": encode_batch_orders(chunk)}, signed=True)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                chunk_results = [batch_error(e)] * len(indices)
+            for index, result in zip(indices, chunk_results):
+                results[index] = result
+
+        logger.info("Placing %d orders in %d batch(es)", len(orders), len(chunks))
+        await asyncio.gather(*(send(indices, chunk) for indices, chunk in chunks))
+
+        failed = sum(1 for result in results if "code" in result)
+        logger.info("Batch done - %d placed, %d failed", len(orders) - failed, failed)
+        return results
+
+    async def get_account_info(self) -> Dict[str, Any]:
+        """
+        Get account information.
+
+        Returns:
+            Account information
+        """
+        return await self._request("GET", "/fapi/v2/account", signed=True)
+
+    async def get_position_info(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get position information.
+
+        Args:
+            symbol: Optional symbol to filter
+
+        Returns:
+            Position information
+        """
+        params = {}
+        if symbol:
+            params["symbol"] = symbol
+        return await self._request("GET", "/fapi/v2/positionRisk", params=params, signed=True)
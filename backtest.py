@@ -0,0 +1,463 @@
+"""
+Backtesting against historical klines.
+BacktestBot has the same order methods as BasicBot, so a strategy written
+against BasicBot runs unchanged on history. Fills, fees and PnL are worked
+out with NumPy over whole arrays, not bar by bar in Python.
+"""
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+
+class Bars(NamedTuple):
+    """One symbol's klines as columns. open_time is in ms, everything else float64."""
+    open_time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+    @classmethod
+    def from_klines(cls, rows: Sequence[Sequence[Any]]) -> "Bars":
+        """Build from /fapi/v1/klines rows ([open_time, open, high, low, close, volume, ...])."""
+        table = np.array([row[:6] for row in rows], dtype=np.float64).reshape(-1, 6)
+        return cls(table[:, 0].astype(np.int64), *(np.ascontiguousarray(table[:, i]) for i in range(1, 6)))
+
+    @classmethod
+    def from_csv(cls, path: str) -> "Bars":
+        """Load a CSV with open_time,open,high,low,close,volume columns (header line optional)."""
+        with open(path, "r", encoding="utf-8") as f:
+            first = f.readline()
+        skip = 0 if first[:1].isdigit() else 1
+        table = np.loadtxt(path, delimiter=",", skiprows=skip, usecols=range(6), ndmin=2)
+        return cls(table[:, 0].astype(np.int64), *(np.ascontiguousarray(table[:, i]) for i in range(1, 6)))
+
+
+def _build_min_levels(values: np.ndarray) -> List[np.ndarray]:
+    """levels[k][b] = min(values[b * 2**k:(b + 1) * 2**k]), padded with +inf to a power of two."""
+    size = 1 << max(1, (len(values) - 1).bit_length())
+    base = np.full(size, np.inf)
+    base[:len(values)] = values
+    levels = [base]
+    while len(levels[-1]) > 1:
+        prev = levels[-1]
+        levels.append(np.minimum(prev[0::2], prev[1::2]))
+    return levels
+
+
+def first_at_or_below(levels: List[np.ndarray], start: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+    """
+    For every (start, threshold) pair, the first index j >= start where
+    values[j] <= threshold, or -1 if there is none.
+
+    Climbs the block minima from start until a block holds a hit, then walks
+    back down into it - O(log n) NumPy passes over all queries at once.
+    """
+    top = len(levels) - 1
+    size = len(levels[0])
+    pos = start.astype(np.int64)
+    found_level = np.full(len(pos), -1, dtype=np.int64)
+    climbing = pos < size
+
+    for k in range(top):
+        idx = np.flatnonzero(climbing)
+        if not len(idx):
+            break
+        block = pos[idx] >> k
+        # An even block is covered by its parent one level up, so only odd ones are checked here
+        odd = (block & 1) == 1
+        hit = odd & (levels[k][block] <= threshold[idx])
+        found_level[idx[hit]] = k
+        skip = idx[odd & ~hit]
+        pos[skip] += 1 << k
+        climbing[idx[hit]] = False
+        climbing &= pos < size
+
+    idx = np.flatnonzero(climbing)
+    hit = levels[top][pos[idx] >> top] <= threshold[idx]
+    found_level[idx[hit]] = top
+
+    for k in range(top - 1, -1, -1):
+        idx = np.flatnonzero(found_level > k)
+        if not len(idx):
+            continue
+        # Hit not in the left half of the block - it's in the right half
+        right = levels[k][pos[idx] >> k] > threshold[idx]
+        pos[idx[right]] += 1 << k
+
+    return np.where(found_level >= 0, pos, -1)
+
+
+class _Book:
+    """Orders and fills for one symbol."""
+
+    def __init__(self, bars: Bars):
+        self.bars = bars
+        self._levels: Dict[str, List[np.ndarray]] = {}
+        # Order columns, appended as the strategy places orders
+        self.order_ids: List[int] = []
+        self.placed_at: List[int] = []      # First bar the order can fill in
+        self.cancelled_at: List[int] = []   # First bar it can no longer fill in
+        self.signed_qty: List[float] = []
+        self.limit_price: List[float] = []  # nan for market orders
+        self.fill_bar = np.empty(0, dtype=np.int64)  # -1 = never fills
+        self.fill_price = np.empty(0)
+        self.resolved = 0
+        # Running (bar, position, entry price, realized pnl, fees) for position queries
+        self.state = (-1, 0.0, 0.0, 0.0, 0.0)
+
+    def levels(self, side: str) -> List[np.ndarray]:
+        """Block minima for finding limit fills: low for buys, -high for sells."""
+        if side not in self._levels:
+            values = self.bars.low if side == "BUY" else -self.bars.high
+            self._levels[side] = _build_min_levels(values)
+        return self._levels[side]
+
+
+class BacktestBot:
+    """
+    BasicBot stand-in that trades against historical bars.
+
+    The clock is a timestamp: after set_time(t) every bar with open_time <= t
+    counts as closed and visible, and new orders can fill from the next bar
+    on. Market orders fill at the next bar's open plus slippage. Limit
+    orders fill in the first later bar that trades through their price, at
+    the limit price (or the open, if the bar gaps through it).
+
+    Order placement only records the order. Fills are found for all pending
+    orders in one vectorized pass the next time something needs them (a
+    position query, results, ...).
+
+    For strategies that can express themselves as a target position per bar,
+    add_target_positions skips the order API entirely and is fully vectorized.
+    """
+
+    def __init__(self, data: Dict[str, Bars], starting_balance: float = 10000.0, maker_fee: float = 0.0002,
+                 taker_fee: float = 0.0004, slippage: float = 0.0001):
+        """
+        Args:
+            data: Bars per symbol
+            starting_balance: Wallet balance in USDT
+            maker_fee: Fee rate for limit orders that rest before filling
+            taker_fee: Fee rate for market orders and limits that fill on arrival
+            slippage: Fraction of the price market orders lose on each fill
+        """
+        self.books = {symbol: _Book(bars) for symbol, bars in data.items()}
+        self.starting_balance = starting_balance
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.slippage = slippage
+        self.now = min((int(bars.open_time[0]) for bars in data.values() if len(bars)), default=0)
+        self._next_order_id = 1
+
+    # Clock
+
+    def set_time(self, timestamp: int) -> None:
+        """Move the clock to timestamp (ms). Bars that opened at or before it are closed."""
+        self.now = int(timestamp)
+
+    def times(self, start: Optional[int] = None, end: Optional[int] = None) -> Iterator[int]:
+        """Step the clock through every bar open time of every symbol, yielding each one."""
+        stamps = np.unique(np.concatenate([book.bars.open_time for book in self.books.values()]))
+        lo = np.searchsorted(stamps, start, "left") if start is not None else 0
+        hi = np.searchsorted(stamps, end, "right") if end is not None else len(stamps)
+        for stamp in stamps[lo:hi]:
+            self.now = int(stamp)
+            yield self.now
+
+    def bar_index(self, symbol: str) -> int:
+        """Index of the last closed bar for symbol (-1 before the first one)."""
+        return int(np.searchsorted(self.books[symbol].bars.open_time, self.now, "right")) - 1
+
+    def history(self, symbol: str, n: Optional[int] = None) -> Bars:
+        """The last n closed bars (all of them by default), as views - nothing is copied."""
+        end = self.bar_index(symbol) + 1
+        start = 0 if n is None else max(0, end - n)
+        return Bars(*(column[start:end] for column in self.books[symbol].bars))
+
+    def get_price(self, symbol: str) -> float:
+        """Close of the last closed bar."""
+        index = self.bar_index(symbol)
+        return float(self.books[symbol].bars.close[max(index, 0)])
+
+    # BasicBot order API
+
+    def place_market_order(self, symbol: str, side: str, quantity: float) -> Dict[str, Any]:
+        """Place a market order - fills at the next bar's open."""
+        return self._add_order(symbol, side, "MARKET", float(quantity), float("nan"))
+
+    def place_limit_order(self, symbol: str, side: str, quantity: float, price: float) -> Dict[str, Any]:
+        """Place a GTC limit order."""
+        return self._add_order(symbol, side, "LIMIT", float(quantity), float(price))
+
+    def place_orders(self, orders: List[Dict[str, Any]], validate: bool = False) -> List[Dict[str, Any]]:
+        """Place several orders (same dicts as BasicBot.place_orders)."""
+        results = []
+        for order in orders:
+            if order["order_type"] == "LIMIT":
+                results.append(self.place_limit_order(order["symbol"], order["side"], order["quantity"], order["price"]))
+            else:
+                results.append(self.place_market_order(order["symbol"], order["side"], order["quantity"]))
+        return results
+
+    def cancel_order(self, symbol: str, order_id: int) -> Dict[str, Any]:
+        """Cancel an order that hasn't filled by now."""
+        book = self.books[symbol]
+        row = book.order_ids.index(order_id)
+        self._resolve(book)
+        fill_bar = int(book.fill_bar[row])
+        if 0 <= fill_bar <= self.bar_index(symbol) or book.cancelled_at[row] < len(book.bars):
+            raise ValueError(f"Order {order_id} is not open")
+        book.cancelled_at[row] = self.bar_index(symbol) + 1
+        if fill_bar >= book.cancelled_at[row]:
+            book.fill_bar[row] = -1
+        return self._order_json(symbol, row)
+
+    def get_order(self, symbol: str, order_id: int) -> Dict[str, Any]:
+        book = self.books[symbol]
+        row = book.order_ids.index(order_id)
+        self._resolve(book)
+        return self._order_json(symbol, row)
+
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        orders = []
+        for name in ([symbol] if symbol else self.books):
+            book = self.books[name]
+            self._resolve(book)
+            current = self.bar_index(name)
+            for row in range(len(book.order_ids)):
+                if book.cancelled_at[row] >= len(book.bars) and not 0 <= book.fill_bar[row] <= current:
+                    orders.append(self._order_json(name, row))
+        return orders
+
+    def get_position_info(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Positions as of now, in the positionRisk shape."""
+        positions = []
+        for name in ([symbol] if symbol else self.books):
+            _, amount, entry, _, _ = self._position_state(name)
+            mark = self.get_price(name)
+            positions.append({
+                "symbol": name,
+                "positionAmt": str(amount),
+                "entryPrice": str(entry),
+                "markPrice": str(mark),
+                "unRealizedProfit": str(amount * (mark - entry)),
+                "positionSide": "BOTH",
+            })
+        return positions
+
+    def get_account_info(self) -> Dict[str, Any]:
+        """Wallet and PnL as of now, in the /fapi/v2/account shape (USDT only)."""
+        wallet, unrealized = self.starting_balance, 0.0
+        for name in self.books:
+            _, amount, entry, realized, fees = self._position_state(name)
+            wallet += realized - fees
+            unrealized += amount * (self.get_price(name) - entry)
+        return {
+            "totalWalletBalance": str(wallet),
+            "totalUnrealizedProfit": str(unrealized),
+            "totalMarginBalance": str(wallet + unrealized),
+            "assets": [{"asset": "USDT", "walletBalance": str(wallet), "unrealizedProfit": str(unrealized),
+                        "marginBalance": str(wallet + unrealized)}],
+        }
+
+    # Vectorized path
+
+    def add_target_positions(self, symbol: str, targets: np.ndarray) -> None:
+        """
+        Trade towards a target position per bar.
+
+        targets[i] is the position wanted once bar i has closed. The change
+        is traded as a market order at bar i + 1's open, for all bars at once.
+        """
+        book = self.books[symbol]
+        targets = np.asarray(targets, dtype=np.float64)
+        if len(targets) != len(book.bars):
+            raise ValueError(f"Need one target per bar ({len(book.bars)}), got {len(targets)}")
+        trades = np.diff(targets, prepend=0.0)[:-1]
+        bars = np.flatnonzero(trades) + 1
+        self._append_orders(book, bars, trades[bars - 1], np.full(len(bars), np.nan))
+
+    # Results
+
+    def fills(self, symbol: str) -> Dict[str, np.ndarray]:
+        """Every fill for symbol over the whole data set: bar, qty (signed), price, fee."""
+        return self._fills_until(symbol, len(self.books[symbol].bars) - 1)
+
+    def equity_curve(self, symbol: str) -> np.ndarray:
+        """PnL after fees at every bar close for one symbol."""
+        book = self.books[symbol]
+        fills = self.fills(symbol)
+        n = len(book.bars)
+        position = np.cumsum(np.bincount(fills["bar"], weights=fills["qty"], minlength=n))
+        cash = np.cumsum(np.bincount(fills["bar"], weights=-fills["qty"] * fills["price"] - fills["fee"],
+                                     minlength=n))
+        return cash + position * book.bars.close
+
+    def summary(self) -> Dict[str, Any]:
+        """Headline numbers per symbol and in total."""
+        per_symbol = {}
+        total_pnl = total_fees = 0.0
+        for name in self.books:
+            fills = self.fills(name)
+            equity = self.equity_curve(name) + self.starting_balance
+            peak = np.maximum.accumulate(equity)
+            drawdown = float(np.max((peak - equity) / peak)) if len(equity) else 0.0
+            pnl = float(equity[-1]) - self.starting_balance if len(equity) else 0.0
+            fees = float(fills["fee"].sum())
+            per_symbol[name] = {"pnl": pnl, "fees": fees, "trades": int(len(fills["bar"])), "max_drawdown": drawdown}
+            total_pnl += pnl
+            total_fees += fees
+        return {
+            "pnl": total_pnl,
+            "fees": total_fees,
+            "return": total_pnl / self.starting_balance,
+            "symbols": per_symbol,
+        }
+
+    # Internals
+
+    def _add_order(self, symbol: str, side: str, order_type: str, quantity: float, price: float) -> Dict[str, Any]:
+        if side not in ("BUY", "SELL"):
+            raise ValueError(f"Side must be BUY or SELL, got {side}")
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive")
+        book = self.books[symbol]
+        signed = quantity if side == "BUY" else -quantity
+        self._append_orders(book, np.array([self.bar_index(symbol) + 1]), np.array([signed]), np.array([price]))
+        return self._order_json(symbol, len(book.order_ids) - 1)
+
+    def _append_orders(self, book: _Book, placed_at: np.ndarray, signed_qty: np.ndarray,
+                       limit_price: np.ndarray) -> None:
+        count = len(placed_at)
+        book.order_ids.extend(range(self._next_order_id, self._next_order_id + count))
+        self._next_order_id += count
+        book.placed_at.extend(placed_at.tolist())
+        book.cancelled_at.extend([len(book.bars)] * count)
+        book.signed_qty.extend(signed_qty.tolist())
+        book.limit_price.extend(limit_price.tolist())
+
+    def _resolve(self, book: _Book) -> None:
+        """Find fills for every order placed since the last call, in one pass."""
+        start = book.resolved
+        total = len(book.order_ids)
+        if start == total:
+            return
+        bars = book.bars
+        n = len(bars)
+        placed = np.asarray(book.placed_at[start:], dtype=np.int64)
+        cancelled = np.asarray(book.cancelled_at[start:], dtype=np.int64)
+        qty = np.asarray(book.signed_qty[start:])
+        limit = np.asarray(book.limit_price[start:])
+
+        fill_bar = np.where(placed < n, placed, -1)
+        fill_price = np.full(len(placed), np.nan)
+
+        is_market = np.isnan(limit)
+        market = np.flatnonzero(is_market & (fill_bar >= 0))
+        slip = np.where(qty[market] > 0, 1 + self.slippage, 1 - self.slippage)
+        fill_price[market] = bars.open[fill_bar[market]] * slip
+
+        for side, sign in (("BUY", 1.0), ("SELL", -1.0)):
+            rows = np.flatnonzero(~is_market & (np.sign(qty) == sign) & (placed < n))
+            if not len(rows):
+                continue
+            hits = first_at_or_below(book.levels(side), placed[rows], sign * limit[rows])
+            hits[hits >= cancelled[rows]] = -1
+            fill_bar[rows] = hits
+            filled = rows[hits >= 0]
+            opens = bars.open[fill_bar[filled]]
+            # A bar that opens through the limit fills at the open
+            fill_price[filled] = np.minimum(limit[filled], opens) if sign > 0 else np.maximum(limit[filled], opens)
+
+        book.fill_bar = np.concatenate([book.fill_bar, fill_bar])
+        book.fill_price = np.concatenate([book.fill_price, fill_price])
+        book.resolved = total
+
+    def _fills_until(self, symbol: str, bar: int, after: int = -1) -> Dict[str, np.ndarray]:
+        """Fills in bars after < bar <= bar, in time order: bar, qty (signed), price, fee."""
+        book = self.books[symbol]
+        self._resolve(book)
+        mask = (book.fill_bar > after) & (book.fill_bar <= bar)
+        rows = np.flatnonzero(mask)
+        rows = rows[np.argsort(book.fill_bar[rows], kind="stable")]
+        fill_bar = book.fill_bar[rows]
+        price = book.fill_price[rows]
+        signed = np.asarray(book.signed_qty, dtype=np.float64)[rows]
+        limit = np.asarray(book.limit_price, dtype=np.float64)[rows]
+        placed = np.asarray(book.placed_at, dtype=np.int64)[rows]
+        # Market orders, and limits that filled at the open of the bar they arrived in, pay taker
+        taker = np.isnan(limit) | ((fill_bar == placed) & (price != limit))
+        fee = np.abs(signed) * price * np.where(taker, self.taker_fee, self.maker_fee)
+        return {"bar": fill_bar, "qty": signed, "price": price, "fee": fee}
+
+    def _position_state(self, symbol: str):
+        """(bar, position, entry, realized, fees) as of now, carried forward from the last query."""
+        book = self.books[symbol]
+        bar = self.bar_index(symbol)
+        if bar < book.state[0]:
+            book.state = (-1, 0.0, 0.0, 0.0, 0.0)  # Clock went backwards - start over
+        last_bar, position, entry, realized, fees = book.state
+        if bar > last_bar:
+            fills = self._fills_until(symbol, bar, after=last_bar)
+            position, entry, realized = _apply_fills(position, entry, realized, fills["qty"], fills["price"])
+            fees += float(fills["fee"].sum())
+            book.state = (bar, position, entry, realized, fees)
+        return book.state
+
+    def _order_json(self, symbol: str, row: int) -> Dict[str, Any]:
+        book = self.books[symbol]
+        qty = book.signed_qty[row]
+        price = book.limit_price[row]
+        status, executed, avg_price = "NEW", 0.0, 0.0
+        if row < book.resolved:
+            fill_bar = int(book.fill_bar[row])
+            if 0 <= fill_bar <= self.bar_index(symbol):
+                status, executed, avg_price = "FILLED", abs(qty), float(book.fill_price[row])
+            elif book.cancelled_at[row] < len(book.bars):
+                status = "CANCELED"
+        return {
+            "orderId": book.order_ids[row],
+            "symbol": symbol,
+            "status": status,
+            "side": "BUY" if qty > 0 else "SELL",
+            "type": "MARKET" if np.isnan(price) else "LIMIT",
+            "origQty": str(abs(qty)),
+            "price": "0" if np.isnan(price) else str(price),
+            "executedQty": str(executed),
+            "avgPrice": str(avg_price),
+            "updateTime": self.now,
+        }
+
+
+def _apply_fills(position: float, entry: float, realized: float, qty: np.ndarray, price: np.ndarray):
+    """
+    Roll (position, average entry price, realized pnl) forward over fills in
+    time order. Fills that only add to the position are folded in with one
+    weighted average; reducing or flipping fills go one at a time.
+    """
+    if not len(qty):
+        return position, entry, realized
+    if np.all(np.sign(qty) == (np.sign(position) or np.sign(qty[0]))):
+        total = position + float(qty.sum())
+        return total, (entry * position + float(np.dot(qty, price))) / total, realized
+
+    for q, p in zip(qty.tolist(), price.tolist()):
+        if position == 0 or (position > 0) == (q > 0):
+            entry = (entry * position + p * q) / (position + q)
+            position += q
+            continue
+        closed = min(abs(q), abs(position))
+        realized += closed * (p - entry) * (1 if position > 0 else -1)
+        remaining = position + q
+        if abs(remaining) < 1e-12:
+            position, entry = 0.0, 0.0
+        elif (remaining > 0) != (position > 0):
+            position, entry = remaining, p  # Flipped - what's left opened at this fill
+        else:
+            position = remaining
+    return position, entry, realized
@@ -1,8 +1,15 @@
 """BasicBot class for simplified Binance Futures trading."""
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
+from .async_client import AsyncBinanceClient
 from .binance_client import BinanceClient
+from .config import config
 from .logger import logger
+from .metrics import MetricsServer
+from .order_state import OrderTracker
+from .portfolio import Portfolio
+from .requote import Quote
+from .user_stream import UserDataStream
 
 
 class BasicBot:
@@ -11,9 +18,16 @@ class BasicBot:
     
     This class provides a clean interface for initializing the Binance Futures
     client with explicit testnet support.
+    
+    A bot starts background threads (clock sync, connection keep-alive,
+    order reconciliation), so call close() when done with it, or use it
+    as a context manager:
+    
+        with BasicBot(api_key, api_secret) as bot:
+            bot.place_market_order("BTCUSDT", "BUY", 0.01)
     """
     
-    def __init__(self, api_key: str, api_secret: str, testnet: bool = True):
+    def __init__(self, api_key: str, api_secret: str, testnet: bool = True, base_url: Optional[str] = None):
         """
         Initialize the BasicBot with Binance credentials.
         
@@ -21,24 +35,62 @@ class BasicBot:
             api_key: Binance API key
             api_secret: Binance API secret
             testnet: Whether to use testnet (default: True for safety)
+            base_url: Override the API endpoint (e.g. the local mock server)
         """
         self.api_key = api_key
         self.api_secret = api_secret
         self.testnet = testnet
+        self._async_client: Optional[AsyncBinanceClient] = None
+        self.user_stream: Optional[UserDataStream] = None
+        self.metrics_server: Optional[MetricsServer] = None
+        self._portfolio: Optional[Portfolio] = None
         
         # Initialize Binance client with explicit testnet support
         self.client = BinanceClient(
             api_key=api_key,
             api_secret=api_secret,
-            testnet=testnet
+            testnet=testnet,
+            base_url=base_url
         )
         
+        # Bots run for a while, so keep the server clock estimate fresh
+        # and the connections to the exchange open
+        self.client.time_sync.start()
+        self.client.connections.start()
+        # Every order placed through the bot is tracked locally (see
+        # order_state.py); this keeps that state honest
+        self.client.orders.start()
+        # Positions for the risk limits, so the first order doesn't wait for them
+        if self.client.risk.limits.needs_positions:
+            self.client.risk.ensure_positions()
+        if config.metrics_port is not None:
+            self.start_metrics_server(config.metrics_port)
+        
         logger.info(
             f"BasicBot initialized - "
             f"Testnet: {testnet}, "
-            f"URL: {'https://testnet.binancefuture.com' if testnet else 'https://fapi.binance.com'}"
+            f"URL: {self.client.base_url}"
         )
     
+    def __enter__(self) -> "BasicBot":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """
+        Stop everything the bot started: the user data stream, the metrics
+        server and the client's background threads and connections.
+        The async client's pool needs await bot.close_async() as well.
+        """
+        self.stop_user_stream()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        self.client.close()
+        logger.info("BasicBot closed")
+    
     def place_market_order(self, symbol: str, side: str, quantity: float):
         """
         Place a market order.
@@ -80,10 +132,235 @@ class BasicBot:
             time_in_force="GTC"
         )
     
+    def place_orders(self, orders: List[Dict[str, Any]], validate: bool = False) -> List[Dict[str, Any]]:
+        """
+        Place several orders at once via the batch endpoint.
+        
+        Args:
+            orders: List of dicts with symbol, side, order_type, quantity
+                    and (for limit orders) price
+            validate: Snap to tick/step size and check exchange filters
+                      locally before sending
+            
+        Returns:
+            One result per order, in the same order. Failed orders come
+            back as {"code": ..., "msg": ...}
+        """
+        return self.client.place_orders(orders, validate=validate)
+    
+    def modify_order(self, symbol: str, side: str, quantity: float, price: float, order_id: Optional[int] = None,
+                     orig_client_order_id: Optional[str] = None, validate: bool = False) -> Dict[str, Any]:
+        """
+        Change the price and/or quantity of an open limit order in place.
+        quantity is the new total, including anything already filled.
+        """
+        return self.client.modify_order(symbol, side, quantity, price, order_id=order_id,
+                                        orig_client_order_id=orig_client_order_id, validate=validate)
+    
+    def modify_orders(self, modifications: List[Dict[str, Any]], validate: bool = False) -> List[Dict[str, Any]]:
+        """
+        Modify several orders at once via the batch endpoint.
+        
+        Args:
+            modifications: List of dicts with symbol, side, quantity, price
+                           and order_id (or orig_client_order_id)
+            validate: Snap to tick/step size and check exchange filters first
+            
+        Returns:
+            One result per modification, failures as {"code": ..., "msg": ...}
+        """
+        return self.client.modify_orders(modifications, validate=validate)
+    
+    def cancel_order(self, symbol: str, order_id: Optional[int] = None,
+                     orig_client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        """Cancel one open order by order ID or client order ID."""
+        return self.client.cancel_order(symbol, order_id=order_id, orig_client_order_id=orig_client_order_id)
+    
+    def cancel_orders(self, symbol: str, order_ids: Optional[List[int]] = None,
+                      client_order_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Cancel several orders on one symbol, 10 per request."""
+        return self.client.cancel_orders(symbol, order_ids=order_ids, client_order_ids=client_order_ids)
+    
+    def cancel_all(self, symbol: str) -> Dict[str, Any]:
+        """Cancel every open order on a symbol."""
+        return self.client.cancel_all(symbol)
+    
+    def requote(self, symbol: str, quotes: List[Quote], validate: bool = True) -> Dict[str, Any]:
+        """
+        Bring our limit orders on a symbol in line with a set of quotes,
+        amending where possible instead of cancelling and re-placing.
+        
+        Args:
+            symbol: Trading pair symbol
+            quotes: Quote(side, price, quantity) for every order we want resting
+            validate: Snap quotes to tick/step size first
+            
+        Returns:
+            Dict with the plan and the "cancelled", "amended" and "created" results
+        """
+        return self.client.requote(symbol, quotes, validate=validate)
+    
     def get_account_info(self):
         """Get account information."""
         return self.client.get_account_info()
     
     def get_position_info(self, symbol: Optional[str] = None):
-        """Get position information."""
+        """
+        Get position information.
+        
+        Served from the user stream mirror (no API call) while the stream
+        is running and synced, from REST otherwise.
+        """
+        if self._mirror_ready():
+            return self.user_stream.mirror.get_positions(symbol)
         return self.client.get_position_info(symbol=symbol)
+    
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get open orders - from the user stream mirror when it's synced."""
+        if self._mirror_ready():
+            return self.user_stream.mirror.get_open_orders(symbol)
+        return self.client.get_open_orders(symbol=symbol)
+    
+    def get_balance(self, asset: str = "USDT") -> Optional[Dict[str, Any]]:
+        """Get one asset's balance - from the user stream mirror when it's synced."""
+        if self._mirror_ready():
+            return self.user_stream.mirror.get_balance(asset)
+        for balance in self.client.get_account_info().get("assets", []):
+            if balance["asset"] == asset:
+                return balance
+        return None
+    
+    def start_user_stream(self, wait: float = 10.0) -> bool:
+        """
+        Start mirroring balances, positions and open orders from the user
+        data stream, so the getters above stop polling the API.
+        
+        Args:
+            wait: Seconds to wait for the first snapshot
+            
+        Returns:
+            True if the mirror is synced
+        """
+        if self.user_stream is None:
+            self.user_stream = UserDataStream(self.client)
+            self.user_stream.mirror.add_listener(self.client.orders.on_event)
+        return self.user_stream.start(wait=wait)
+    
+    def stop_user_stream(self) -> None:
+        """Stop the user data stream; getters go back to REST."""
+        if self.user_stream is not None:
+            self.user_stream.stop()
+    
+    @property
+    def orders(self) -> OrderTracker:
+        """
+        Local state of every order placed through the bot - no API calls.
+        
+            bot.orders.has_open("BTCUSDT", "BUY", 50000)
+            bot.orders.open_orders("BTCUSDT")
+            bot.orders.get(client_order_id).status
+        """
+        return self.client.orders
+    
+    @property
+    def portfolio(self) -> Portfolio:
+        """
+        All positions as NumPy columns, loaded on first use.
+        
+            bot.portfolio.update_marks({"BTCUSDT": 42100.5})
+            snapshot = bot.portfolio.compute()
+            snapshot.liquidation_price, snapshot.margin_ratio
+        
+        Call bot.portfolio.refresh() after trading to pick up new positions.
+        """
+        if self._portfolio is None:
+            self._portfolio = Portfolio(self.client)
+            self._portfolio.refresh()
+        return self._portfolio
+    
+    def risk_exposure(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """Positions, open orders and worst-case exposure the risk limits are checked against."""
+        return self.client.risk.exposure(symbol)
+    
+    def latency_report(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Request latency so far, per endpoint and stage (validate, rate_limit,
+        sign, first_byte, body, decode, journal, log, total).
+        
+        Returns:
+            {endpoint: {stage: {"count", "mean_us", "p50_us", "p90_us",
+            "p99_us", "p99.9_us", "max_us"}}}
+        """
+        return self.client.metrics.report()
+    
+    def connection_stats(self) -> Dict[str, Any]:
+        """How many requests went out on an already open connection (see ConnectionManager.stats)."""
+        return self.client.connections.stats()
+    
+    def start_metrics_server(self, port: int = 9108, host: str = "127.0.0.1") -> MetricsServer:
+        """Serve the latency histograms for Prometheus at http://host:port/metrics."""
+        if self.metrics_server is None:
+            self.metrics_server = MetricsServer(self.client.metrics, host=host, port=port)
+            self.metrics_server.start()
+        return self.metrics_server
+    
+    def _mirror_ready(self) -> bool:
+        return self.user_stream is not None and self.user_stream.synced.is_set()
+    
+    @property
+    def async_client(self) -> AsyncBinanceClient:
+        """
+        Asyncio client with the same credentials, created on first use.
+        
+        Use the *_async methods below (or this client directly) together
+        with asyncio.gather to run several requests concurrently.
+        """
+        if self._async_client is None:
+            self._async_client = AsyncBinanceClient(
+                api_key=self.api_key,
+                api_secret=self.api_secret,
+                testnet=self.testnet,
+                base_url=self.client.base_url
+            )
+            self._async_client.time_sync = self.client.time_sync
+            self._async_client.rate_limiter = self.client.rate_limiter
+            self._async_client.orders = self.client.orders
+            self._async_client.risk = self.client.risk
+        return self._async_client
+    
+    async def place_market_order_async(self, symbol: str, side: str, quantity: float):
+        """Async version of place_market_order."""
+        return await self.async_client.place_order(
+            symbol=symbol,
+            side=side,
+            order_type="MARKET",
+            quantity=quantity
+        )
+    
+    async def place_limit_order_async(self, symbol: str, side: str, quantity: float, price: float):
+        """Async version of place_limit_order."""
+        return await self.async_client.place_order(
+            symbol=symbol,
+            side=side,
+            order_type="LIMIT",
+            quantity=quantity,
+            price=price,
+            time_in_force="GTC"
+        )
+    
+    async def place_orders_async(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Async version of place_orders."""
+        return await self.async_client.place_orders(orders)
+    
+    async def get_account_info_async(self):
+        """Async version of get_account_info."""
+        return await self.async_client.get_account_info()
+    
+    async def get_position_info_async(self, symbol: Optional[str] = None):
+        """Async version of get_position_info."""
+        return await self.async_client.get_position_info(symbol=symbol)
+    
+    async def close_async(self) -> None:
+        """Close the async client's connection pool if it was opened."""
+        if self._async_client is not None:
+            await self._async_client.close()
@@ -0,0 +1,282 @@
+"""
+Microbenchmarks for the order hot path.
+Times the pieces every order goes through (validation, urlencode, signing,
+JSON decoding, logging) so we can see where the per-order CPU time goes.
+
+Run with:
+    python bench.py                        # run everything
+    python bench.py sign json_decode       # run some stages
+    python bench.py --save baseline.json   # save results as a baseline
+    python bench.py --compare baseline.json --threshold 0.2
+"""
+import argparse
+import gc
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+from urllib.parse import urlencode
+
+# Handle both direct execution and module execution
+try:
+    from .binance_client import BinanceClient, build_order_params
+    from .exchange_info import parse_symbol_filters
+    from .logger import LazyQueueHandler
+    from .validators import apply_symbol_filters, parse_limit_order_args, parse_market_order_args
+except ImportError:
+    from binance_client import BinanceClient, build_order_params
+    from exchange_info import parse_symbol_filters
+    from logger import LazyQueueHandler
+    from validators import apply_symbol_filters, parse_limit_order_args, parse_market_order_args
+
+
+ORDER_PARAMS = {
+    "symbol": "BTCUSDT",
+    "side": "BUY",
+    "type": "LIMIT",
+    "quantity": "0.012",
+    "price": "42000.5",
+    "timeInForce": "GTC",
+    "newClientOrderId": "bot-0123456789abcdef0123456789abcdef",
+    "recvWindow": 5000,
+    "timestamp": 1700000000000,
+}
+
+ORDER_RESPONSE = json.dumps({
+    "orderId": 4038125187, "symbol": "BTCUSDT", "status": "NEW",
+    "clientOrderId": "bot-0123456789abcdef0123456789abcdef", "price": "42000.50", "avgPrice": "0.00",
+    "origQty": "0.012", "executedQty": "0", "cumQty": "0", "cumQuote": "0", "timeInForce": "GTC",
+    "type": "LIMIT", "reduceOnly": False, "closePosition": False, "side": "BUY", "positionSide": "BOTH",
+    "stopPrice": "0", "workingType": "CONTRACT_PRICE", "priceProtect": False, "origType": "LIMIT",
+    "updateTime": 1700000000000,
+})
+
+BTC_SYMBOL_INFO = {
+    "symbol": "BTCUSDT", "status": "TRADING", "pricePrecision": 2, "quantityPrecision": 3,
+    "filters": [
+        {"filterType": "PRICE_FILTER", "minPrice": "556.80", "maxPrice": "4529764", "tickSize": "0.10"},
+        {"filterType": "LOT_SIZE", "stepSize": "0.001", "maxQty": "1000", "minQty": "0.001"},
+        {"filterType": "MARKET_LOT_SIZE", "stepSize": "0.001", "maxQty": "120", "minQty": "0.001"},
+        {"filterType": "MAX_NUM_ORDERS", "limit": 200},
+        {"filterType": "MIN_NOTIONAL", "notional": "100"},
+    ],
+}
+
+
+def _quiet_logger() -> logging.Logger:
+    """
+    A logger wired like logger.setup_logger (queue + background writer to a
+    file and the console), but writing to a temp file and /dev/null so
+    benchmarks don't flood bot.log or the terminal.
+    """
+    bench_logger = logging.getLogger("trading_bot.bench")
+    bench_logger.setLevel(logging.INFO)
+    bench_logger.propagate = False
+    if not bench_logger.handlers:
+        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+        log_path = os.path.join(tempfile.gettempdir(), "bench_bot.log")
+        handlers = (logging.FileHandler(log_path, mode="w", encoding="utf-8"),
+                    logging.StreamHandler(open(os.devnull, "w")))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        bench_logger.addHandler(LazyQueueHandler(records))
+        logging.handlers.QueueListener(records, *handlers).start()
+    return bench_logger
+
+
+def _stages() -> Dict[str, Callable[[], Callable[[], Any]]]:
+    """Stage name -> setup function returning the callable to time."""
+
+    def sign():
+        client = BinanceClient(api_key="bench_key", api_secret="bench_secret_" + "x" * 52, testnet=True)
+        return lambda: client._generate_signature(ORDER_PARAMS)
+
+    def url_encode():
+        params = dict(ORDER_PARAMS, signature="f" * 64)
+        return lambda: urlencode(params)
+
+    def build_params():
+        return lambda: build_order_params("BTCUSDT", "BUY", "LIMIT", "0.012", "42000.5")
+
+    def parse_market_args():
+        args = ["btcusdt", "buy", "0.012"]
+        return lambda: parse_market_order_args(args)
+
+    def parse_limit_args():
+        args = ["btcusdt", "buy", "0.012", "42000.5"]
+        return lambda: parse_limit_order_args(args)
+
+    def symbol_filters():
+        filters = parse_symbol_filters(BTC_SYMBOL_INFO)
+        return lambda: apply_symbol_filters(filters, "BUY", "LIMIT", "0.0123", "42000.57")
+
+    def json_decode():
+        return lambda: json.loads(ORDER_RESPONSE)
+
+    def log_place_order():
+        # The two lines place_order logs for every order
+        bench_logger = _quiet_logger()
+        response = json.loads(ORDER_RESPONSE)
+        symbol, side, order_type, quantity, price = "BTCUSDT", "BUY", "LIMIT", "0.012", "42000.5"
+
+        def run():
+            bench_logger.info("Placing %s order: %s %s %s%s", order_type, symbol, side, quantity, f" @ {price}" if price else "")
+            bench_logger.info("Order placed - ID: %s", response.get("orderId"))
+        return run
+
+    return {
+        "sign": sign,
+        "urlencode": url_encode,
+        "build_params": build_params,
+        "parse_market_args": parse_market_args,
+        "parse_limit_args": parse_limit_args,
+        "symbol_filters": symbol_filters,
+        "json_decode": json_decode,
+        "log_place_order": log_place_order,
+    }
+
+
+def measure(func: Callable[[], Any], warmup: int = 1000, repeat: int = 50, number: int = 1000) -> Dict[str, float]:
+    """
+    Time a callable.
+
+    Runs warmup calls first, then repeat batches of number calls each. The
+    per-call time of every batch is one sample; p50/p99 are over samples.
+    Allocation figures come from one extra traced pass so tracemalloc
+    doesn't slow down the timed runs.
+
+    Returns:
+        Dict with p50_ns, p99_ns, mean_ns, min_ns, alloc_bytes, alloc_blocks
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter_ns() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    samples.sort()
+    p99_index = min(len(samples) - 1, int(round(0.99 * (len(samples) - 1))))
+
+    tracemalloc.start()
+    try:
+        traced_calls = min(number, 1000)
+        peak_bytes = 0
+        before = tracemalloc.take_snapshot()
+        for _ in range(traced_calls):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            func()
+            peak_bytes += tracemalloc.get_traced_memory()[1] - current
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    new_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+    return {
+        "p50_ns": statistics.median(samples),
+        "p99_ns": samples[p99_index],
+        "mean_ns": statistics.fmean(samples),
+        "min_ns": samples[0],
+        # Memory a call needs at its peak, including temporaries it frees again
+        "alloc_bytes": peak_bytes / traced_calls,
+        # Blocks still alive after the pass (should be ~0 - anything else is a leak)
+        "alloc_blocks": new_blocks / traced_calls,
+    }
+
+
+def run(names: List[str], **kwargs) -> Dict[str, Dict[str, float]]:
+    stages = _stages()
+    unknown = [name for name in names if name not in stages]
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)} - choose from {', '.join(stages)}")
+
+    results = {}
+    for name in names or list(stages):
+        results[name] = measure(stages[name](), **kwargs)
+    return results
+
+
+def print_results(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]] = None) -> None:
+    header = f"{'stage':<20}{'p50 (us)':>12}{'p99 (us)':>12}{'alloc B/call':>14}"
+    if baseline:
+        header += f"{'vs base':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in results.items():
+        line = f"{name:<20}{stats['p50_ns'] / 1000:>12.3f}{stats['p99_ns'] / 1000:>12.3f}{stats['alloc_bytes']:>14.0f}"
+        if baseline and name in baseline:
+            change = stats["p50_ns"] / baseline[name]["p50_ns"] - 1
+            line += f"{change:>+10.1%}"
+        print(line)
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Names of stages whose p50 got slower than the baseline by more than threshold."""
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base and stats["p50_ns"] > base["p50_ns"] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    """Entry point when running as a script."""
+    parser = argparse.ArgumentParser(description="Order hot path microbenchmarks")
+    parser.add_argument("stages", nargs="*", help="Stages to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed batches per stage")
+    parser.add_argument("--number", type=int, default=1000, help="Calls per batch")
+    parser.add_argument("--warmup", type=int, default=1000, help="Untimed calls before measuring")
+    parser.add_argument("--save", metavar="FILE", help="Write results to FILE as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="Compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed p50 slowdown vs baseline before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    try:
+        results = run(args.stages, warmup=args.warmup, repeat=args.repeat, number=args.number)
+    except ValueError as e:
+        print(f"\n{e}\n")
+        sys.exit(1)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["stages"]
+
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "stages": results}, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo stage regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,11 @@ Handles authentication, request signing, and API calls.
 """
 import hashlib
 import hmac
+import json
 import time
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlencode
 
 import requests
@@ -13,10 +16,171 @@ import requests
 # Handle both direct execution and module execution
 try:
     from .config import config
+    from .connection import ConnectionManager
+    from .exchange_info import ExchangeInfoCache, SymbolFilters
+    from .journal import open_journal
     from .logger import logger
+    from .metrics import metrics
+    from .order_state import OrderTracker
+    from .portfolio import LeverageBracketCache
+    from .requote import Quote, RequotePlan, plan_requote
+    from .risk import RiskEngine, RiskError
+    from .rate_limiter import RateLimiter, request_cost, request_priority
+    from .retry import (ORDER_DOES_NOT_EXIST, RetryPolicy, error_code, is_ambiguous, is_transient,
+                        make_client_order_id)
+    from .time_sync import TimeSync
+    from .validators import apply_symbol_filters, format_decimal, validate_orders
 except ImportError:
     from config import config
+    from connection import ConnectionManager
+    from exchange_info import ExchangeInfoCache, SymbolFilters
+    from journal import open_journal
     from logger import logger
+    from metrics import metrics
+    from order_state import OrderTracker
+    from portfolio import LeverageBracketCache
+    from requote import Quote, RequotePlan, plan_requote
+    from risk import RiskEngine, RiskError
+    from rate_limiter import RateLimiter, request_cost, request_priority
+    from retry import (ORDER_DOES_NOT_EXIST, RetryPolicy, error_code, is_ambiguous, is_transient,
+                       make_client_order_id)
+    from time_sync import TimeSync
+    from validators import apply_symbol_filters, format_decimal, validate_orders
+
+
+def resolve_credentials(api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                        testnet: Optional[bool] = None, base_url: Optional[str] = None) -> Tuple[str, str, bool, str]:
+    """
+    Work out which credentials and endpoint a client should use.
+    
+    Explicit credentials win, otherwise we fall back to env vars.
+    An explicit base_url (e.g. the local mock server) beats both.
+    
+    Returns:
+        Tuple of (api_key, api_secret, testnet, base_url)
+    """
+    if api_key and api_secret:
+        testnet = testnet if testnet is not None else config.testnet
+        default_url = "https://testnet.binancefuture.com" if testnet else "https://fapi.binance.com"
+    else:
+        config.validate()
+        api_key, api_secret, testnet, default_url = config.api_key, config.api_secret, config.testnet, config.base_url
+    
+    return api_key, api_secret, testnet, (base_url.rstrip("/") if base_url else default_url)
+
+
+def sign_params(api_secret: str, params: Dict[str, Any]) -> str:
+    """Generate HMAC SHA256 signature required by Binance."""
+    query_string = urlencode(params)
+    return hmac.new(
+        api_secret.encode("utf-8"),
+        query_string.encode("utf-8"),
+        hashlib.sha256
+    ).hexdigest()
+
+
+def build_order_params(symbol: str, side: str, order_type: str, quantity: float,
+                       price: Optional[float] = None, time_in_force: str = "GTC", **kwargs) -> Dict[str, Any]:
+    """
+    Build the request params for a new order.
+    Shared by the sync and async clients so both send exactly the same thing.
+    """
+    params = {
+        "symbol": symbol,
+        "side": side,
+        "type": order_type,
+        "quantity": quantity,
+        **kwargs
+    }
+    
+    # Limit orders need a price
+    if order_type == "LIMIT":
+        if price is None:
+            raise ValueError("Price is required for LIMIT orders")
+        params["price"] = price
+        params["timeInForce"] = time_in_force
+    
+    # Decimals would otherwise go out as e.g. "1E-7", which Binance rejects
+    for key, value in params.items():
+        if isinstance(value, Decimal):
+            params[key] = format_decimal(value)
+    
+    return params
+
+
+# Binance accepts at most 5 orders per /fapi/v1/batchOrders call
+BATCH_ORDER_LIMIT = 5
+# ... and at most 10 order IDs per batch cancel
+BATCH_CANCEL_LIMIT = 10
+
+
+def prepare_order_batches(orders: List[Optional[Dict[str, Any]]], chunk_size: int = BATCH_ORDER_LIMIT,
+                          client_order_id: Optional[Callable[[Dict[str, Any]], str]] = None
+                          ) -> Tuple[List[Optional[Dict[str, Any]]], List[Tuple[List[int], List[Dict[str, str]]]]]:
+    """
+    Split a list of orders into batchOrders-sized chunks.
+    
+    Each order is a dict of place_order keyword arguments (symbol, side,
+    order_type, quantity, price, ...). Orders that fail local checks get
+    their error filled in straight away and are left out of the chunks,
+    and None entries are skipped so the caller can fill their slot in.
+    
+    Args:
+        orders: Orders to place
+        chunk_size: Max orders per request
+        client_order_id: Called with the params of orders that have no
+                         newClientOrderId yet, returns one
+    
+    Returns:
+        Tuple of (results, chunks) - results has one slot per input order
+        (None until filled in), chunks is a list of (input indices,
+        order params) ready for encode_batch_orders
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(orders)
+    pending: List[Tuple[int, Dict[str, str]]] = []
+    
+    for index, order in enumerate(orders):
+        if order is None:
+            continue
+        try:
+            params = build_order_params(**order)
+        except (TypeError, ValueError) as e:
+            results[index] = {"code": -1102, "msg": str(e)}
+            continue
+        if client_order_id is not None and "newClientOrderId" not in params:
+            params["newClientOrderId"] = client_order_id(params)
+        # The batch endpoint wants every value as a string
+        pending.append((index, {key: str(value) for key, value in params.items()}))
+    
+    chunks = []
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        chunks.append(([index for index, _ in chunk], [params for _, params in chunk]))
+    
+    return results, chunks
+
+
+def encode_batch_orders(orders: List[Dict[str, str]]) -> str:
+    """JSON-encode order params for the batchOrders param."""
+    return json.dumps(orders, separators=(",", ":"))
+
+
+def batch_error(e: Exception) -> Dict[str, Any]:
+    """Turn a failed batch request into a per-order error entry."""
+    error_data = None
+    try:
+        # requests keeps the response on the exception, the async client
+        # puts the response body in the exception message
+        response = getattr(e, "response", None)
+        if response is not None:
+            error_data = response.json()
+        elif isinstance(getattr(e, "message", None), str):
+            error_data = json.loads(e.message)
+    except Exception:
+        pass
+    if isinstance(error_data, dict) and "code" in error_data:
+        return error_data
+    return {"code": -1000, "msg": str(e)}
 
 
 class BinanceClient:
@@ -25,61 +189,164 @@ class BinanceClient:
     Testnet is used by default for safety.
     """
     
-    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, testnet: Optional[bool] = None):
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, testnet: Optional[bool] = None,
+                 base_url: Optional[str] = None):
         # Allow explicit credentials or fall back to env vars
-        if api_key and api_secret:
-            self.api_key = api_key
-            self.api_secret = api_secret
-            self.testnet = testnet if testnet is not None else config.testnet
-            self.base_url = "https://testnet.binancefuture.com" if self.testnet else "https://fapi.binance.com"
-        else:
-            config.validate()
-            self.api_key = config.api_key
-            self.api_secret = config.api_secret
-            self.testnet = config.testnet
-            self.base_url = config.base_url
-        
-        logger.info(f"Connected to {'testnet' if self.testnet else 'production'} - {self.base_url}")
+        self.api_key, self.api_secret, self.testnet, self.base_url = resolve_credentials(
+            api_key, api_secret, testnet, base_url
+        )
+        
+        logger.info("Connected to %s - %s", "testnet" if self.testnet else "production", self.base_url)
         
         self.session = requests.Session()
         self.session.headers.update({"X-MBX-APIKEY": self.api_key})
+        # Pool sizing and DNS cache now; warm-up and keep-alive once start() is called
+        self.connections = ConnectionManager(self)
+        # Runs batch chunks side by side - one pool for the client's lifetime
+        # rather than new threads (and new metrics shards) per call
+        self._pool = ThreadPoolExecutor(max_workers=config.pool_size, thread_name_prefix="binance-client")
+        
+        self._exchange_cache: Optional[ExchangeInfoCache] = None
+        self._leverage_brackets: Optional[LeverageBracketCache] = None
+        # Keeps us under the request weight / order count limits
+        self.rate_limiter = RateLimiter()
+        # Server clock estimate used to timestamp signed requests
+        self.time_sync = TimeSync(self.get_server_time)
+        self.recv_window = config.recv_window
+        # Backoff for transient failures
+        self.retry_policy = RetryPolicy()
+        # Binary record of every order request and response (None = off)
+        self.journal = open_journal()
+        # Per-stage latency histograms, shared process-wide
+        self.metrics = metrics
+        # State of every order placed through this client
+        self.orders = OrderTracker(self)
+        # Pre-trade limits, kept up to date from the tracker (BINANCE_RISK_*)
+        self.risk = RiskEngine(load_positions=self.get_position_info, load_price=self._mid_price)
+        self.orders.add_listener(self.risk.on_order_change)
+    
+    def close(self, timeout: float = 15.0) -> None:
+        """
+        Stop the background threads (clock sync, keep-alive, reconciliation,
+        exchange info refresh) and close the connections.
+
+        Waits up to timeout seconds per thread - one may be in the middle of
+        a request.
+        """
+        services = [self.time_sync, self.connections, self.orders]
+        if self._exchange_cache is not None:
+            services.append(self._exchange_cache)
+        for service in services:
+            service.stop()
+        self._pool.shutdown(wait=False)
+        for service in services:
+            service.join(timeout)
+        self.session.close()
     
     def _generate_signature(self, params: Dict[str, Any]) -> str:
         """Generate HMAC SHA256 signature required by Binance."""
-        query_string = urlencode(params)
-        return hmac.new(
-            self.api_secret.encode("utf-8"),
-            query_string.encode("utf-8"),
-            hashlib.sha256
-        ).hexdigest()
+        return sign_params(self.api_secret, params)
     
-    def _request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, signed: bool = False) -> Dict[str, Any]:
+    def _request(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, signed: bool = False,
+                 priority: Optional[int] = None, retry: Optional[bool] = None) -> Dict[str, Any]:
         """
         Internal method to make API calls.
         Handles signing for authenticated endpoints.
+        
+        Every call goes through the rate limiter first. priority defaults to
+        one picked from the request (cancels first, data polls last).
+        
+        Signed requests are timestamped with the server clock estimate. If
+        Binance still says the timestamp is off (-1021), the clock is
+        re-synced and the request is sent once more.
+        
+        Transient failures (timeouts, 5xx, 429, -1001) are retried with
+        backoff when retry is True - the default for GET and DELETE, which
+        are safe to repeat. Orders are retried by place_order instead.
         """
         url = f"{self.base_url}{endpoint}"
         params = params or {}
         
+        if priority is None:
+            priority = request_priority(method, endpoint, params)
+        if retry is None:
+            retry = method in ("GET", "DELETE")
+        max_attempts = self.retry_policy.max_attempts if retry else 1
+        
+        attempt = 0
+        clock_resynced = False
+        while True:
+            try:
+                return self._send(method, url, endpoint, params, signed, priority)
+            except requests.exceptions.RequestException as e:
+                if signed and not clock_resynced and error_code(e) == -1021:
+                    logger.warning("Timestamp outside recvWindow - re-syncing clock and retrying")
+                    self.time_sync.sync()
+                    clock_resynced = True
+                    continue
+                attempt += 1
+                if attempt >= max_attempts or not is_transient(e):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                logger.warning("Retrying %s in %.2fs (attempt %d/%d)", endpoint, delay, attempt + 1, max_attempts)
+                time.sleep(delay)
+    
+    def _send(self, method: str, url: str, endpoint: str, params: Dict[str, Any], signed: bool,
+              priority: int) -> Dict[str, Any]:
+        """Sign (if needed) and send one request."""
+        timer = self.metrics.timer(endpoint)
+        self.rate_limiter.acquire(*request_cost(method, endpoint, params), priority=priority)
+        timer.mark("rate_limit")
+        
         if signed:
-            params["timestamp"] = int(time.time() * 1000)
+            params.pop("signature", None)
+            params.setdefault("recvWindow", self.recv_window)
+            params["timestamp"] = self.time_sync.now_ms()
             params["signature"] = self._generate_signature(params)
+            timer.mark("sign")
         
+        started = time.perf_counter()
         try:
             response = self.session.request(method, url, params=params, timeout=10)
+            # requests stops the elapsed clock once the headers are in
+            timer.mark_response(int(response.elapsed.total_seconds() * 1e9))
+            self.rate_limiter.update_from_headers(response.headers)
+            if response.status_code in (418, 429):
+                self.rate_limiter.on_rate_limited(response.status_code, response.headers.get("Retry-After"))
             response.raise_for_status()
-            return response.json()
+            data = response.json()
+            timer.mark("decode")
+            if self.journal is not None:
+                self.journal.record_request(method, endpoint, params, data,
+                                            int((time.perf_counter() - started) * 1e6), response.status_code)
+                timer.mark("journal")
+            self.orders.record_response(method, endpoint, params, data, started)
+            timer.done()
+            return data
         except requests.exceptions.RequestException as e:
-            logger.error(f"Request to {endpoint} failed: {e}")
+            if self.journal is not None:
+                status = e.response.status_code if getattr(e, "response", None) is not None else 0
+                self.journal.record_request(method, endpoint, params, batch_error(e),
+                                            int((time.perf_counter() - started) * 1e6), status)
+            self.orders.record_error(method, endpoint, params, e)
+            logger.error("Request to %s failed: %s", endpoint, e)
             # Try to log the actual error from Binance if available
             if hasattr(e, "response") and e.response is not None:
                 try:
                     error_data = e.response.json()
-                    logger.error(f"Binance error: {error_data}")
+                    logger.error("Binance error: %s", error_data)
                 except Exception:
-                    logger.error(f"Response text: {e.response.text}")
+                    logger.error("Response text: %s", e.response.text)
             raise
     
+    def ping(self) -> None:
+        """Cheapest possible request (weight 1) - used to open and keep connections."""
+        self._request("GET", "/fapi/v1/ping")
+    
+    def get_server_time(self) -> int:
+        """Get the exchange clock in milliseconds."""
+        return self._request("GET", "/fapi/v1/time")["serverTime"]
+    
     def get_exchange_info(self, symbol: Optional[str] = None) -> Dict[str, Any]:
         """
         Get exchange trading rules and symbol information.
@@ -95,32 +362,502 @@ class BinanceClient:
             params["symbol"] = symbol
         return self._request("GET", "/fapi/v1/exchangeInfo", params=params)
     
+    @property
+    def exchange_cache(self) -> ExchangeInfoCache:
+        """Cached exchange rules, loaded from disk on first use."""
+        if self._exchange_cache is None:
+            self._exchange_cache = ExchangeInfoCache(self)
+        return self._exchange_cache
+    
+    def get_leverage_brackets(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the notional brackets (max leverage, maintenance margin ratio) per symbol.
+        
+        Args:
+            symbol: Optional symbol to filter
+            
+        Returns:
+            List of {"symbol", "brackets": [{"initialLeverage", "notionalFloor",
+            "notionalCap", "maintMarginRatio", "cum"}, ...]}
+        """
+        params = {"symbol": symbol} if symbol else {}
+        response = self._request("GET", "/fapi/v1/leverageBracket", params=params, signed=True)
+        # A single symbol comes back as one object rather than a list
+        return response if isinstance(response, list) else [response]
+    
+    @property
+    def leverage_brackets(self) -> LeverageBracketCache:
+        """Cached leverage brackets, loaded from disk on first use."""
+        if self._leverage_brackets is None:
+            self._leverage_brackets = LeverageBracketCache(self)
+        return self._leverage_brackets
+    
+    def get_symbol_filters(self, symbol: str) -> SymbolFilters:
+        """
+        Get tick size, step size, min qty/notional etc. for a symbol.
+        Served from the exchange info cache - no network call while it's fresh.
+        
+        Raises:
+            ValueError: If the symbol isn't listed on the exchange
+        """
+        return self.exchange_cache[symbol]
+    
     def place_order(self, symbol: str, side: str, order_type: str, quantity: float, 
-                    price: Optional[float] = None, time_in_force: str = "GTC", **kwargs) -> Dict[str, Any]:
+                    price: Optional[float] = None, time_in_force: str = "GTC",
+                    validate: bool = False, **kwargs) -> Dict[str, Any]:
         """
         Place an order on Binance Futures.
         This is the main method used by all order types.
+        
+        With validate=True the quantity and price are snapped to the symbol's
+        step/tick size and checked against the exchange filters first, so
+        orders that would be rejected fail locally with a ValueError.
+        
+        Every order gets a deterministic newClientOrderId (unless one is
+        passed in). Transient failures are retried with backoff, and when a
+        failure leaves it unclear whether the order landed, the order is
+        looked up by that ID before anything is sent again.
+        
+        Orders that break a risk limit (see risk.py) raise RiskError, a
+        ValueError, before anything is sent.
         """
-        params = {
-            "symbol": symbol,
-            "side": side,
-            "type": order_type,
-            "quantity": quantity,
-            **kwargs
-        }
-        
-        # Limit orders need a price
-        if order_type == "LIMIT":
-            if price is None:
-                raise ValueError("Price is required for LIMIT orders")
-            params["price"] = price
-            params["timeInForce"] = time_in_force
-        
-        logger.info(f"Placing {order_type} order: {symbol} {side} {quantity}" + (f" @ {price}" if price else ""))
-        response = self._request("POST", "/fapi/v1/order", params=params, signed=True)
-        logger.info(f"Order placed - ID: {response.get('orderId')}")
+        timer = self.metrics.timer("/fapi/v1/order")
+        if validate:
+            quantity, price = apply_symbol_filters(self.get_symbol_filters(symbol), side, order_type, quantity, price)
+        
+        # Checked and recorded under one lock so concurrent orders can't share headroom
+        with self.risk.lock:
+            quantity, price = self._check_risk(symbol, side, order_type, quantity, price, validate,
+                                               str(kwargs.get("reduceOnly", "")).lower() == "true")
+            params = build_order_params(symbol, side, order_type, quantity, price, time_in_force, **kwargs)
+            params.setdefault("newClientOrderId", self._next_client_order_id(params))
+            self.orders.submitted(params)
+        timer.mark("validate")
+        
+        logger.info("Placing %s order: %s %s %s%s", order_type, symbol, side, quantity, f" @ {price}" if price else "")
+        timer.mark("log")
+        response = self._place_with_retry(params)
+        timer.restart()
+        logger.info("Order placed - ID: %s", response.get("orderId"))
+        timer.mark("log")
         return response
     
+    def _check_risk(self, symbol: str, side: str, order_type: str, quantity: Any, price: Any, validate: bool,
+                    reduce_only: bool = False) -> Tuple[Any, Any]:
+        """Risk check one new order. Orders are only clipped when validating, so the smaller size can be snapped."""
+        checked = self.risk.check(symbol, side, quantity, price, reduce_only=reduce_only,
+                                  clip=self.risk.limits.clip and validate)
+        if checked is not quantity:
+            quantity, price = apply_symbol_filters(self.get_symbol_filters(symbol), side, order_type, checked, price)
+        return quantity, price
+    
+    def _mid_price(self, symbol: str) -> float:
+        """Middle of the book - the risk engine's price for a symbol it hasn't seen yet."""
+        book = self.get_depth(symbol, limit=5)
+        return (float(book["bids"][0][0]) + float(book["asks"][0][0])) / 2
+    
+    def _next_client_order_id(self, params: Dict[str, Any]) -> str:
+        return make_client_order_id(params)
+    
+    def _place_with_retry(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a new order, retrying without ever placing it twice."""
+        symbol, client_order_id = params["symbol"], params["newClientOrderId"]
+        max_attempts = self.retry_policy.max_attempts
+        
+        attempt = 0
+        while True:
+            try:
+                return self._request("POST", "/fapi/v1/order", params=dict(params), signed=True, retry=False)
+            except requests.exceptions.RequestException as e:
+                attempt += 1
+                if attempt >= max_attempts or not is_transient(e):
+                    logger.error("Giving up on order %s", client_order_id)
+                    raise
+                time.sleep(self.retry_policy.delay(attempt))
+                if is_ambiguous(e):
+                    # The order may have landed - resending blindly could double-fill
+                    existing = self._lookup_order(symbol, client_order_id)
+                    if existing is not None:
+                        logger.info("Order %s reached the exchange - not resending", client_order_id)
+                        return existing
+                logger.warning("Resending order %s (attempt %d/%d)", client_order_id, attempt + 1, max_attempts)
+                self.orders.submitted(params)
+    
+    def _lookup_order(self, symbol: str, client_order_id: str) -> Optional[Dict[str, Any]]:
+        """Find an order by client ID, or None if the exchange never got it."""
+        try:
+            return self.get_order(symbol, orig_client_order_id=client_order_id)
+        except requests.exceptions.HTTPError as e:
+            if error_code(e) == ORDER_DOES_NOT_EXIST:
+                return None
+            raise
+    
+    def get_order(self, symbol: str, order_id: Optional[int] = None,
+                  orig_client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the status of an order.
+        
+        Args:
+            symbol: Trading pair symbol
+            order_id: Exchange order ID
+            orig_client_order_id: Our client order ID (either one is enough)
+            
+        Returns:
+            Order information
+        """
+        if order_id is None and orig_client_order_id is None:
+            raise ValueError("Either order_id or orig_client_order_id is required")
+        params: Dict[str, Any] = {"symbol": symbol}
+        if order_id is not None:
+            params["orderId"] = order_id
+        if orig_client_order_id is not None:
+            params["origClientOrderId"] = orig_client_order_id
+        return self._request("GET", "/fapi/v1/order", params=params, signed=True)
+    
+    def cancel_order(self, symbol: str, order_id: Optional[int] = None,
+                     orig_client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Cancel an open order.
+        
+        Cancels jump the rate limiter queue and are retried on transient
+        errors. A retry can find the order already gone, which Binance
+        reports as -2011.
+        
+        Args:
+            symbol: Trading pair symbol
+            order_id: Exchange order ID
+            orig_client_order_id: Our client order ID (either one is enough)
+            
+        Returns:
+            The cancelled order
+        """
+        if order_id is None and orig_client_order_id is None:
+            raise ValueError("Either order_id or orig_client_order_id is required")
+        params: Dict[str, Any] = {"symbol": symbol}
+        if order_id is not None:
+            params["orderId"] = order_id
+        if orig_client_order_id is not None:
+            params["origClientOrderId"] = orig_client_order_id
+        logger.info("Cancelling order %s on %s", order_id or orig_client_order_id, symbol)
+        return self._request("DELETE", "/fapi/v1/order", params=params, signed=True)
+    
+    def cancel_orders(self, symbol: str, order_ids: Optional[List[int]] = None,
+                      client_order_ids: Optional[List[str]] = None, max_workers: int = 4) -> List[Dict[str, Any]]:
+        """
+        Cancel several orders on one symbol through DELETE /fapi/v1/batchOrders.
+        
+        IDs go out BATCH_CANCEL_LIMIT per request (weight 1 each), with the
+        requests sent in parallel. Like cancel_order they're retried on
+        transient errors, so an order cancelled by an earlier attempt
+        comes back as -2011.
+        
+        Args:
+            symbol: Trading pair symbol
+            order_ids: Exchange order IDs
+            client_order_ids: Our client order IDs (instead of order_ids)
+            max_workers: How many requests to send at once
+            
+        Returns:
+            One entry per ID, in input order - the cancelled order or a
+            Binance style error dict
+        """
+        if (order_ids is None) == (client_order_ids is None):
+            raise ValueError("Pass either order_ids or client_order_ids")
+        ids = list(order_ids if order_ids is not None else client_order_ids)
+        key = "orderIdList" if order_ids is not None else "origClientOrderIdList"
+        chunks = [ids[start:start + BATCH_CANCEL_LIMIT] for start in range(0, len(ids), BATCH_CANCEL_LIMIT)]
+        
+        def send(chunk: List[Any]) -> List[Dict[str, Any]]:
+            try:
+                return self._request("DELETE", "/fapi/v1/batchOrders", signed=True,
+                                     params={"symbol": symbol, key: json.dumps(chunk, separators=(",", ":"))})
+            except requests.exceptions.RequestException as e:
+                return [batch_error(e)] * len(chunk)
+        
+        logger.info("Cancelling %d orders on %s", len(ids), symbol)
+        return [result for chunk_results in self._in_parallel(send, chunks, max_workers) for result in chunk_results]
+    
+    def cancel_all(self, symbol: str) -> Dict[str, Any]:
+        """
+        Cancel every open order on a symbol (DELETE /fapi/v1/allOpenOrders, weight 1).
+        
+        Returns:
+            Binance's {"code": 200, "msg": ...} acknowledgement
+        """
+        logger.info("Cancelling all open orders on %s", symbol)
+        return self._request("DELETE", "/fapi/v1/allOpenOrders", params={"symbol": symbol}, signed=True)
+    
+    def modify_order(self, symbol: str, side: str, quantity: Any, price: Any, order_id: Optional[int] = None,
+                     orig_client_order_id: Optional[str] = None, validate: bool = False) -> Dict[str, Any]:
+        """
+        Change the price and/or quantity of an open LIMIT order in place.
+        
+        One request instead of a cancel plus a new order, and the order
+        keeps its IDs. Binance sends it to the back of the queue when the
+        price changes or the quantity goes up; a smaller quantity at the
+        same price keeps its place. Not retried - if nothing changed,
+        Binance answers -5027.
+        
+        Args:
+            symbol: Trading pair symbol
+            side: The order's side (can't be changed)
+            quantity: New total quantity, including anything already filled
+            price: New limit price
+            order_id: Exchange order ID
+            orig_client_order_id: Our client order ID (either one is enough)
+            validate: Snap and check against the exchange filters first
+            
+        Returns:
+            The modified order
+        """
+        params = self._modify_params(symbol, side, quantity, price, order_id, orig_client_order_id, validate)
+        logger.info("Modifying order %s on %s: %s @ %s", order_id or orig_client_order_id, symbol,
+                    params["quantity"], params["price"])
+        return self._request("PUT", "/fapi/v1/order", params=params, signed=True, retry=False)
+    
+    def _modify_params(self, symbol: str, side: str, quantity: Any, price: Any, order_id: Optional[int],
+                       orig_client_order_id: Optional[str], validate: bool) -> Dict[str, str]:
+        if order_id is None and orig_client_order_id is None:
+            raise ValueError("Either order_id or orig_client_order_id is required")
+        if validate:
+            quantity, price = apply_symbol_filters(self.get_symbol_filters(symbol), side, "LIMIT", quantity, price)
+        if self.risk.limits.enabled:
+            # Only a bigger order adds exposure - the tracker knows how big it is now
+            record = self.orders.by_order_id(order_id) if order_id is not None else self.orders.get(orig_client_order_id)
+            added = float(quantity) - (record.orig_qty if record is not None else 0.0)
+            if added > 0:
+                self.risk.check(symbol, side, added, price, clip=False)
+        params: Dict[str, Any] = {"symbol": symbol, "side": side, "quantity": quantity, "price": price}
+        if order_id is not None:
+            params["orderId"] = order_id
+        if orig_client_order_id is not None:
+            params["origClientOrderId"] = orig_client_order_id
+        return {key: format_decimal(value) if isinstance(value, Decimal) else str(value)
+                for key, value in params.items()}
+    
+    def modify_orders(self, modifications: List[Dict[str, Any]], max_workers: int = 4,
+                      validate: bool = False) -> List[Dict[str, Any]]:
+        """
+        Modify several orders through PUT /fapi/v1/batchOrders.
+        
+        Split into chunks of BATCH_ORDER_LIMIT that are sent in parallel,
+        like place_orders. Not retried (see modify_order).
+        
+        Args:
+            modifications: Dicts with the modify_order arguments (symbol,
+                           side, quantity, price and order_id or
+                           orig_client_order_id)
+            max_workers: How many chunks to send at once
+            validate: Snap and check every entry first
+            
+        Returns:
+            One entry per modification, in input order - the modified order
+            or a Binance style error dict
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(modifications)
+        pending: List[Tuple[int, Dict[str, str]]] = []
+        for index, entry in enumerate(modifications):
+            try:
+                pending.append((index, self._modify_params(entry["symbol"], entry["side"], entry["quantity"],
+                                                           entry["price"], entry.get("order_id"),
+                                                           entry.get("orig_client_order_id"), validate)))
+            except RiskError as e:
+                results[index] = {"code": -2010, "msg": str(e)}
+            except (KeyError, ValueError) as e:
+                results[index] = {"code": -1013 if validate else -1102, "msg": str(e)}
+        chunks = [pending[start:start + BATCH_ORDER_LIMIT] for start in range(0, len(pending), BATCH_ORDER_LIMIT)]
+        
+        def send(chunk: List[Tuple[int, Dict[str, str]]]) -> List[Tuple[int, Dict[str, Any]]]:
+            try:
+                response = self._request("PUT", "/fapi/v1/batchOrders", signed=True, retry=False,
+                                         params={"batchOrders": encode_batch_orders([p for _, p in chunk])})
+            except requests.exceptions.RequestException as e:
+                response = [batch_error(e)] * len(chunk)
+            return [(index, result) for (index, _), result in zip(chunk, response)]
+        
+        logger.info("Modifying %d orders in %d batch(es)", len(pending), len(chunks))
+        for chunk_results in self._in_parallel(send, chunks, max_workers):
+            for index, result in chunk_results:
+                results[index] = result
+        return results
+    
+    def _in_parallel(self, func: Callable[[Any], Any], chunks: List[Any], max_workers: int) -> List[Any]:
+        """
+        func(chunk) for every chunk, up to max_workers at a time, on the
+        client's shared pool. The calling thread works through chunks too
+        and takes back any the pool hasn't started yet, so a call made from
+        a pool thread (requote -> place_orders) can't deadlock.
+        """
+        results = []
+        step = max(1, max_workers)
+        for start in range(0, len(chunks), step):
+            wave = chunks[start:start + step]
+            futures = [self._pool.submit(func, chunk) for chunk in wave[1:]]
+            results.append(func(wave[0]))
+            for future, chunk in zip(futures, wave[1:]):
+                results.append(func(chunk) if future.cancel() else future.result())
+        return results
+    
+    def requote(self, symbol: str, quotes: List[Quote], validate: bool = False, time_in_force: str = "GTC",
+                open_orders: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        Make our resting LIMIT orders on a symbol match a set of quotes
+        with as few requests as possible (see requote.plan_requote).
+        
+        Orders that already match are left alone, the rest are amended in
+        place where possible, and only leftovers are cancelled or created.
+        Cancels go first to free up margin, then amends and new orders go
+        out at the same time, all in batches.
+        
+        Args:
+            symbol: Trading pair symbol
+            quotes: Wanted orders as Quote(side, price, quantity) - quantity
+                    is what should be left open at that price
+            validate: Snap quotes to the tick/step size and check the
+                      exchange filters first (a bad quote raises ValueError)
+            time_in_force: For new orders
+            open_orders: Our current orders (default: the local order state,
+                         so no request is needed)
+            
+        Returns:
+            Dict with the plan and the results of each kind of action
+            ("cancelled", "amended", "created")
+        """
+        if validate:
+            filters = self.get_symbol_filters(symbol)
+            snapped = []
+            for quote in quotes:
+                quantity, price = apply_symbol_filters(filters, quote.side, "LIMIT", quote.quantity, quote.price)
+                snapped.append(Quote(quote.side, price, quantity))
+            quotes = snapped
+        if open_orders is None:
+            open_orders = self.orders.open_orders(symbol)
+        plan = plan_requote(symbol, quotes, open_orders, time_in_force)
+        logger.info("Requote %s: %d kept, %d amend, %d cancel, %d new", symbol, len(plan.keep), len(plan.amend),
+                    len(plan.cancel), len(plan.create))
+        
+        result: Dict[str, Any] = {"plan": plan, "cancelled": [], "amended": [], "created": []}
+        if plan.cancel:
+            result["cancelled"] = self.cancel_orders(symbol, order_ids=[order.order_id for order in plan.cancel])
+        if plan.amend and plan.create:
+            result["amended"], result["created"] = self._in_parallel(
+                lambda send: send(), [lambda: self.modify_orders(plan.amend), lambda: self.place_orders(plan.create)], 2)
+        elif plan.amend:
+            result["amended"] = self.modify_orders(plan.amend)
+        elif plan.create:
+            result["created"] = self.place_orders(plan.create)
+        return result
+    
+    def place_orders(self, orders: List[Dict[str, Any]], max_workers: int = 4,
+                     validate: bool = False) -> List[Dict[str, Any]]:
+        """
+        Place several orders through /fapi/v1/batchOrders.
+        
+        Orders are split into chunks of BATCH_ORDER_LIMIT and the chunks
+        are sent in parallel, so a 40 order ladder costs 8 requests that
+        go out at the same time instead of 40 one after the other.
+        Retries work like place_order: on an ambiguous failure only the
+        orders that can't be found by client ID are sent again.
+        
+        Args:
+            orders: List of dicts with the same keys as place_order
+                    (symbol, side, order_type, quantity, price, ...)
+            max_workers: How many chunks to send at once
+            validate: Snap and check every order against the exchange
+                      filters first (see place_order)
+            
+        Returns:
+            One entry per input order, in input order. Successful orders
+            are the normal order response, failed ones are a Binance
+            style error dict with "code" and "msg".
+        """
+        filter_errors: Dict[int, str] = {}
+        if validate:
+            checked, filter_errors = validate_orders(orders, self.get_symbol_filters)
+            # Rejected orders keep their slot (as None) but are never sent
+            orders = checked
+        
+        risk_errors: Dict[int, str] = {}
+        with self.risk.lock:
+            if self.risk.limits.enabled:
+                orders = list(orders)
+                for index, order in enumerate(orders):
+                    if order is None:
+                        continue
+                    try:
+                        quantity, price = self._check_risk(
+                            order["symbol"], order["side"], order["order_type"], order["quantity"],
+                            order.get("price"), validate, str(order.get("reduceOnly", "")).lower() == "true")
+                    except KeyError:
+                        # Malformed - prepare_order_batches reports it
+                        continue
+                    except ValueError as e:
+                        risk_errors[index] = str(e)
+                        orders[index] = None
+                    else:
+                        orders[index] = dict(order, quantity=quantity, price=price)
+            results, chunks = prepare_order_batches(orders, client_order_id=self._next_client_order_id)
+            for _, chunk in chunks:
+                for params in chunk:
+                    self.orders.submitted(params)
+        for index, message in filter_errors.items():
+            results[index] = {"code": -1013, "msg": message}
+        for index, message in risk_errors.items():
+            results[index] = {"code": -2010, "msg": message}
+        
+        logger.info("Placing %d orders in %d batch(es)", len(orders), len(chunks))
+        responses = self._in_parallel(lambda chunk: self._send_batch_with_retry(*chunk), chunks, max_workers)
+        
+        for chunk_results in responses:
+            for index, result in chunk_results.items():
+                results[index] = result
+        
+        failed = sum(1 for result in results if "code" in result)
+        logger.info("Batch done - %d placed, %d failed", len(orders) - failed, failed)
+        return results
+    
+    def _send_batch_with_retry(self, indices: List[int], chunk: List[Dict[str, str]]) -> Dict[int, Dict[str, Any]]:
+        """Send one batchOrders chunk. Returns results keyed by input index."""
+        chunk_results: Dict[int, Dict[str, Any]] = {}
+        remaining = list(zip(indices, chunk))
+        max_attempts = self.retry_policy.max_attempts
+        
+        for attempt in range(1, max_attempts + 1):
+            try:
+                response = self._request("POST", "/fapi/v1/batchOrders", signed=True, retry=False,
+                                         params={"batchOrders": encode_batch_orders([p for _, p in remaining])})
+                for (index, _), result in zip(remaining, response):
+                    chunk_results[index] = result
+                return chunk_results
+            except requests.exceptions.RequestException as e:
+                if attempt >= max_attempts or not is_transient(e):
+                    for index, _ in remaining:
+                        chunk_results[index] = batch_error(e)
+                    return chunk_results
+                time.sleep(self.retry_policy.delay(attempt))
+                if not is_ambiguous(e):
+                    continue
+                
+                # Only resend the orders that didn't make it
+                still_missing = []
+                for index, params in remaining:
+                    try:
+                        existing = self._lookup_order(params["symbol"], params["newClientOrderId"])
+                    except requests.exceptions.RequestException as lookup_error:
+                        chunk_results[index] = {
+                            "code": -1007,
+                            "msg": f"Status unknown for {params['newClientOrderId']}: {lookup_error}"
+                        }
+                        continue
+                    if existing is None:
+                        still_missing.append((index, params))
+                    else:
+                        chunk_results[index] = existing
+                remaining = still_missing
+                if not remaining:
+                    return chunk_results
+        return chunk_results
+    
     def get_account_info(self) -> Dict[str, Any]:
         """
         Get account information.
@@ -144,3 +881,97 @@ class BinanceClient:
         if symbol:
             params["symbol"] = symbol
         return self._request("GET", "/fapi/v2/positionRisk", params=params, signed=True)
+    
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get all open orders, or just the ones for one symbol.
+        Without a symbol this costs 40 weight, so pass one when you can.
+        """
+        params = {}
+        if symbol:
+            params["symbol"] = symbol
+        return self._request("GET", "/fapi/v1/openOrders", params=params, signed=True)
+    
+    def get_depth(self, symbol: str, limit: int = 1000) -> Dict[str, Any]:
+        """
+        Get an order book snapshot.
+        
+        Args:
+            symbol: Trading pair symbol
+            limit: Levels per side (5, 10, 20, 50, 100, 500 or 1000) - weight
+                   goes from 2 up to 20 with the limit
+            
+        Returns:
+            Dict with lastUpdateId, bids and asks ([[price, qty], ...])
+        """
+        return self._request("GET", "/fapi/v1/depth", params={"symbol": symbol, "limit": limit})
+    
+    def get_klines(self, symbol: str, interval: str, start_time: Optional[int] = None,
+                   end_time: Optional[int] = None, limit: int = 500) -> List[List[Any]]:
+        """
+        Get candlesticks.
+        
+        Args:
+            symbol: Trading pair symbol
+            interval: Kline interval (1m, 5m, 1h, 1d, ...)
+            start_time: Open time of the first bar (ms)
+            end_time: Latest open time to include (ms)
+            limit: Bars to return, up to 1500 (weight 1 below 100, up to 10 above 1000)
+            
+        Returns:
+            Rows of [open time, open, high, low, close, volume, close time, ...]
+        """
+        params: Dict[str, Any] = {"symbol": symbol, "interval": interval, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = start_time
+        if end_time is not None:
+            params["endTime"] = end_time
+        return self._request("GET", "/fapi/v1/klines", params=params)
+    
+    def get_ticker_24hr(self, symbol: Optional[str] = None) -> Any:
+        """
+        Get 24hr price change statistics.
+        
+        Args:
+            symbol: One symbol (weight 1) - every symbol when omitted (weight 40)
+            
+        Returns:
+            One ticker dict, or a list with one per symbol
+        """
+        return self._request("GET", "/fapi/v1/ticker/24hr", params={"symbol": symbol} if symbol else {})
+    
+    def get_premium_index(self, symbol: Optional[str] = None) -> Any:
+        """
+        Get mark price, index price and funding rate.
+        
+        Args:
+            symbol: One symbol (weight 1) - every symbol when omitted (weight 10)
+            
+        Returns:
+            One premium index dict, or a list with one per symbol
+        """
+        return self._request("GET", "/fapi/v1/premiumIndex", params={"symbol": symbol} if symbol else {})
+    
+    def get_book_ticker(self, symbol: Optional[str] = None) -> Any:
+        """
+        Get the best bid and ask.
+        
+        Args:
+            symbol: One symbol (weight 2) - every symbol when omitted (weight 5)
+            
+        Returns:
+            One book ticker dict, or a list with one per symbol
+        """
+        return self._request("GET", "/fapi/v1/ticker/bookTicker", params={"symbol": symbol} if symbol else {})
+    
+    def create_listen_key(self) -> str:
+        """Start a user data stream (or get the current one). Needs only the API key."""
+        return self._request("POST", "/fapi/v1/listenKey", retry=True)["listenKey"]
+    
+    def keepalive_listen_key(self) -> None:
+        """Extend the user data stream for another 60 minutes."""
+        self._request("PUT", "/fapi/v1/listenKey", retry=True)
+    
+    def close_listen_key(self) -> None:
+        """Close the user data stream."""
+        self._request("DELETE", "/fapi/v1/listenKey")
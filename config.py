@@ -3,7 +3,12 @@ Configuration loaded from environment variables.
 Keeps API keys out of the codebase.
 """
 import os
-from typing import Optional
+from typing import Dict, Optional
+
+
+def _optional_float(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
 
 
 class Config:
@@ -14,14 +19,81 @@ class Config:
         self.api_secret: Optional[str] = os.getenv("BINANCE_API_SECRET")
         # Default to testnet unless explicitly set to false
         self.testnet: bool = os.getenv("BINANCE_TESTNET", "true").lower() == "true"
+        # Where exchange info and other caches are kept between runs
+        self.cache_dir: str = os.getenv("BINANCE_CACHE_DIR", ".cache")
+        # How long cached exchange rules are trusted (seconds)
+        self.exchange_info_ttl: float = float(os.getenv("BINANCE_EXCHANGE_INFO_TTL", "3600"))
+        # Same for leverage brackets (portfolio.py), which change even less often
+        self.leverage_bracket_ttl: float = float(os.getenv("BINANCE_LEVERAGE_BRACKET_TTL", "86400"))
+        # Seconds between market scanner refreshes (scanner.py)
+        self.scan_interval: float = float(os.getenv("BINANCE_SCAN_INTERVAL", "5"))
+        # How long (ms) a signed request stays valid after its timestamp
+        self.recv_window: int = int(os.getenv("BINANCE_RECV_WINDOW", "5000"))
+        # HTTP connections: sockets kept per host, how many to open up front and
+        # keep alive, seconds between keep-alive checks, and DNS cache lifetime
+        self.pool_size: int = int(os.getenv("BINANCE_POOL_SIZE", "16"))
+        self.warm_connections: int = int(os.getenv("BINANCE_WARM_CONNECTIONS", "2"))
+        self.keepalive_interval: float = float(os.getenv("BINANCE_KEEPALIVE_INTERVAL", "30"))
+        self.dns_ttl: float = float(os.getenv("BINANCE_DNS_TTL", "60"))
+        # Seconds between checks of our open orders against the exchange
+        self.reconcile_interval: float = float(os.getenv("BINANCE_RECONCILE_INTERVAL", "60"))
+        # Pre-trade risk limits (risk.py) - unset means no limit. Notional is in USDT,
+        # position/gross limits count every open order as if it filled, and
+        # BINANCE_RISK_SYMBOL_LIMITS overrides the position limit per symbol
+        # ("BTCUSDT:50000,ETHUSDT:20000")
+        self.risk_max_order_notional: Optional[float] = _optional_float("BINANCE_RISK_MAX_ORDER_NOTIONAL")
+        self.risk_max_position_notional: Optional[float] = _optional_float("BINANCE_RISK_MAX_POSITION_NOTIONAL")
+        self.risk_max_gross_notional: Optional[float] = _optional_float("BINANCE_RISK_MAX_GROSS_NOTIONAL")
+        self.risk_max_open_orders: Optional[int] = int(os.environ["BINANCE_RISK_MAX_OPEN_ORDERS"]) if os.getenv("BINANCE_RISK_MAX_OPEN_ORDERS") else None
+        self.risk_max_orders_per_second: Optional[float] = _optional_float("BINANCE_RISK_MAX_ORDERS_PER_SEC")
+        self.risk_symbol_limits: Dict[str, float] = {
+            symbol.strip().upper(): float(limit)
+            for symbol, _, limit in (item.partition(":") for item in os.getenv("BINANCE_RISK_SYMBOL_LIMITS", "").split(","))
+            if limit
+        }
+        # Cut orders down to what fits instead of rejecting them
+        self.risk_clip: bool = os.getenv("BINANCE_RISK_CLIP", "false").lower() == "true"
+        # Unix socket the order daemon listens on (daemon.py)
+        self.daemon_socket: str = os.getenv("BINANCE_DAEMON_SOCKET", os.path.join(self.cache_dir, "daemon.sock"))
+        # Where downloaded market history (klines) is stored
+        self.data_dir: str = os.getenv("BINANCE_DATA_DIR", "data")
+        # Trade journal file - set BINANCE_JOURNAL to an empty string to switch it off
+        self.journal_path: str = os.getenv("BINANCE_JOURNAL", os.path.join(self.data_dir, "journal.bin"))
+        # bot.log rotation - whichever limit is hit first starts a new file
+        self.log_max_bytes: int = int(os.getenv("BINANCE_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+        self.log_rotate_hours: float = float(os.getenv("BINANCE_LOG_ROTATE_HOURS", "24"))
+        self.log_backups: int = int(os.getenv("BINANCE_LOG_BACKUPS", "5"))
+        # "text" or "json" (one JSON object per line)
+        self.log_format: str = os.getenv("BINANCE_LOG_FORMAT", "text").lower()
+        # Per-stage request latency histograms, and the port to serve them on
+        self.metrics_enabled: bool = os.getenv("BINANCE_METRICS", "true").lower() == "true"
+        self.metrics_port: Optional[int] = int(os.environ["BINANCE_METRICS_PORT"]) if os.getenv("BINANCE_METRICS_PORT") else None
         
     @property
     def base_url(self) -> str:
         """Get the right API endpoint based on testnet setting."""
+        # Explicit override, e.g. the local mock server
+        override = os.getenv("BINANCE_BASE_URL")
+        if override:
+            return override.rstrip("/")
         if self.testnet:
             return "https://testnet.binancefuture.com"
         return "https://fapi.binance.com"
     
+    @property
+    def ws_url(self) -> str:
+        """Websocket endpoint for market and user data streams."""
+        return self.ws_url_for(self.testnet)
+    
+    def ws_url_for(self, testnet: bool) -> str:
+        """Websocket endpoint for a client that may not use the env testnet setting."""
+        override = os.getenv("BINANCE_WS_URL")
+        if override:
+            return override.rstrip("/")
+        if testnet:
+            return "wss://stream.binancefuture.com"
+        return "wss://fstream.binance.com"
+    
     def validate(self) -> None:
         """Make sure we have the required API credentials."""
         if not self.api_key:
@@ -0,0 +1,252 @@
+"""
+HTTP connection management for BinanceClient.
+Sizes the connection pool, caches DNS answers, opens connections before
+the first order and keeps them from going idle, and counts how often a
+request got a warm socket.
+"""
+import ipaddress
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Handle both direct execution and module execution
+try:
+    from .config import config
+    from .logger import logger
+except ImportError:
+    from config import config
+    from logger import logger
+
+
+class DnsCache:
+    """
+    getaddrinfo results per (host, port), reused for ttl seconds.
+
+    Expired entries are looked up again on next use. If that lookup fails
+    the old address is kept - a DNS hiccup shouldn't stop orders going to
+    an address that worked a minute ago. refresh() re-resolves everything
+    in the background so connects don't have to wait for it.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int], Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    def resolve(self, host: str, port: int) -> Optional[str]:
+        """Address to connect to, or None to leave it to the normal resolver."""
+        if self.ttl <= 0 or _is_ip(host):
+            return None
+        key = (host, port)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            self.hits += 1
+            return entry[0]
+        address = self._lookup(host, port)
+        if address is not None:
+            return address
+        return entry[0] if entry is not None else None
+
+    def _lookup(self, host: str, port: int) -> Optional[str]:
+        self.lookups += 1
+        try:
+            address = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0][4][0]
+        except OSError as e:
+            logger.warning("DNS lookup for %s failed: %s", host, e)
+            return None
+        with self._lock:
+            self._entries[(host, port)] = (address, time.monotonic())
+        return address
+
+    def forget(self, host: str, port: int) -> None:
+        """Drop an address that didn't work."""
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def refresh(self) -> None:
+        with self._lock:
+            keys = list(self._entries)
+        for host, port in keys:
+            self._lookup(host, port)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hosts": len(self._entries), "lookups": self.lookups, "hits": self.hits}
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+# DNS is per process, so the cache is too
+dns_cache = DnsCache(ttl=config.dns_ttl)
+
+
+class _CachedDnsMixin:
+    """
+    Opens the socket to the cached address. Only the TCP connect uses it -
+    TLS (SNI, certificate check) and the Host header still see the name.
+    """
+
+    def _new_conn(self):
+        host = self._dns_host
+        address = dns_cache.resolve(host, self.port)
+        if address is None:
+            return super()._new_conn()
+        self._dns_host = address
+        try:
+            return super()._new_conn()
+        except (OSError, HTTPError):
+            # The cached address may be gone - look it up again and retry once
+            dns_cache.forget(host, self.port)
+            self._dns_host = host
+            return super()._new_conn()
+        finally:
+            self._dns_host = host
+
+
+class _CachedDnsHTTPConnection(_CachedDnsMixin, HTTPConnection):
+    pass
+
+
+class _CachedDnsHTTPSConnection(_CachedDnsMixin, HTTPSConnection):
+    pass
+
+
+class _HTTPPool(HTTPConnectionPool):
+    ConnectionCls = _CachedDnsHTTPConnection
+
+
+class _HTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedDnsHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter using the DNS cache, remembering when it last sent anything."""
+
+    def __init__(self, pool_size: int):
+        super().__init__(pool_connections=4, pool_maxsize=pool_size)
+        self.last_used = 0.0
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+
+    def send(self, request, *args, **kwargs):
+        self.last_used = time.monotonic()
+        return super().send(request, *args, **kwargs)
+
+    def pools(self):
+        manager = self.poolmanager
+        return [manager.pools[key] for key in manager.pools.keys()]
+
+
+class ConnectionManager:
+    """
+    Keeps a client's connections to the exchange warm.
+
+    start() opens warm_connections sockets right away (with concurrent
+    pings), then every keepalive_interval seconds refreshes the DNS cache
+    and - if nothing was sent in that time - pings again so the server
+    doesn't close the idle sockets. /fapi/v1/ping costs 1 weight.
+    """
+
+    def __init__(self, client, pool_size: Optional[int] = None, warm_connections: Optional[int] = None,
+                 keepalive_interval: Optional[float] = None):
+        """
+        Args:
+            client: BinanceClient whose session to manage
+            pool_size: Sockets kept per host (default: BINANCE_POOL_SIZE)
+            warm_connections: Sockets to open up front and keep alive
+            keepalive_interval: Seconds between keep-alive checks
+        """
+        self.client = client
+        self.pool_size = pool_size or config.pool_size
+        self.warm_connections = warm_connections or config.warm_connections
+        self.keepalive_interval = keepalive_interval or config.keepalive_interval
+        self.adapter = PooledAdapter(self.pool_size)
+        client.session.mount("https://", self.adapter)
+        client.session.mount("http://", self.adapter)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool = ThreadPoolExecutor(max_workers=self.warm_connections, thread_name_prefix="connection-warmup")
+
+    def warm_up(self, connections: Optional[int] = None) -> None:
+        """Open connections now by sending that many pings at once."""
+        connections = connections or self.warm_connections
+        if connections <= self.warm_connections:
+            list(self._pool.map(lambda _: self._safe_ping(), range(connections)))
+            return
+        with ThreadPoolExecutor(max_workers=connections) as pool:
+            list(pool.map(lambda _: self._safe_ping(), range(connections)))
+
+    def _safe_ping(self) -> bool:
+        try:
+            self.client.ping()
+            return True
+        except Exception as e:
+            logger.warning("Keep-alive ping failed: %s", e)
+            return False
+
+    def start(self) -> None:
+        """Warm up, then keep the connections alive from a background thread."""
+        self.warm_up()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="connection-keepalive", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        # Idle warm-up workers would otherwise outlive the client; a new
+        # executor only starts threads if start() is called again
+        self._pool.shutdown(wait=False)
+        self._pool = ThreadPoolExecutor(max_workers=self.warm_connections, thread_name_prefix="connection-warmup")
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the background thread to exit after stop()."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.keepalive_interval):
+            dns_cache.refresh()
+            if time.monotonic() - self.adapter.last_used >= self.keepalive_interval:
+                self.warm_up()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        How well connections are being reused.
+
+        Returns:
+            Dict with requests, connections_opened, reused, reuse_ratio,
+            idle_connections and the DNS cache counters
+        """
+        requests = opened = idle = 0
+        for pool in self.adapter.pools():
+            requests += pool.num_requests
+            opened += pool.num_connections
+            # The pool queue starts out full of None placeholders
+            idle += sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool is not None else 0
+        reused = max(requests - opened, 0)
+        return {
+            "requests": requests,
+            "connections_opened": opened,
+            "reused": reused,
+            "reuse_ratio": reused / requests if requests else 0.0,
+            "idle_connections": idle,
+            "dns": dns_cache.stats(),
+        }
@@ -0,0 +1,210 @@
+"""
+Order daemon - keeps a warm client around so CLI orders skip cold start.
+Holds one BinanceClient (connection pool, exchange info, clock offset)
+and takes orders over a Unix domain socket, one JSON object per line.
+market_orders.py and limit_orders.py forward to it automatically when it's
+running (see daemon_client.py).
+
+Run with:
+    python daemon.py            # foreground, Ctrl+C to stop
+    python daemon.py --stop     # ask a running daemon to exit
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Optional
+
+import requests
+
+# Handle both direct execution and module execution
+try:
+    from .binance_client import BinanceClient
+    from .config import config
+    from .daemon_client import call_daemon
+    from .logger import logger
+except ImportError:
+    from binance_client import BinanceClient
+    from config import config
+    from daemon_client import call_daemon
+    from logger import logger
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One connection - any number of requests, one per line."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                reply = {"ok": False, "invalid": True, "error": "Request isn't valid JSON"}
+            else:
+                reply = self.server.daemon.handle(request)
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class OrderDaemon:
+    """
+    Serves order requests from a warm BinanceClient.
+
+    warm_up() loads exchange info, syncs the clock and opens connections,
+    and all three are kept fresh from background threads, so the TLS
+    handshake is long done when an order arrives. Order state is
+    reconciled in the background too, as in a BasicBot.
+    """
+
+    def __init__(self, client: Optional[BinanceClient] = None, socket_path: Optional[str] = None):
+        """
+        Args:
+            client: Client to place orders with (default: one from env config)
+            socket_path: Where to listen (default: BINANCE_DAEMON_SOCKET)
+        """
+        self.client = client or BinanceClient()
+        self.socket_path = socket_path or config.daemon_socket
+        self._server: Optional[_Server] = None
+        self._stopped = threading.Event()
+
+    def warm_up(self) -> None:
+        self.client.time_sync.start()
+        self.client.exchange_cache.symbols()
+        self.client.exchange_cache.start_auto_refresh()
+        self.client.connections.start()
+        self.client.orders.start()
+        if self.client.risk.limits.needs_positions:
+            self.client.risk.ensure_positions()
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one request and build the reply."""
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "testnet": self.client.testnet}
+        if op == "shutdown":
+            threading.Thread(target=self.stop, daemon=True).start()
+            return {"ok": True}
+        if op != "order":
+            return {"ok": False, "invalid": True, "error": f"Unknown op {op!r}"}
+        # The CLI resolved its environment on its own - never trade it somewhere else
+        if request.get("testnet") != self.client.testnet or request.get("base_url") != self.client.base_url:
+            return {"ok": False, "error": f"Daemon trades on {self._environment()} but the order is for "
+                                          f"{self._environment(request.get('testnet'), request.get('base_url'))}"}
+
+        try:
+            quantity = Decimal(request["quantity"])
+            price = Decimal(request["price"]) if request.get("price") is not None else None
+            response = self.client.place_order(symbol=request["symbol"], side=request["side"],
+                                               order_type=request["order_type"], quantity=quantity, price=price,
+                                               time_in_force=request.get("time_in_force", "GTC"), validate=True)
+        except (KeyError, InvalidOperation) as e:
+            return {"ok": False, "invalid": True, "error": f"Malformed order request: {e!r}"}
+        except ValueError as e:
+            return {"ok": False, "invalid": True, "error": str(e)}
+        except requests.exceptions.RequestException as e:
+            logger.error("Daemon order failed: %s", e)
+            return {"ok": False, "error": str(e)}
+        except Exception as e:
+            # Still answer, or the CLI is left waiting without knowing what happened
+            logger.error("Daemon order failed unexpectedly: %r", e)
+            logger.error(traceback.format_exc())
+            return {"ok": False, "error": f"Unexpected daemon error: {e!r}"}
+        return {"ok": True, "order": response, "testnet": self.client.testnet}
+
+    def _environment(self, testnet: Optional[bool] = None, base_url: Optional[str] = None) -> str:
+        if base_url is None:
+            testnet, base_url = self.client.testnet, self.client.base_url
+        return f"{'testnet' if testnet else 'production'} ({base_url})"
+
+    def start(self) -> None:
+        """Bind the socket and serve in a background thread."""
+        self._claim_socket_path()
+        # Anyone who can connect can place orders - owner only, from the moment it exists
+        umask = os.umask(0o177)
+        try:
+            self._server = _Server(self.socket_path, _Handler)
+        finally:
+            os.umask(umask)
+        self._server.daemon = self
+        threading.Thread(target=self._server.serve_forever, name="order-daemon", daemon=True).start()
+        logger.info("Order daemon listening on %s", self.socket_path)
+
+    def _claim_socket_path(self) -> None:
+        if not os.path.exists(self.socket_path):
+            os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), mode=0o700, exist_ok=True)
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Left over from a daemon that didn't shut down cleanly
+            os.unlink(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"Another daemon is already listening on {self.socket_path}")
+
+    def wait(self) -> None:
+        """Block until stop() (or Ctrl+C / SIGTERM)."""
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        try:
+            while not self._stopped.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            self.stop()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            server, self._server = self._server, None
+            server.shutdown()
+            server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self.client.close()
+            logger.info("Order daemon stopped")
+        self._stopped.set()
+
+
+def main():
+    """Entry point when running as a script."""
+    parser = argparse.ArgumentParser(description="Keep a warm client and take CLI orders over a Unix socket")
+    parser.add_argument("--socket", help="Socket path (default: BINANCE_DAEMON_SOCKET)")
+    parser.add_argument("--stop", action="store_true", help="Stop a running daemon")
+    args = parser.parse_args()
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("\nUnix domain sockets aren't available on this platform - orders run directly\n")
+        sys.exit(1)
+    if args.socket:
+        config.daemon_socket = args.socket
+
+    if args.stop:
+        if call_daemon({"op": "shutdown"}) is None:
+            print("\nNo daemon running\n")
+            sys.exit(1)
+        print("\nDaemon stopped\n")
+        return
+
+    daemon = OrderDaemon(socket_path=config.daemon_socket)
+    try:
+        daemon.start()
+    except RuntimeError as e:
+        print(f"\n{e}\n")
+        sys.exit(1)
+    daemon.warm_up()
+    print(f"\nOrder daemon ready on {daemon.socket_path} ({'testnet' if daemon.client.testnet else 'production'})")
+    print("Orders from market_orders.py / limit_orders.py now go through it. Ctrl+C to stop.\n")
+    daemon.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Thin client for the order daemon (daemon.py).
+Only uses the standard library, so a CLI that forwards its order to a
+running daemon doesn't pay for importing requests/numpy, building a client
+or opening a new TLS connection. Falls back to placing the order directly
+when no daemon is listening.
+"""
+import json
+import os
+import socket
+from typing import Any, Dict, Optional, Tuple
+
+# Handle both direct execution and module execution
+try:
+    from .config import config
+except ImportError:
+    from config import config
+
+
+class DaemonError(RuntimeError):
+    """The daemon got the request but couldn't place the order."""
+
+
+def daemon_available() -> bool:
+    """Unix sockets exist on this platform and a socket file is in place."""
+    return hasattr(socket, "AF_UNIX") and bool(config.daemon_socket) and os.path.exists(config.daemon_socket)
+
+
+def call_daemon(request: Dict[str, Any], timeout: float = 30.0) -> Optional[Dict[str, Any]]:
+    """
+    Send one request to the daemon and wait for the reply.
+
+    Returns:
+        The reply, or None if no daemon is listening. Once the request has
+        been sent, failures raise instead - the order may already be on its
+        way, so the caller must not quietly retry it some other way.
+    """
+    if not daemon_available():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        try:
+            sock.connect(config.daemon_socket)
+        except (FileNotFoundError, ConnectionRefusedError):
+            # Stale socket file from a daemon that's gone
+            return None
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                raise DaemonError("Daemon closed the connection without replying - check the order status")
+            reply += chunk
+        return json.loads(reply)
+    except socket.timeout:
+        raise DaemonError(f"No reply from the daemon within {timeout:.0f}s - check the order status")
+    finally:
+        sock.close()
+
+
+def submit_order(symbol: str, side: str, order_type: str, quantity: Any, price: Any = None,
+                 time_in_force: str = "GTC") -> Tuple[Dict[str, Any], bool]:
+    """
+    Place an order through the daemon if one is running, directly otherwise.
+    Orders are always validated against the exchange filters, and the
+    daemon refuses them if it trades on a different testnet/base URL than
+    this process is configured for.
+
+    Returns:
+        Tuple of (order response, testnet)
+
+    Raises:
+        ValueError: The order failed validation
+        DaemonError: The daemon couldn't place it
+    """
+    request = {"op": "order", "symbol": symbol, "side": side, "order_type": order_type,
+               "quantity": str(quantity), "price": None if price is None else str(price),
+               "time_in_force": time_in_force, "testnet": config.testnet, "base_url": config.base_url}
+    reply = call_daemon(request)
+    if reply is None:
+        return _place_directly(symbol, side, order_type, quantity, price, time_in_force)
+    if reply.get("ok"):
+        return reply["order"], reply["testnet"]
+    if reply.get("invalid"):
+        raise ValueError(reply["error"])
+    raise DaemonError(reply.get("error", "Daemon error"))
+
+
+def _place_directly(symbol: str, side: str, order_type: str, quantity: Any, price: Any,
+                    time_in_force: str) -> Tuple[Dict[str, Any], bool]:
+    # Only imported when there's no daemon - this is the slow part
+    try:
+        from .binance_client import BinanceClient
+    except ImportError:
+        from binance_client import BinanceClient
+
+    client = BinanceClient()
+    response = client.place_order(symbol=symbol, side=side, order_type=order_type, quantity=quantity, price=price,
+                                  time_in_force=time_in_force, validate=True)
+    return response, client.testnet
@@ -0,0 +1,242 @@
+"""
+Cached exchange trading rules.
+Keeps a per-symbol index of the exchangeInfo filters in memory and on disk,
+so pre-trade checks don't have to download the full payload every time.
+"""
+import json
+import os
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+# Handle both direct execution and module execution
+try:
+    from .config import config
+    from .logger import logger
+except ImportError:
+    from config import config
+    from logger import logger
+
+
+class SymbolFilters(NamedTuple):
+    """Trading rules for one symbol, pulled out of the exchangeInfo filters."""
+    symbol: str
+    tick_size: Decimal
+    min_price: Decimal
+    max_price: Decimal
+    step_size: Decimal
+    min_qty: Decimal
+    max_qty: Decimal
+    market_step_size: Decimal
+    market_min_qty: Decimal
+    market_max_qty: Decimal
+    min_notional: Decimal
+    max_num_orders: int
+    price_precision: int
+    quantity_precision: int
+
+
+def parse_symbol_filters(symbol_info: Dict[str, Any]) -> SymbolFilters:
+    """Build a SymbolFilters record from one entry of exchangeInfo["symbols"]."""
+    filters = {f["filterType"]: f for f in symbol_info.get("filters", [])}
+    price_filter = filters.get("PRICE_FILTER", {})
+    lot_size = filters.get("LOT_SIZE", {})
+    # Market orders have their own lot size on futures - fall back to LOT_SIZE
+    market_lot_size = filters.get("MARKET_LOT_SIZE", lot_size)
+
+    return SymbolFilters(
+        symbol=symbol_info["symbol"],
+        tick_size=Decimal(price_filter.get("tickSize", "0")),
+        min_price=Decimal(price_filter.get("minPrice", "0")),
+        max_price=Decimal(price_filter.get("maxPrice", "0")),
+        step_size=Decimal(lot_size.get("stepSize", "0")),
+        min_qty=Decimal(lot_size.get("minQty", "0")),
+        max_qty=Decimal(lot_size.get("maxQty", "0")),
+        market_step_size=Decimal(market_lot_size.get("stepSize", "0")),
+        market_min_qty=Decimal(market_lot_size.get("minQty", "0")),
+        market_max_qty=Decimal(market_lot_size.get("maxQty", "0")),
+        min_notional=Decimal(filters.get("MIN_NOTIONAL", {}).get("notional", "0")),
+        max_num_orders=int(filters.get("MAX_NUM_ORDERS", {}).get("limit", 0)),
+        price_precision=int(symbol_info.get("pricePrecision", 8)),
+        quantity_precision=int(symbol_info.get("quantityPrecision", 8)),
+    )
+
+
+def _row_to_filters(row: List[Any]) -> SymbolFilters:
+    """Rebuild a record from the compact on-disk row."""
+    values = []
+    for field, value in zip(SymbolFilters._fields, row):
+        field_type = SymbolFilters.__annotations__[field]
+        values.append(field_type(value))
+    return SymbolFilters(*values)
+
+
+class ExchangeInfoCache:
+    """
+    TTL-bound cache of exchangeInfo, indexed by symbol.
+
+    Lookups go through a plain dict so they are O(1) and never touch the
+    network while the cache is fresh. The index is also written to disk
+    (one compact row per symbol) so a new process starts warm.
+
+    When the data goes stale, lookups keep serving the old rules and a
+    background thread fetches new ones. Only a cold cache with nothing on
+    disk blocks on the network.
+    """
+
+    def __init__(self, client, ttl: Optional[float] = None, path: Optional[Path] = None):
+        """
+        Args:
+            client: BinanceClient (anything with get_exchange_info())
+            ttl: Seconds before the cached rules are considered stale
+            path: Where to persist the index (defaults to the cache dir)
+        """
+        self.client = client
+        self.ttl = ttl if ttl is not None else config.exchange_info_ttl
+        if path is None:
+            mode = "testnet" if client.testnet else "production"
+            path = Path(config.cache_dir) / f"exchange_info_{mode}.json"
+        self.path = Path(path)
+
+        self._filters: Dict[str, SymbolFilters] = {}
+        self._fetched_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        self._load()
+
+    @property
+    def age(self) -> float:
+        """Seconds since the rules were fetched from the exchange."""
+        return time.time() - self._fetched_at
+
+    def is_fresh(self) -> bool:
+        """True if we have rules and they are younger than the TTL."""
+        return bool(self._filters) and self.age < self.ttl
+
+    def get(self, symbol: str) -> Optional[SymbolFilters]:
+        """
+        Get the trading rules for a symbol.
+
+        Returns:
+            SymbolFilters, or None if the exchange doesn't list the symbol
+        """
+        self._ensure_loaded()
+        return self._filters.get(symbol)
+
+    def __getitem__(self, symbol: str) -> SymbolFilters:
+        filters = self.get(symbol)
+        if filters is None:
+            raise ValueError(f"Unknown symbol: {symbol}")
+        return filters
+
+    def __contains__(self, symbol: str) -> bool:
+        return self.get(symbol) is not None
+
+    def symbols(self) -> List[str]:
+        """All symbols currently in the cache."""
+        self._ensure_loaded()
+        return list(self._filters)
+
+    def refresh(self) -> None:
+        """Fetch exchangeInfo now and replace the cached index."""
+        with self._refresh_lock:
+            info = self.client.get_exchange_info()
+            filters = {}
+            for symbol_info in info.get("symbols", []):
+                # Delisted/settling contracts are kept out of the index
+                if symbol_info.get("status", "TRADING") != "TRADING":
+                    continue
+                record = parse_symbol_filters(symbol_info)
+                filters[record.symbol] = record
+
+            # Swap the whole dict in one go so readers never see a half-built index
+            self._filters = filters
+            self._fetched_at = time.time()
+            logger.info("Exchange info refreshed - %d symbols", len(filters))
+            self._save()
+
+    def refresh_in_background(self) -> None:
+        """Kick off a refresh on a background thread (no-op if one is running)."""
+        if self._refresh_lock.locked():
+            return
+        thread = threading.Thread(target=self._safe_refresh, name="exchange-info-refresh", daemon=True)
+        thread.start()
+
+    def start_auto_refresh(self) -> None:
+        """Keep the cache fresh from a background thread until stop() is called."""
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(target=self._auto_refresh_loop,
+                                                name="exchange-info-auto-refresh", daemon=True)
+        self._refresh_thread.start()
+
+    def stop(self) -> None:
+        """Stop the auto refresh thread."""
+        self._stop_event.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the background thread to exit after stop()."""
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout)
+
+    def _auto_refresh_loop(self) -> None:
+        while not self._stop_event.is_set():
+            # Refresh a bit before expiry so lookups never see stale rules
+            wait = max(self.ttl * 0.8 - self.age, 0)
+            if self._stop_event.wait(wait):
+                return
+            self._safe_refresh()
+            if not self.is_fresh():
+                # Refresh failed - back off instead of hammering the API
+                self._stop_event.wait(min(self.ttl, 30))
+
+    def _safe_refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error("Exchange info refresh failed: %s", e)
+
+    def _ensure_loaded(self) -> None:
+        if self.is_fresh():
+            return
+        if self._filters:
+            # Stale but usable - serve it while a new copy downloads
+            self.refresh_in_background()
+        else:
+            self.refresh()
+
+    def _load(self) -> None:
+        """Warm the cache from disk if there is a copy for this endpoint."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("base_url") != self.client.base_url or data.get("fields") != list(SymbolFilters._fields):
+                return
+            self._filters = {row[0]: _row_to_filters(row) for row in data["symbols"]}
+            self._fetched_at = float(data["fetched_at"])
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable exchange info cache %s: %s", self.path, e)
+
+    def _save(self) -> None:
+        """Write the index to disk atomically."""
+        data = {
+            "base_url": self.client.base_url,
+            "fetched_at": self._fetched_at,
+            "fields": list(SymbolFilters._fields),
+            "symbols": [[str(value) for value in record] for record in self._filters.values()],
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not write exchange info cache %s: %s", self.path, e)
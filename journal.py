@@ -0,0 +1,377 @@
+"""
+Append-only trade journal.
+Every order request BinanceClient sends (new orders, batches, cancels) is
+stored with its response as one fixed-size binary record, so questions like
+"all fills for BTCUSDT yesterday" are a binary search plus an index lookup
+instead of grepping bot.log.
+
+Query it with:
+    python journal.py --symbol BTCUSDT --since 2024-05-01 --fills
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows - no advisory locks, one writer is on you
+    fcntl = None
+
+# Handle both direct execution and module execution
+try:
+    from .config import config
+    from .logger import logger
+except ImportError:
+    from config import config
+    from logger import logger
+
+
+MAGIC = 0x314C4E524A4E4942  # b"BINJRNL1" read as a little-endian int64
+HEADER_SIZE = 64
+INITIAL_CAPACITY = 4096
+
+# Record kinds
+KIND_RESPONSE = 1
+KIND_ERROR = 2
+
+# Requests that change orders. Reads (GET) of the same endpoints aren't
+# journaled - an order lookup would repeat the fill it reports
+JOURNALED_ENDPOINTS = frozenset(("/fapi/v1/order", "/fapi/v1/batchOrders", "/fapi/v1/allOpenOrders"))
+
+RECORD = np.dtype([
+    ("ts", "<i8"),              # ms since epoch when the response came back
+    ("latency_us", "<i4"),      # request round trip
+    ("kind", "u1"),
+    ("http_status", "<i2"),
+    ("error_code", "<i4"),
+    ("method", "S6"),
+    ("endpoint", "S24"),
+    ("symbol", "S20"),
+    ("side", "S4"),
+    ("type", "S24"),
+    ("status", "S16"),
+    ("client_id", "S36"),
+    ("order_id", "<i8"),
+    ("qty", "<f8"),
+    ("price", "<f8"),
+    ("executed_qty", "<f8"),
+    ("avg_price", "<f8"),
+])
+_EMPTY = {name: b"" if RECORD[name].kind == "S" else 0 for name in RECORD.names}
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Journal:
+    """
+    Fixed-size records in one memory-mapped file:
+
+        [64 byte header: magic, version, record size, count][record 0][record 1]...
+
+    The file grows in doubling steps and the record count in the header is
+    only bumped after a record is fully written, so a crash mid-write leaves
+    at most one ignored slot. Records are kept in time order (timestamps
+    never go backwards), which makes the time index just the ts column
+    itself. The symbol index maps each symbol to the positions of its
+    records; it's rebuilt with NumPy on open and kept current on append.
+
+    Only one process can write a journal at a time - a second one gets an
+    error on open (where file locks are available). Any number can open it
+    read_only, e.g. to query a running bot's journal; they see the records
+    that existed when they opened it.
+    """
+
+    def __init__(self, path: str, read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+        self._lock = threading.Lock()
+
+        if read_only:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No journal at {path}")
+            self._file = open(path, "rb")
+            self._map()
+            if self._header[0] != MAGIC or self._header[2] != RECORD.itemsize:
+                raise ValueError(f"{path} is not a journal this version can read")
+            self._symbols: Dict[str, array] = {}
+            self._build_symbol_index()
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        new = not os.path.exists(path) or os.path.getsize(path) < HEADER_SIZE
+        self._file = open(path, "r+b" if not new else "w+b")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._file.close()
+                raise RuntimeError(f"Journal {path} is in use by another process")
+        if new:
+            self._file.truncate(HEADER_SIZE + INITIAL_CAPACITY * RECORD.itemsize)
+
+        self._map()
+        if new:
+            self._header[:4] = (MAGIC, 1, RECORD.itemsize, 0)
+        elif self._header[0] != MAGIC or self._header[2] != RECORD.itemsize:
+            raise ValueError(f"{path} is not a journal this version can read")
+
+        self._symbols = {}
+        self._build_symbol_index()
+
+    def _map(self) -> None:
+        size = os.path.getsize(self.path)
+        self.capacity = (size - HEADER_SIZE) // RECORD.itemsize
+        mode = "r" if self.read_only else "r+"
+        self._header = np.memmap(self._file, dtype="<i8", mode=mode, shape=(8,))
+        self._records = np.memmap(self._file, dtype=RECORD, mode=mode, offset=HEADER_SIZE, shape=(self.capacity,))
+        # Read-only views see a fixed number of records
+        self._count = int(self._header[3]) if self.read_only else None
+
+    def _grow(self) -> None:
+        self._records.flush()
+        self._header.flush()
+        del self._records, self._header
+        self._file.truncate(HEADER_SIZE + 2 * self.capacity * RECORD.itemsize)
+        self._map()
+
+    def _build_symbol_index(self) -> None:
+        symbols = self._records["symbol"][:len(self)]
+        if not len(symbols):
+            return
+        names, inverse = np.unique(symbols, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(names)))[:-1]
+        for name, positions in zip(names, np.split(order, bounds)):
+            self._symbols[name.decode()] = array("q", positions.astype(np.int64).tobytes())
+
+    def __len__(self) -> int:
+        return self._count if self.read_only else int(self._header[3])
+
+    def close(self) -> None:
+        with self._lock:
+            if not self.read_only:
+                self._records.flush()
+                self._header.flush()
+            self._file.close()
+
+    # ----------------------------------------------------------------- writing
+
+    def append(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Append records. Each row is a dict with any of the RECORD fields;
+        missing ones are zero/empty. ts defaults to now.
+        """
+        if self.read_only:
+            raise ValueError("Journal was opened read-only")
+        with self._lock:
+            count = len(self)
+            while count + len(rows) > self.capacity:
+                self._grow()
+            last_ts = int(self._records["ts"][count - 1]) if count else 0
+            now = int(time.time() * 1000)
+            for offset, row in enumerate(rows):
+                # Keep the ts column sorted so it can be binary searched
+                last_ts = max(row.get("ts") or now, last_ts)
+                row = dict(row, ts=last_ts)
+                self._records[count + offset] = tuple(row.get(name, _EMPTY[name]) for name in RECORD.names)
+                symbol = row.get("symbol")
+                if symbol:
+                    self._symbols.setdefault(symbol.decode(), array("q")).append(count + offset)
+            self._header[3] = count + len(rows)
+
+    def record_request(self, method: str, endpoint: str, params: Dict[str, Any], response: Any,
+                       latency_us: int, http_status: int = 200) -> None:
+        """
+        Journal one order request and whatever came back.
+
+        Args:
+            method: HTTP method
+            endpoint: API path
+            params: Request parameters as sent
+            response: Decoded JSON body (a Binance error dict on failure)
+            latency_us: Round trip time
+            http_status: HTTP status of the response (0 if there was none)
+        """
+        if method == "GET" or endpoint not in JOURNALED_ENDPOINTS:
+            return
+        if endpoint == "/fapi/v1/batchOrders" and method in ("POST", "PUT"):
+            requests = json.loads(params.get("batchOrders") or "[]")
+        elif isinstance(response, list):
+            # Batch cancel - one reply per order, all from the same params
+            requests = [params] * len(response)
+        else:
+            requests = [params]
+        responses = response if isinstance(response, list) else [response] * len(requests)
+
+        base = {"latency_us": latency_us, "http_status": http_status, "method": method.encode(),
+                "endpoint": endpoint.encode()}
+        rows = []
+        for request, reply in zip(requests, responses):
+            if not isinstance(reply, dict):
+                reply = {}
+            # Cancel-all answers {"code": 200, "msg": ...} when it works
+            failed = http_status >= 400 or ("code" in reply and "orderId" not in reply and reply["code"] != 200)
+            rows.append(dict(
+                base,
+                kind=KIND_ERROR if failed else KIND_RESPONSE,
+                error_code=int(reply.get("code", 0)) if failed else 0,
+                symbol=str(reply.get("symbol") or request.get("symbol") or "").encode(),
+                side=str(reply.get("side") or request.get("side") or "").encode(),
+                type=str(reply.get("type") or request.get("type") or "").encode(),
+                status=str(reply.get("status") or "").encode(),
+                client_id=str(reply.get("clientOrderId") or request.get("newClientOrderId")
+                              or request.get("origClientOrderId") or "").encode(),
+                order_id=int(reply.get("orderId") or request.get("orderId") or 0),
+                qty=_number(reply.get("origQty") or request.get("quantity")),
+                price=_number(reply.get("price") or request.get("price")),
+                executed_qty=_number(reply.get("executedQty")),
+                avg_price=_number(reply.get("avgPrice")),
+            ))
+        try:
+            self.append(rows)
+        except Exception as e:
+            # The journal must never break trading
+            logger.error("Journal write failed: %s", e)
+
+    # ---------------------------------------------------------------- reading
+
+    def query(self, symbol: Optional[str] = None, start: Optional[int] = None, end: Optional[int] = None,
+              kind: Optional[int] = None) -> np.ndarray:
+        """
+        Records in [start, end) (ms timestamps), optionally for one symbol
+        or one kind, oldest first.
+
+        Returns:
+            A structured array (a copy, safe to keep)
+        """
+        with self._lock:
+            ts = self._records["ts"][:len(self)]
+            if symbol is None:
+                lo = np.searchsorted(ts, start, "left") if start is not None else 0
+                hi = np.searchsorted(ts, end, "left") if end is not None else len(ts)
+                selected = self._records[lo:hi]
+            else:
+                positions = self._symbols.get(symbol.upper())
+                if not positions:
+                    return np.empty(0, dtype=RECORD)
+                positions = np.frombuffer(positions, dtype=np.int64)
+                symbol_ts = ts[positions]
+                lo = np.searchsorted(symbol_ts, start, "left") if start is not None else 0
+                hi = np.searchsorted(symbol_ts, end, "left") if end is not None else len(positions)
+                selected = self._records[positions[lo:hi]]
+            selected = np.array(selected, dtype=RECORD)
+        if kind is not None:
+            selected = selected[selected["kind"] == kind]
+        return selected
+
+    def fills(self, symbol: Optional[str] = None, start: Optional[int] = None,
+              end: Optional[int] = None) -> np.ndarray:
+        """Responses that report a (partial) fill."""
+        records = self.query(symbol, start, end, kind=KIND_RESPONSE)
+        return records[records["executed_qty"] > 0]
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return sorted(self._symbols)
+
+
+def to_dicts(records: np.ndarray) -> Iterator[Dict[str, Any]]:
+    """Turn query results into plain dicts (bytes decoded)."""
+    for record in records:
+        yield {name: value.decode() if isinstance(value, bytes) else value
+               for name, value in zip(RECORD.names, record.item())}
+
+
+_journals: Dict[str, Journal] = {}
+_journals_lock = threading.Lock()
+
+
+def open_journal(path: Optional[str] = None) -> Optional[Journal]:
+    """
+    The process-wide journal for a path (default: BINANCE_JOURNAL), shared
+    by every client so they don't fight over the file. None if journaling
+    is switched off or the file can't be opened.
+    """
+    path = config.journal_path if path is None else path
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    with _journals_lock:
+        if path not in _journals:
+            try:
+                _journals[path] = Journal(path)
+            except (OSError, RuntimeError, ValueError) as e:
+                logger.warning("Trade journal disabled: %s", e)
+                return None
+        return _journals[path]
+
+
+def parse_date(value: str) -> int:
+    """YYYY-MM-DD (UTC) -> ms timestamp."""
+    try:
+        day = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise ValueError(f"Dates must look like 2024-01-31, got {value}")
+    return int(day.timestamp() * 1000)
+
+
+def main():
+    """Entry point when running as a script."""
+    parser = argparse.ArgumentParser(description="Search the trade journal")
+    parser.add_argument("--symbol", help="Only this symbol")
+    parser.add_argument("--since", help="From this day (YYYY-MM-DD, UTC)")
+    parser.add_argument("--until", help="Up to (not including) this day")
+    parser.add_argument("--fills", action="store_true", help="Only responses with a fill")
+    parser.add_argument("--errors", action="store_true", help="Only failed requests")
+    parser.add_argument("--path", help="Journal file (default: BINANCE_JOURNAL)")
+    args = parser.parse_args()
+
+    try:
+        start = parse_date(args.since) if args.since else None
+        end = parse_date(args.until) if args.until else None
+    except ValueError as e:
+        print(f"\n{e}\n")
+        sys.exit(1)
+
+    path = args.path or config.journal_path
+    if not path:
+        print("\nNo journal configured (BINANCE_JOURNAL is empty)\n")
+        sys.exit(1)
+    try:
+        journal = Journal(path, read_only=True)
+    except (OSError, ValueError) as e:
+        print(f"\n{e}\n")
+        sys.exit(1)
+
+    if args.fills:
+        records = journal.fills(args.symbol, start, end)
+    else:
+        records = journal.query(args.symbol, start, end, kind=KIND_ERROR if args.errors else None)
+
+    print(f"\n{len(records)} of {len(journal)} records\n")
+    for row in to_dicts(records):
+        when = datetime.fromtimestamp(row["ts"] / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        if row["kind"] == KIND_ERROR:
+            outcome = f"error {row['error_code']}"
+        else:
+            outcome = f"{row['status'] or 'ok'} {row['executed_qty']:g} @ {row['avg_price']:g}"
+        print(f"{when}  {row['method']:<6} {row['symbol']:<12} {row['side']:<4} {row['type']:<12} "
+              f"{row['qty']:g} @ {row['price']:g}  id={row['order_id']}  {outcome}  {row['latency_us'] / 1000:.1f}ms")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Historical kline downloader and columnar store.
+Pulls /fapi/v1/klines in parallel chunks and appends them to one flat binary
+file per column, which can be opened later through mmap without copying or
+parsing anything.
+
+Run with:
+    python klines.py BTCUSDT ETHUSDT --interval 1m --since 2023-01-01
+    python klines.py --all --interval 1h        # every listed perpetual
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Handle both direct execution and module execution
+try:
+    from .backtest import Bars
+    from .binance_client import BinanceClient
+    from .config import config
+    from .logger import logger
+except ImportError:
+    from backtest import Bars
+    from binance_client import BinanceClient
+    from config import config
+    from logger import logger
+
+
+# Bars per request - the most /fapi/v1/klines returns
+KLINES_PER_REQUEST = 1500
+
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000, "8h": 28_800_000,
+    "12h": 43_200_000, "1d": 86_400_000, "3d": 259_200_000, "1w": 604_800_000,
+}
+
+# Column name -> (dtype, index in a /fapi/v1/klines row)
+COLUMNS: Dict[str, Tuple[str, int]] = {
+    "open_time": ("<i8", 0),
+    "open": ("<f8", 1),
+    "high": ("<f8", 2),
+    "low": ("<f8", 3),
+    "close": ("<f8", 4),
+    "volume": ("<f8", 5),
+}
+
+
+def interval_ms(interval: str) -> int:
+    if interval not in INTERVAL_MS:
+        raise ValueError(f"Unsupported interval {interval} - choose from {', '.join(INTERVAL_MS)}")
+    return INTERVAL_MS[interval]
+
+
+class KlineStore:
+    """
+    Klines on disk, one directory per symbol and interval, one file per column:
+
+        <root>/BTCUSDT/1m/open_time.i8, open.f8, high.f8, ...
+
+    Every file is a raw little-endian array, so row i is at byte offset 8 * i
+    in each of them. Appending is a plain write at the end, and reading maps
+    the files straight into NumPy arrays.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = os.path.join(root or config.data_dir, "klines")
+
+    def path(self, symbol: str, interval: str, column: Optional[str] = None) -> str:
+        directory = os.path.join(self.root, symbol.upper(), interval)
+        if column is None:
+            return directory
+        return os.path.join(directory, f"{column}.{COLUMNS[column][0][1:]}")
+
+    def rows(self, symbol: str, interval: str) -> int:
+        """Complete rows stored - a write cut short by a crash doesn't count."""
+        sizes = []
+        for column in COLUMNS:
+            try:
+                sizes.append(os.path.getsize(self.path(symbol, interval, column)) // 8)
+            except FileNotFoundError:
+                return 0
+        return min(sizes)
+
+    def last_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        rows = self.rows(symbol, interval)
+        if not rows:
+            return None
+        with open(self.path(symbol, interval, "open_time"), "rb") as f:
+            f.seek((rows - 1) * 8)
+            return int(np.frombuffer(f.read(8), dtype="<i8")[0])
+
+    def append(self, symbol: str, interval: str, klines: List[List[Any]]) -> int:
+        """
+        Append REST kline rows. Rows at or before the last stored bar are
+        skipped, so overlapping downloads are harmless.
+
+        Returns:
+            Rows written
+        """
+        last = self.last_open_time(symbol, interval)
+        if last is not None:
+            klines = [row for row in klines if row[0] > last]
+        if not klines:
+            return 0
+
+        directory = self.path(symbol, interval)
+        os.makedirs(directory, exist_ok=True)
+        self._repair(symbol, interval)
+        table = np.array([row[:6] for row in klines], dtype=np.float64)
+        for column, (dtype, index) in COLUMNS.items():
+            values = table[:, index].astype(dtype)
+            with open(self.path(symbol, interval, column), "ab") as f:
+                f.write(values.tobytes())
+        return len(klines)
+
+    def _repair(self, symbol: str, interval: str) -> None:
+        """Cut every column back to the shortest one, undoing a half-finished append."""
+        rows = self.rows(symbol, interval)
+        for column in COLUMNS:
+            path = self.path(symbol, interval, column)
+            if os.path.exists(path) and os.path.getsize(path) != rows * 8:
+                with open(path, "r+b") as f:
+                    f.truncate(rows * 8)
+
+    def load(self, symbol: str, interval: str) -> Bars:
+        """
+        Map a symbol's history into memory, zero-copy.
+
+        The arrays are read-only views of the files (np.memmap), so opening
+        years of 1m bars is instant and only the pages actually touched are
+        read from disk.
+        """
+        rows = self.rows(symbol, interval)
+        if not rows:
+            raise ValueError(f"No {interval} klines stored for {symbol}")
+        columns = [np.memmap(self.path(symbol, interval, column), dtype=dtype, mode="r", shape=(rows,))
+                   for column, (dtype, _) in COLUMNS.items()]
+        return Bars(*columns)
+
+    def symbols(self, interval: str) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if self.rows(name, interval))
+
+
+class KlineDownloader:
+    """
+    Fills a KlineStore from /fapi/v1/klines.
+
+    The missing range of every symbol is cut into 1500-bar requests that run
+    on a bounded thread pool. The client's rate limiter keeps the pool inside
+    the weight budget (10 weight per full request). Chunks are written in
+    order as they complete, so an interrupted run simply resumes from the
+    last stored bar next time, and a daily sync only fetches the tail.
+    """
+
+    def __init__(self, client: Optional[BinanceClient] = None, store: Optional[KlineStore] = None,
+                 max_workers: int = 8):
+        """
+        Args:
+            client: Client used for the requests
+            store: Where the klines go (default: BINANCE_DATA_DIR)
+            max_workers: Requests in flight at once
+        """
+        self.client = client or BinanceClient()
+        self.store = store or KlineStore()
+        self.max_workers = max_workers
+
+    def sync(self, symbols: Iterable[str], interval: str, since: Optional[int] = None,
+             until: Optional[int] = None) -> Dict[str, int]:
+        """
+        Bring every symbol up to date.
+
+        Args:
+            symbols: Symbols to download
+            interval: Kline interval
+            since: Open time (ms) to start from when a symbol has nothing
+                   stored yet (default: the symbol's first bar)
+            until: Stop at this open time (default: the last closed bar)
+
+        Returns:
+            Rows written per symbol
+        """
+        step = interval_ms(interval)
+        now = self.client.time_sync.now_ms()
+        # Only closed bars - the one still forming would be stored half done
+        last_closed = (now // step) * step - step
+        until = min(until, last_closed) if until is not None else last_closed
+
+        written: Dict[str, int] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="klines") as pool:
+            for symbol in symbols:
+                written[symbol] = self._sync_symbol(pool, symbol, interval, step, since, until)
+        return written
+
+    def _sync_symbol(self, pool: ThreadPoolExecutor, symbol: str, interval: str, step: int,
+                     since: Optional[int], until: int) -> int:
+        last = self.store.last_open_time(symbol, interval)
+        if last is not None:
+            start = last + step
+        elif since is not None:
+            start = since
+        else:
+            start = self._first_open_time(symbol, interval)
+            if start is None:
+                logger.warning("No %s klines for %s", interval, symbol)
+                return 0
+        if start > until:
+            return 0
+
+        chunk_span = KLINES_PER_REQUEST * step
+        starts = range(start, until + 1, chunk_span)
+        logger.info("Downloading %s %s: %d requests from %s", symbol, interval, len(starts),
+                    datetime.fromtimestamp(start / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M"))
+
+        written = 0
+        in_flight: deque = deque()
+        # Keep the pool busy but only buffer a bounded number of finished chunks
+        for chunk_start in starts:
+            in_flight.append(self._submit(pool, symbol, interval, chunk_start, min(chunk_start + chunk_span, until + 1)))
+            if len(in_flight) >= self.max_workers * 2:
+                written += self.store.append(symbol, interval, in_flight.popleft().result())
+        while in_flight:
+            written += self.store.append(symbol, interval, in_flight.popleft().result())
+
+        logger.info("%s %s: %d new bars", symbol, interval, written)
+        return written
+
+    def _submit(self, pool: ThreadPoolExecutor, symbol: str, interval: str, start: int, end: int) -> Future:
+        return pool.submit(self.client.get_klines, symbol, interval, start_time=start, end_time=end - 1,
+                           limit=KLINES_PER_REQUEST)
+
+    def _first_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        rows = self.client.get_klines(symbol, interval, start_time=0, limit=1)
+        return int(rows[0][0]) if rows else None
+
+
+def parse_date(value: str) -> int:
+    """YYYY-MM-DD (UTC) -> ms timestamp."""
+    try:
+        day = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise ValueError(f"Dates must look like 2024-01-31, got {value}")
+    return int(day.timestamp() * 1000)
+
+
+def main():
+    """Entry point when running as a script."""
+    parser = argparse.ArgumentParser(description="Download futures klines into the local store")
+    parser.add_argument("symbols", nargs="*", help="Symbols to download")
+    parser.add_argument("--all", action="store_true", help="Every symbol in the exchange info")
+    parser.add_argument("--interval", default="1m", help="Kline interval (default 1m)")
+    parser.add_argument("--since", help="First day for symbols with nothing stored yet (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Last day to download (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=8, help="Requests in flight at once")
+    args = parser.parse_args()
+
+    try:
+        interval_ms(args.interval)
+        since = parse_date(args.since) if args.since else None
+        until = parse_date(args.until) if args.until else None
+    except ValueError as e:
+        print(f"\n{e}\n")
+        sys.exit(1)
+
+    client = BinanceClient()
+    symbols = client.exchange_cache.symbols() if args.all else [symbol.upper() for symbol in args.symbols]
+    if not symbols:
+        parser.print_usage()
+        sys.exit(1)
+
+    started = time.monotonic()
+    written = KlineDownloader(client, max_workers=args.workers).sync(symbols, args.interval, since, until)
+    print(f"\n{sum(written.values())} bars for {len(symbols)} symbols in {time.monotonic() - started:.1f}s")
+    for symbol, count in written.items():
+        if count:
+            print(f"  {symbol}: +{count}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
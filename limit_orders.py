@@ -4,27 +4,27 @@ Places an order at a specific price - waits for market to reach that level.
 """
 import sys
 import traceback
+from decimal import Decimal
 
 # Handle both direct execution and module execution
 try:
-    from .binance_client import BinanceClient
+    from .daemon_client import submit_order
     from .logger import logger
     from .validators import parse_limit_order_args
 except ImportError:
-    from binance_client import BinanceClient
+    from daemon_client import submit_order
     from logger import logger
     from validators import parse_limit_order_args
 
 
-def place_limit_order(symbol: str, side: str, quantity: float, price: float) -> None:
+def place_limit_order(symbol: str, side: str, quantity: Decimal, price: Decimal) -> None:
     """Place a limit order - only executes if price is reached."""
     try:
         logger.info(f"Limit order requested: {side} {quantity} {symbol} @ {price}")
         
-        client = BinanceClient()
-        
-        # Place the order
-        response = client.place_order(
+        # Through the order daemon if it's running, directly otherwise -
+        # snapped to tick/step size and checked against the filters first
+        response, testnet = submit_order(
             symbol=symbol,
             side=side,
             order_type="LIMIT",
@@ -38,7 +38,7 @@ def place_limit_order(symbol: str, side: str, quantity: float, price: float) ->
         
         logger.info(f"Limit order placed - ID: {order_id}, Status: {status}")
         
-        print(f"\nLimit order placed on {'testnet' if client.testnet else 'production'}")
+        print(f"\nLimit order placed on {'testnet' if testnet else 'production'}")
         print(f"  Order ID: {order_id}")
         print(f"  {side} {quantity} {symbol} @ {price}")
         print(f"  Status: {status}")
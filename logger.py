@@ -1,42 +1,156 @@
 """
 Logging setup - writes to bot.log and console.
 Helps with debugging when things go wrong.
+
+Log calls only drop the record on a queue; a background thread formats it
+and does the file and terminal I/O, so logging never blocks an order. Pass
+values as arguments (logger.info("Order %s placed", order_id)) rather than
+f-strings - the message is then only built if the level is enabled, and on
+the writer thread instead of the caller's.
 """
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import time
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import List
+
+# Handle both direct execution and module execution
+try:
+    from .config import config
+except ImportError:
+    from config import config
+
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that also starts a new file every rotate_hours, so a
+    quiet bot doesn't keep appending to the same bot.log for weeks.
+    Old files are kept as bot.log.1, bot.log.2, ... like the size rotation.
+
+    The clock starts at the file's last write, so a bot restarted every few
+    hours still rotates a bot.log that is older than rotate_hours.
+    """
+
+    def __init__(self, filename, max_bytes: int, rotate_hours: float, backups: int):
+        super().__init__(filename, mode="a", maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        self.interval = rotate_hours * 3600
+        try:
+            started = os.stat(self.baseFilename).st_mtime if os.path.getsize(self.baseFilename) else time.time()
+        except OSError:
+            started = time.time()
+        self.rollover_at = self._next_rollover(started)
+
+    def _next_rollover(self, started: float) -> float:
+        return started + self.interval if self.interval > 0 else float("inf")
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if record.created >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self.rollover_at = self._next_rollover(time.time())
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line - easy to grep, load into pandas or ship somewhere."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that hands the record over untouched.
+
+    The stock prepare() formats the message on the calling thread, which is
+    exactly the work we want off the order path. The queue never leaves the
+    process, so the record (args, traceback and all) can be formatted later.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait(record)
+
+
+# One writer thread per logger set up here
+_listeners: List[logging.handlers.QueueListener] = []
+
+
+def _output_handlers() -> list:
+    """The handlers that do the actual writing, run by the listener thread."""
+    file_handler = RotatingLogHandler(Path("bot.log"), config.log_max_bytes, config.log_rotate_hours, config.log_backups)
+    console_handler = logging.StreamHandler(sys.stdout)
+
+    # Simple format with timestamp
+    text = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+    file_handler.setFormatter(JsonFormatter() if config.log_format == "json" else text)
+    console_handler.setFormatter(text)
+    return [file_handler, console_handler]
+
+
+def _no_caller(stack_info: bool = False, stacklevel: int = 1):
+    return "(unknown file)", 0, "(unknown function)", None
 
 
 def setup_logger(name: str = "trading_bot") -> logging.Logger:
-    """Configure logger to write to file and console."""
+    """Configure logger to write to file and console through the background writer."""
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
-    
+
     # Don't add handlers twice
     if logger.handlers:
         return logger
-    
-    # Write to bot.log
-    log_file = Path("bot.log")
-    file_handler = logging.FileHandler(log_file, mode="a", encoding="utf-8")
-    file_handler.setLevel(logging.INFO)
-    
-    # Also show in console
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    
-    # Simple format with timestamp
-    formatter = logging.Formatter(
-        "%(asctime)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-    
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+
+    # Neither format prints the caller's file/line, so don't look it up -
+    # walking the stack is most of what a log call costs (see "Optimization"
+    # in the logging HOWTO). Only for this logger; other code in the
+    # process keeps its caller info.
+    logger.findCaller = _no_caller
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(LazyQueueHandler(records))
+
+    listener = logging.handlers.QueueListener(records, *_output_handlers(), respect_handler_level=True)
+    listener.start()
+    if not _listeners:
+        # Drain the queues before the interpreter goes away
+        atexit.register(flush_logs)
+    _listeners.append(listener)
+
     return logger
 
 
+def flush_logs() -> None:
+    """Write out everything still queued and stop the writer threads."""
+    while _listeners:
+        listener = _listeners.pop()
+        listener.stop()
+        for handler in listener.handlers:
+            try:
+                handler.flush()
+            except (OSError, ValueError):
+                # e.g. a console stream someone else already closed
+                pass
+            handler.close()
+
+
 logger = setup_logger()
@@ -4,32 +4,28 @@ Buys or sells immediately at current market price.
 """
 import sys
 import traceback
+from decimal import Decimal
 
 # Handle both direct execution and module execution
 try:
-    from .binance_client import BinanceClient
+    from .daemon_client import submit_order
     from .logger import logger
     from .validators import parse_market_order_args
 except ImportError:
-    from binance_client import BinanceClient
+    from daemon_client import submit_order
     from logger import logger
     from validators import parse_market_order_args
 
 
-def place_market_order(symbol: str, side: str, quantity: float) -> None:
+def place_market_order(symbol: str, side: str, quantity: Decimal) -> None:
     """Execute a market order - fills immediately at best available price."""
     try:
         logger.info(f"Market order requested: {side} {quantity} {symbol}")
         
-        client = BinanceClient()
-        
-        # Execute the order
-        response = client.place_order(
-            symbol=symbol,
-            side=side,
-            order_type="MARKET",
-            quantity=quantity
-        )
+        # Goes through the order daemon if it's running, straight to the API
+        # otherwise. Either way it's snapped to the step size and checked
+        # against the exchange filters first.
+        response, testnet = submit_order(symbol=symbol, side=side, order_type="MARKET", quantity=quantity)
         
         # Extract response details
         order_id = response.get("orderId")
@@ -39,7 +35,7 @@ def place_market_order(symbol: str, side: str, quantity: float) -> None:
         logger.info(f"Order filled - ID: {order_id}, Qty: {executed_qty}, Avg Price: {avg_price}")
         
         # Show user-friendly output
-        print(f"\nOrder placed successfully on {'testnet' if client.testnet else 'production'}")
+        print(f"\nOrder placed successfully on {'testnet' if testnet else 'production'}")
         print(f"  Order ID: {order_id}")
         print(f"  {side} {executed_qty} {symbol}")
         print(f"  Average Price: {avg_price}\n")
@@ -0,0 +1,350 @@
+"""
+Latency metrics for the order path.
+Both clients time each stage of a request (validate, rate limit, sign, first
+byte, body, decode, journal, log) into per-endpoint histograms. Read them
+with latency_report() or scrape them in Prometheus text format from
+MetricsServer.
+"""
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Handle both direct execution and module execution
+try:
+    from .config import config
+    from .logger import logger
+except ImportError:
+    from config import config
+    from logger import logger
+
+
+# Log-linear buckets, HDR histogram style: values below 2 * SUB_BUCKETS ns
+# get their own bucket, above that every power of two is split into
+# SUB_BUCKETS buckets - so any value is off by at most 1/32 (~3%).
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+# Up to 2^40 ns (~18 minutes) - anything slower lands in the last bucket
+MAX_EXPONENT = 40
+BUCKET_COUNT = (MAX_EXPONENT - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+# Extra slots at the end of each thread's counts
+_SUM = BUCKET_COUNT
+_MAX = BUCKET_COUNT + 1
+
+# Bucket bounds for the Prometheus export, in seconds
+EXPORT_BOUNDS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Request stages, in the order they happen
+STAGES = ("validate", "rate_limit", "sign", "first_byte", "body", "decode", "journal", "log", "total")
+
+
+def bucket_index(value: int) -> int:
+    """Bucket for a value in ns."""
+    if value < 2 * SUB_BUCKETS:
+        return max(value, 0)
+    shift = value.bit_length() - 1 - SUB_BUCKET_BITS
+    index = (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+    return min(index, BUCKET_COUNT - 1)
+
+
+def bucket_upper(index: int) -> int:
+    """Largest value (ns) that falls in a bucket."""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index % SUB_BUCKETS + SUB_BUCKETS
+    return ((mantissa + 1) << shift) - 1
+
+
+class _ShardOwner:
+    """Kept in the thread-local next to the counts - freed when its thread exits."""
+
+    __slots__ = ("__weakref__",)
+
+
+class Histogram:
+    """
+    Latency histogram that threads record into without taking a lock.
+
+    Every thread gets its own counts list (through threading.local) and is
+    the only one writing to it, so concurrent record() calls never collide.
+    Readers add up all the lists; a read that races a write is off by at
+    most the one value being recorded. When a thread exits, its counts are
+    folded into a shared base list, so short-lived pool threads don't
+    leave a list behind each.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: Dict[int, List[int]] = {}
+        self._base = [0] * (BUCKET_COUNT + 2)
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> List[int]:
+        counts = [0] * (BUCKET_COUNT + 2)
+        owner = _ShardOwner()
+        with self._shards_lock:
+            self._shards[id(counts)] = counts
+        # Thread-local values are dropped when the thread ends, which
+        # collects the owner and hands its counts back
+        weakref.finalize(owner, self._retire, counts)
+        self._local.owner = owner
+        self._local.counts = counts
+        return counts
+
+    def _retire(self, counts: List[int]) -> None:
+        with self._shards_lock:
+            self._merge(self._base, counts)
+            self._shards.pop(id(counts), None)
+
+    @staticmethod
+    def _merge(into: List[int], counts: List[int]) -> None:
+        for index in range(_MAX):
+            if counts[index]:
+                into[index] += counts[index]
+        # The max is a max, not a sum
+        into[_MAX] = max(into[_MAX], counts[_MAX])
+
+    def record(self, value_ns: int) -> None:
+        try:
+            counts = self._local.counts
+        except AttributeError:
+            counts = self._shard()
+        counts[bucket_index(value_ns)] += 1
+        counts[_SUM] += value_ns
+        if value_ns > counts[_MAX]:
+            counts[_MAX] = value_ns
+
+    def snapshot(self) -> List[int]:
+        """Counts per bucket plus [sum, max] at the end, summed over threads."""
+        with self._shards_lock:
+            merged = list(self._base)
+            shards = list(self._shards.values())
+        for counts in shards:
+            self._merge(merged, counts)
+        return merged
+
+    def reset(self) -> None:
+        with self._shards_lock:
+            self._base[:] = [0] * len(self._base)
+            for counts in self._shards.values():
+                counts[:] = [0] * len(counts)
+
+    @property
+    def shard_count(self) -> int:
+        """Threads currently holding their own counts."""
+        return len(self._shards)
+
+
+def summarize(counts: List[int], quantiles: Tuple[float, ...] = (0.5, 0.9, 0.99, 0.999)) -> Dict[str, float]:
+    """count, mean, quantiles and max (all in microseconds) from a snapshot."""
+    total = sum(counts[:BUCKET_COUNT])
+    summary: Dict[str, float] = {"count": total}
+    if not total:
+        return summary
+    summary["mean_us"] = counts[_SUM] / total / 1000
+    targets = [(q, max(1, int(q * total + 0.5))) for q in quantiles]
+    seen = 0
+    pending = iter(targets)
+    quantile, target = next(pending)
+    for index in range(BUCKET_COUNT):
+        seen += counts[index]
+        while seen >= target:
+            summary[f"p{quantile * 100:g}_us"] = min(bucket_upper(index), counts[_MAX]) / 1000
+            try:
+                quantile, target = next(pending)
+            except StopIteration:
+                summary["max_us"] = counts[_MAX] / 1000
+                return summary
+    summary["max_us"] = counts[_MAX] / 1000
+    return summary
+
+
+class Metrics:
+    """
+    Histograms keyed by (stage, endpoint), created on first use.
+
+    Clients time requests through timer(). enabled=False (or
+    BINANCE_METRICS=false) makes timer() hand out one that does nothing,
+    so switched off the cost is a few no-op method calls per request.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str, endpoint: str) -> Histogram:
+        key = (stage, endpoint)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        return histogram
+
+    def record(self, stage: str, endpoint: str, value_ns: int) -> None:
+        if self.enabled:
+            self.histogram(stage, endpoint).record(value_ns)
+
+    def timer(self, endpoint: str) -> "StageTimer":
+        """A StageTimer for one request (a do-nothing one when disabled)."""
+        return StageTimer(self, endpoint) if self.enabled else _OFF
+
+    def items(self) -> Iterator[Tuple[str, str, List[int]]]:
+        """(stage, endpoint, snapshot) for every histogram, in stage order."""
+        with self._lock:
+            keys = sorted(self._histograms, key=lambda key: (key[1], STAGES.index(key[0]) if key[0] in STAGES else 99))
+        for stage, endpoint in keys:
+            yield stage, endpoint, self._histograms[(stage, endpoint)].snapshot()
+
+    def report(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Latency per endpoint and stage.
+
+        Returns:
+            {endpoint: {stage: {"count", "mean_us", "p50_us", "p90_us",
+            "p99_us", "p99.9_us", "max_us"}}}
+        """
+        report: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for stage, endpoint, counts in self.items():
+            report.setdefault(endpoint, {})[stage] = summarize(counts)
+        return report
+
+    def reset(self) -> None:
+        with self._lock:
+            for histogram in self._histograms.values():
+                histogram.reset()
+
+    def prometheus(self) -> str:
+        """All histograms in the Prometheus text exposition format."""
+        lines = [
+            "# HELP binance_request_stage_seconds Time spent in each stage of an API request",
+            "# TYPE binance_request_stage_seconds histogram",
+        ]
+        for stage, endpoint, counts in self.items():
+            labels = f'stage="{stage}",endpoint="{endpoint}"'
+            cumulative = 0
+            index = 0
+            for bound in EXPORT_BOUNDS:
+                limit_ns = int(bound * 1e9)
+                while index < BUCKET_COUNT and bucket_upper(index) <= limit_ns:
+                    cumulative += counts[index]
+                    index += 1
+                lines.append(f'binance_request_stage_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            total = sum(counts[:BUCKET_COUNT])
+            lines.append(f'binance_request_stage_seconds_bucket{{{labels},le="+Inf"}} {total}')
+            lines.append(f"binance_request_stage_seconds_sum{{{labels}}} {counts[_SUM] / 1e9:.9f}")
+            lines.append(f"binance_request_stage_seconds_count{{{labels}}} {total}")
+        return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """
+    Times consecutive stages of one request:
+
+        timer = metrics.timer("/fapi/v1/order")
+        sign(...)
+        timer.mark("sign")        # time since the timer started
+        send(...)
+        timer.mark("decode")      # time since the previous mark
+        timer.done()              # whole request -> "total"
+    """
+
+    __slots__ = ("metrics", "endpoint", "started", "last")
+
+    def __init__(self, metrics: Metrics, endpoint: str):
+        self.metrics = metrics
+        self.endpoint = endpoint
+        self.started = self.last = time.perf_counter_ns()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter_ns()
+        self.metrics.histogram(stage, self.endpoint).record(now - self.last)
+        self.last = now
+
+    def mark_response(self, first_byte_ns: int) -> None:
+        """Split the time since the last mark into first_byte (until the headers) and body."""
+        now = time.perf_counter_ns()
+        spent = now - self.last
+        first_byte_ns = min(max(first_byte_ns, 0), spent)
+        self.metrics.histogram("first_byte", self.endpoint).record(first_byte_ns)
+        self.metrics.histogram("body", self.endpoint).record(spent - first_byte_ns)
+        self.last = now
+
+    def restart(self) -> None:
+        """Skip the time since the last mark (e.g. a stage timed elsewhere)."""
+        self.last = time.perf_counter_ns()
+
+    def done(self) -> None:
+        self.metrics.histogram("total", self.endpoint).record(time.perf_counter_ns() - self.started)
+
+
+class _NoTimer:
+    """Stands in for StageTimer when metrics are off."""
+
+    __slots__ = ()
+
+    def mark(self, stage: str) -> None:
+        pass
+
+    def mark_response(self, first_byte_ns: int) -> None:
+        pass
+
+    def restart(self) -> None:
+        pass
+
+    def done(self) -> None:
+        pass
+
+
+_OFF = _NoTimer()
+
+
+class MetricsServer:
+    """
+    Serves metrics.prometheus() at http://host:port/metrics from a daemon
+    thread. Binds to localhost by default - latency data isn't secret, but
+    there's no reason to expose it.
+    """
+
+    def __init__(self, metrics: "Metrics", host: str = "127.0.0.1", port: int = 9108):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> None:
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        # Port 0 picks a free one
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info("Metrics at http://%s:%d/metrics", self.host, self.port)
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# Shared by every client in the process, like the logger
+metrics = Metrics(enabled=config.metrics_enabled)
@@ -0,0 +1,947 @@
+"""
+Local stand-in for the Binance USDT-M Futures API.
+Runs the real BinanceClient code path without touching the network - point
+the client at it with base_url (or BINANCE_BASE_URL) and trade against a
+small price-time-priority matching engine.
+
+Run with: python mock_server.py --port 8080 --latency 0.005 --error-rate 0.01
+"""
+import argparse
+import bisect
+import hashlib
+import hmac
+import json
+import random
+import secrets
+import threading
+import time
+from collections import deque
+from decimal import Decimal, InvalidOperation
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+# Handle both direct execution and module execution
+try:
+    from .rate_limiter import request_cost
+except ImportError:
+    from rate_limiter import request_cost
+
+
+# Symbols the mock lists by default: reference price, tick size, step size
+DEFAULT_SYMBOLS = {
+    "BTCUSDT": ("42000", "0.10", "0.001"),
+    "ETHUSDT": ("2200", "0.01", "0.001"),
+    "BNBUSDT": ("310", "0.010", "0.01"),
+    "SOLUSDT": ("100", "0.0100", "1"),
+}
+
+TAKER_FEE = Decimal("0.0004")
+MAKER_FEE = Decimal("0.0002")
+HOUSE = "__house__"
+
+# Leverage brackets handed out for every symbol: (max leverage, notional cap,
+# maintenance margin ratio) - Binance's BTCUSDT tiers, trimmed
+LEVERAGE_BRACKETS = [
+    (125, 50_000, 0.004), (100, 250_000, 0.005), (50, 3_000_000, 0.01),
+    (20, 15_000_000, 0.025), (10, 30_000_000, 0.05), (5, 80_000_000, 0.1),
+]
+
+
+class ApiError(Exception):
+    """Binance-style error, turned into {"code": ..., "msg": ...}."""
+
+    def __init__(self, code: int, msg: str, status: int = 400):
+        super().__init__(msg)
+        self.code = code
+        self.msg = msg
+        self.status = status
+
+
+def _fmt(value: Decimal) -> str:
+    text = format(value.normalize(), "f")
+    return text if text != "-0" else "0"
+
+
+def _decimal(params: Dict[str, str], key: str, required: bool = True) -> Optional[Decimal]:
+    if key not in params:
+        if required:
+            raise ApiError(-1102, f"Mandatory parameter '{key}' was not sent, was empty/null, or malformed.")
+        return None
+    try:
+        value = Decimal(params[key])
+    except InvalidOperation:
+        raise ApiError(-1100, f"Illegal characters found in parameter '{key}'.")
+    if not value.is_finite() or value <= 0:
+        raise ApiError(-1111, f"Parameter '{key}' is invalid.")
+    return value
+
+
+class _Order:
+    """One order inside the engine."""
+    __slots__ = ("account", "order_id", "client_order_id", "symbol", "side", "type", "time_in_force",
+                 "price", "orig_qty", "executed_qty", "cum_quote", "status", "reduce_only", "update_time")
+
+    def __init__(self, account, order_id, client_order_id, symbol, side, order_type, time_in_force,
+                 price, qty, reduce_only):
+        self.account = account
+        self.order_id = order_id
+        self.client_order_id = client_order_id
+        self.symbol = symbol
+        self.side = side
+        self.type = order_type
+        self.time_in_force = time_in_force
+        self.price = price
+        self.orig_qty = qty
+        self.executed_qty = Decimal("0")
+        self.cum_quote = Decimal("0")
+        self.status = "NEW"
+        self.reduce_only = reduce_only
+        self.update_time = int(time.time() * 1000)
+
+    @property
+    def remaining(self) -> Decimal:
+        return self.orig_qty - self.executed_qty
+
+    def to_json(self) -> Dict[str, Any]:
+        avg_price = self.cum_quote / self.executed_qty if self.executed_qty else Decimal("0")
+        return {
+            "orderId": self.order_id,
+            "symbol": self.symbol,
+            "status": self.status,
+            "clientOrderId": self.client_order_id,
+            "price": _fmt(self.price or Decimal("0")),
+            "avgPrice": _fmt(avg_price),
+            "origQty": _fmt(self.orig_qty),
+            "executedQty": _fmt(self.executed_qty),
+            "cumQuote": _fmt(self.cum_quote),
+            "timeInForce": self.time_in_force,
+            "type": self.type,
+            "reduceOnly": self.reduce_only,
+            "side": self.side,
+            "positionSide": "BOTH",
+            "stopPrice": "0",
+            "updateTime": self.update_time,
+        }
+
+
+class _BookSide:
+    """Price levels for one side - sorted prices plus a FIFO queue per level."""
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self.prices: List[Decimal] = []
+        self.levels: Dict[Decimal, deque] = {}
+
+    def best(self) -> Optional[Decimal]:
+        if not self.prices:
+            return None
+        return self.prices[-1] if self.is_bid else self.prices[0]
+
+    def add(self, order: _Order) -> None:
+        if order.price not in self.levels:
+            bisect.insort(self.prices, order.price)
+            self.levels[order.price] = deque()
+        self.levels[order.price].append(order)
+
+    def remove(self, order: _Order) -> None:
+        level = self.levels.get(order.price)
+        if level is None:
+            return
+        try:
+            level.remove(order)
+        except ValueError:
+            return
+        if not level:
+            self._drop_level(order.price)
+
+    def _drop_level(self, price: Decimal) -> None:
+        del self.levels[price]
+        self.prices.pop(bisect.bisect_left(self.prices, price))
+
+    def crosses(self, price: Optional[Decimal]) -> bool:
+        """Would an incoming order at price (None = market) trade against this side?"""
+        best = self.best()
+        if best is None:
+            return False
+        if price is None:
+            return True
+        return price <= best if self.is_bid else price >= best
+
+    def liquidity(self, price: Optional[Decimal]) -> Decimal:
+        """Total resting quantity an incoming order at price could take."""
+        total = Decimal("0")
+        prices = reversed(self.prices) if self.is_bid else self.prices
+        for level_price in prices:
+            if price is not None and (level_price < price if self.is_bid else level_price > price):
+                break
+            total += sum(order.remaining for order in self.levels[level_price])
+        return total
+
+
+class _Account:
+    """Wallet and positions for one API key."""
+
+    def __init__(self, balance: Decimal):
+        self.balance = balance
+        # symbol -> [position amount, entry price, realized pnl]
+        self.positions: Dict[str, List[Decimal]] = {}
+
+    def position(self, symbol: str) -> List[Decimal]:
+        return self.positions.setdefault(symbol, [Decimal("0"), Decimal("0"), Decimal("0")])
+
+    def apply_fill(self, symbol: str, side: str, qty: Decimal, price: Decimal, fee_rate: Decimal) -> None:
+        position = self.position(symbol)
+        amount, entry = position[0], position[1]
+        signed_qty = qty if side == "BUY" else -qty
+
+        if amount == 0 or (amount > 0) == (signed_qty > 0):
+            # Opening or adding - new weighted average entry
+            new_amount = amount + signed_qty
+            position[1] = (abs(amount) * entry + qty * price) / abs(new_amount)
+            position[0] = new_amount
+        else:
+            # Reducing, closing or flipping
+            closed = min(qty, abs(amount))
+            pnl = (price - entry) * closed if amount > 0 else (entry - price) * closed
+            position[2] += pnl
+            self.balance += pnl
+            new_amount = amount + signed_qty
+            position[0] = new_amount
+            if new_amount == 0:
+                position[1] = Decimal("0")
+            elif (new_amount > 0) != (amount > 0):
+                position[1] = price
+
+        self.balance -= qty * price * fee_rate
+
+
+class MatchingEngine:
+    """
+    Price-time-priority matching for a handful of symbols.
+
+    A house account keeps a ladder of resting orders around the last trade
+    price on both sides, so market orders always have something to hit.
+    """
+
+    def __init__(self, symbols: Optional[Dict[str, Tuple[str, str, str]]] = None,
+                 starting_balance: str = "10000", house_levels: int = 20, house_qty: str = "5"):
+        self.symbols = {}
+        for symbol, (price, tick, step) in (symbols or DEFAULT_SYMBOLS).items():
+            self.symbols[symbol] = {"last": Decimal(price), "tick": Decimal(tick), "step": Decimal(step),
+                                    # Rolling stats for the 24hr ticker, since the mock started
+                                    "open": Decimal(price), "high": Decimal(price), "low": Decimal(price),
+                                    "volume": Decimal("0"), "quote_volume": Decimal("0"), "count": 0,
+                                    "trade_time": int(time.time() * 1000)}
+        self.starting_balance = Decimal(starting_balance)
+        self.house_levels = house_levels
+        self.house_qty = Decimal(house_qty)
+
+        self.lock = threading.RLock()
+        self.books = {symbol: (_BookSide(True), _BookSide(False)) for symbol in self.symbols}
+        self.accounts: Dict[str, _Account] = {}
+        self.orders: Dict[int, _Order] = {}
+        self.client_ids: Dict[Tuple[str, str], _Order] = {}
+        self._next_order_id = 1
+
+        for symbol in self.symbols:
+            self._replenish(symbol)
+
+    def account(self, api_key: str) -> _Account:
+        if api_key not in self.accounts:
+            self.accounts[api_key] = _Account(self.starting_balance)
+        return self.accounts[api_key]
+
+    def _new_id(self) -> int:
+        order_id = self._next_order_id
+        self._next_order_id += 1
+        return order_id
+
+    def _replenish(self, symbol: str) -> None:
+        """Top the house ladder back up around the last trade price."""
+        info = self.symbols[symbol]
+        bids, asks = self.books[symbol]
+        last, tick = info["last"], info["tick"]
+        for level in range(1, self.house_levels + 1):
+            for book, side, price in ((bids, "BUY", last - tick * level), (asks, "SELL", last + tick * level)):
+                if price <= 0 or price in book.levels:
+                    continue
+                order = _Order(HOUSE, self._new_id(), "", symbol, side, "LIMIT", "GTC",
+                               price, self.house_qty, False)
+                self.orders[order.order_id] = order
+                book.add(order)
+
+    def submit(self, api_key: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """Handle a new order request. Returns the order JSON."""
+        symbol = params.get("symbol", "")
+        if symbol not in self.symbols:
+            raise ApiError(-1121, "Invalid symbol.")
+        side = params.get("side")
+        if side not in ("BUY", "SELL"):
+            raise ApiError(-1117, "Invalid side.")
+        order_type = params.get("type")
+        if order_type not in ("LIMIT", "MARKET"):
+            raise ApiError(-1116, "Invalid orderType.")
+
+        info = self.symbols[symbol]
+        qty = _decimal(params, "quantity")
+        if qty % info["step"] != 0:
+            raise ApiError(-1111, "Precision is over the maximum defined for this asset.")
+
+        price = None
+        time_in_force = params.get("timeInForce", "GTC")
+        if order_type == "LIMIT":
+            price = _decimal(params, "price")
+            if price % info["tick"] != 0:
+                raise ApiError(-4014, "Price not increased by tick size.")
+            if time_in_force not in ("GTC", "IOC", "FOK", "GTX"):
+                raise ApiError(-1115, "Invalid timeInForce.")
+
+        with self.lock:
+            client_order_id = params.get("newClientOrderId") or f"mock-{self._next_order_id}"
+            existing = self.client_ids.get((api_key, client_order_id))
+            if existing is not None and existing.status in ("NEW", "PARTIALLY_FILLED"):
+                raise ApiError(-4116, "ClientOrderId is duplicated.")
+
+            reduce_only = params.get("reduceOnly", "false").lower() == "true"
+            if reduce_only:
+                amount = self.account(api_key).position(symbol)[0]
+                if amount == 0 or (amount > 0) == (side == "BUY"):
+                    raise ApiError(-2022, "ReduceOnly Order is rejected.")
+                qty = min(qty, abs(amount))
+
+            order = _Order(api_key, self._new_id(), client_order_id, symbol, side, order_type,
+                           time_in_force, price, qty, reduce_only)
+            self.orders[order.order_id] = order
+            self.client_ids[(api_key, client_order_id)] = order
+            self._match(order)
+            return order.to_json()
+
+    def _match(self, order: _Order) -> None:
+        bids, asks = self.books[order.symbol]
+        own, opposite = (bids, asks) if order.side == "BUY" else (asks, bids)
+
+        if order.time_in_force == "GTX" and opposite.crosses(order.price):
+            order.status = "EXPIRED"
+            return
+        if order.time_in_force == "FOK" and opposite.liquidity(order.price) < order.orig_qty:
+            order.status = "EXPIRED"
+            return
+
+        while order.remaining > 0 and opposite.crosses(order.price):
+            best = opposite.best()
+            resting = opposite.levels[best][0]
+            qty = min(order.remaining, resting.remaining)
+            self._fill(order, qty, best, TAKER_FEE)
+            self._fill(resting, qty, best, MAKER_FEE)
+            if resting.remaining == 0:
+                opposite.remove(resting)
+            self._trade(order.symbol, best, qty)
+
+        if order.remaining > 0:
+            if order.type == "LIMIT" and order.time_in_force == "GTC":
+                own.add(order)
+            else:
+                # Market and IOC leftovers don't rest on the book
+                order.status = "EXPIRED"
+
+        self._replenish(order.symbol)
+
+    def _fill(self, order: _Order, qty: Decimal, price: Decimal, fee_rate: Decimal) -> None:
+        order.executed_qty += qty
+        order.cum_quote += qty * price
+        order.status = "FILLED" if order.remaining == 0 else "PARTIALLY_FILLED"
+        order.update_time = int(time.time() * 1000)
+        if order.account != HOUSE:
+            self.account(order.account).apply_fill(order.symbol, order.side, qty, price, fee_rate)
+
+    def find(self, api_key: str, params: Dict[str, str]) -> _Order:
+        """Look up one of the caller's orders by orderId or origClientOrderId."""
+        order = None
+        if "orderId" in params:
+            try:
+                order = self.orders.get(int(params["orderId"]))
+            except ValueError:
+                raise ApiError(-1100, "Illegal characters found in parameter 'orderId'.")
+        elif "origClientOrderId" in params:
+            order = self.client_ids.get((api_key, params["origClientOrderId"]))
+        else:
+            raise ApiError(-1102, "Either orderId or origClientOrderId must be sent.")
+        if order is None or order.account != api_key or order.symbol != params.get("symbol"):
+            raise ApiError(-2013, "Order does not exist.")
+        return order
+
+    def cancel(self, api_key: str, params: Dict[str, str]) -> Dict[str, Any]:
+        with self.lock:
+            order = self.find(api_key, params)
+            if order.status not in ("NEW", "PARTIALLY_FILLED"):
+                raise ApiError(-2011, "Unknown order sent.")
+            bids, asks = self.books[order.symbol]
+            (bids if order.side == "BUY" else asks).remove(order)
+            order.status = "CANCELED"
+            order.update_time = int(time.time() * 1000)
+            return order.to_json()
+
+    def modify(self, api_key: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """Change price/quantity of an open LIMIT order, like PUT /fapi/v1/order."""
+        with self.lock:
+            order = self.find(api_key, params)
+            if order.status not in ("NEW", "PARTIALLY_FILLED"):
+                raise ApiError(-2013, "Order does not exist.")
+            if order.type != "LIMIT":
+                raise ApiError(-1116, "Only LIMIT orders can be modified.")
+            if params.get("side") != order.side:
+                raise ApiError(-1117, "Invalid side.")
+            info = self.symbols[order.symbol]
+            qty = _decimal(params, "quantity")
+            price = _decimal(params, "price")
+            if qty % info["step"] != 0:
+                raise ApiError(-1111, "Precision is over the maximum defined for this asset.")
+            if price % info["tick"] != 0:
+                raise ApiError(-4014, "Price not increased by tick size.")
+            if qty <= order.executed_qty:
+                raise ApiError(-1111, "Quantity must be greater than the executed quantity.")
+            if qty == order.orig_qty and price == order.price:
+                raise ApiError(-5027, "No need to modify the order.")
+
+            bids, asks = self.books[order.symbol]
+            own = bids if order.side == "BUY" else asks
+            order.update_time = int(time.time() * 1000)
+            if price == order.price and qty < order.orig_qty:
+                # Smaller size at the same price keeps its place in the queue
+                order.orig_qty = qty
+                return order.to_json()
+            own.remove(order)
+            order.price, order.orig_qty = price, qty
+            self._match(order)
+            return order.to_json()
+
+    def cancel_all(self, api_key: str, symbol: str) -> Dict[str, Any]:
+        with self.lock:
+            if symbol not in self.books:
+                raise ApiError(-1121, "Invalid symbol.")
+            bids, asks = self.books[symbol]
+            now = int(time.time() * 1000)
+            for order in self.orders.values():
+                if order.account == api_key and order.symbol == symbol and order.status in ("NEW", "PARTIALLY_FILLED"):
+                    (bids if order.side == "BUY" else asks).remove(order)
+                    order.status = "CANCELED"
+                    order.update_time = now
+            return {"code": 200, "msg": "The operation of cancel all open order is done."}
+
+    def _trade(self, symbol: str, price: Decimal, qty: Decimal) -> None:
+        info = self.symbols[symbol]
+        info["last"] = price
+        info["high"] = max(info["high"], price)
+        info["low"] = min(info["low"], price)
+        info["volume"] += qty
+        info["quote_volume"] += qty * price
+        info["count"] += 1
+        info["trade_time"] = int(time.time() * 1000)
+
+    def _selected(self, symbol: Optional[str]) -> List[str]:
+        if symbol is None:
+            return list(self.symbols)
+        if symbol not in self.symbols:
+            raise ApiError(-1121, "Invalid symbol.")
+        return [symbol]
+
+    @staticmethod
+    def _one_or_all(rows: List[Dict[str, Any]], symbol: Optional[str]) -> Any:
+        # With a symbol the market data endpoints answer with one object
+        return rows[0] if symbol is not None else rows
+
+    def ticker_24hr(self, symbol: Optional[str] = None) -> Any:
+        with self.lock:
+            rows = []
+            for name in self._selected(symbol):
+                info = self.symbols[name]
+                change = info["last"] - info["open"]
+                rows.append({
+                    "symbol": name,
+                    "priceChange": _fmt(change),
+                    "priceChangePercent": _fmt((change / info["open"] * 100).quantize(Decimal("0.001"))),
+                    "weightedAvgPrice": _fmt(info["quote_volume"] / info["volume"] if info["volume"] else info["last"]),
+                    "lastPrice": _fmt(info["last"]),
+                    "lastQty": "0",
+                    "openPrice": _fmt(info["open"]),
+                    "highPrice": _fmt(info["high"]),
+                    "lowPrice": _fmt(info["low"]),
+                    "volume": _fmt(info["volume"]),
+                    "quoteVolume": _fmt(info["quote_volume"]),
+                    "openTime": info["trade_time"] - 86_400_000,
+                    "closeTime": info["trade_time"],
+                    "count": info["count"],
+                })
+            return self._one_or_all(rows, symbol)
+
+    def premium_index(self, symbol: Optional[str] = None) -> Any:
+        with self.lock:
+            now = int(time.time() * 1000)
+            # Funding every 8 hours, the rate leaning with the day's price change
+            next_funding = (now // 28_800_000 + 1) * 28_800_000
+            rows = []
+            for name in self._selected(symbol):
+                info = self.symbols[name]
+                rate = max(min((info["last"] - info["open"]) / info["open"] / 10 + Decimal("0.0001"),
+                               Decimal("0.0075")), Decimal("-0.0075"))
+                rows.append({
+                    "symbol": name,
+                    "markPrice": _fmt(info["last"]),
+                    "indexPrice": _fmt(info["last"]),
+                    "estimatedSettlePrice": _fmt(info["last"]),
+                    "lastFundingRate": _fmt(rate.quantize(Decimal("0.00000001"))),
+                    "interestRate": "0.00010000",
+                    "nextFundingTime": next_funding,
+                    "time": info["trade_time"],
+                })
+            return self._one_or_all(rows, symbol)
+
+    def book_ticker(self, symbol: Optional[str] = None) -> Any:
+        with self.lock:
+            rows = []
+            for name in self._selected(symbol):
+                bids, asks = self.books[name]
+                bid, ask = bids.best(), asks.best()
+                rows.append({
+                    "symbol": name,
+                    "bidPrice": _fmt(bid) if bid is not None else "0",
+                    "bidQty": _fmt(bids.liquidity(bid)) if bid is not None else "0",
+                    "askPrice": _fmt(ask) if ask is not None else "0",
+                    "askQty": _fmt(asks.liquidity(ask)) if ask is not None else "0",
+                    "time": int(time.time() * 1000),
+                    "lastUpdateId": self._next_order_id,
+                })
+            return self._one_or_all(rows, symbol)
+
+    def depth(self, symbol: str, limit: int = 500) -> Dict[str, Any]:
+        """Aggregated price levels, like /fapi/v1/depth."""
+        with self.lock:
+            if symbol not in self.books:
+                raise ApiError(-1121, "Invalid symbol.")
+            bids, asks = self.books[symbol]
+
+            def levels(book: _BookSide) -> List[List[str]]:
+                prices = reversed(book.prices) if book.is_bid else book.prices
+                return [[str(price), str(sum(order.remaining for order in book.levels[price]))]
+                        for _, price in zip(range(limit), prices)]
+
+            now = int(time.time() * 1000)
+            # Order IDs only ever go up, so they double as the book's update ID
+            return {"lastUpdateId": self._next_order_id, "E": now, "T": now,
+                    "bids": levels(bids), "asks": levels(asks)}
+
+    def open_orders(self, api_key: str, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [order.to_json() for order in self.orders.values()
+                    if order.account == api_key and order.status in ("NEW", "PARTIALLY_FILLED")
+                    and (symbol is None or order.symbol == symbol)]
+
+    def positions(self, api_key: str, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self.lock:
+            account = self.account(api_key)
+            result = []
+            for name in self.symbols:
+                if symbol is not None and name != symbol:
+                    continue
+                amount, entry, _ = account.position(name)
+                mark = self.symbols[name]["last"]
+                result.append({
+                    "symbol": name,
+                    "positionAmt": _fmt(amount),
+                    "entryPrice": _fmt(entry),
+                    "markPrice": _fmt(mark),
+                    "unRealizedProfit": _fmt((mark - entry) * amount),
+                    "liquidationPrice": "0",
+                    "leverage": "20",
+                    "maxNotionalValue": "25000000",
+                    "marginType": "cross",
+                    "isolatedMargin": "0",
+                    "isAutoAddMargin": "false",
+                    "positionSide": "BOTH",
+                    "notional": _fmt(mark * amount),
+                    "isolatedWallet": "0",
+                    "updateTime": int(time.time() * 1000),
+                })
+            return result
+
+    def account_info(self, api_key: str) -> Dict[str, Any]:
+        positions = self.positions(api_key)
+        with self.lock:
+            account = self.account(api_key)
+            unrealized = sum((Decimal(p["unRealizedProfit"]) for p in positions), Decimal("0"))
+            balance = _fmt(account.balance)
+            return {
+                "feeTier": 0,
+                "canTrade": True,
+                "canDeposit": True,
+                "canWithdraw": True,
+                "updateTime": 0,
+                "totalWalletBalance": balance,
+                "totalCrossWalletBalance": balance,
+                "totalUnrealizedProfit": _fmt(unrealized),
+                "totalMarginBalance": _fmt(account.balance + unrealized),
+                "availableBalance": balance,
+                "maxWithdrawAmount": balance,
+                "assets": [{
+                    "asset": "USDT",
+                    "walletBalance": balance,
+                    "unrealizedProfit": _fmt(unrealized),
+                    "marginBalance": _fmt(account.balance + unrealized),
+                    "availableBalance": balance,
+                }],
+                "positions": positions,
+            }
+
+    def leverage_brackets(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        brackets, floor, cum = [], 0, 0.0
+        for number, (leverage, cap, ratio) in enumerate(LEVERAGE_BRACKETS, 1):
+            if brackets:
+                # Maintenance amount that keeps the tiered margin continuous at the floor
+                cum += floor * (ratio - brackets[-1]["maintMarginRatio"])
+            brackets.append({"bracket": number, "initialLeverage": leverage, "notionalCap": cap,
+                             "notionalFloor": floor, "maintMarginRatio": ratio, "cum": cum})
+            floor = cap
+        return [{"symbol": name, "brackets": brackets} for name in self.symbols if symbol in (None, name)]
+
+    def exchange_info(self) -> Dict[str, Any]:
+        symbols = []
+        for name, info in self.symbols.items():
+            tick, step = info["tick"], info["step"]
+            symbols.append({
+                "symbol": name,
+                "pair": name,
+                "contractType": "PERPETUAL",
+                "status": "TRADING",
+                "baseAsset": name[:-4],
+                "quoteAsset": "USDT",
+                "marginAsset": "USDT",
+                "pricePrecision": max(-tick.normalize().as_tuple().exponent, 0),
+                "quantityPrecision": max(-step.normalize().as_tuple().exponent, 0),
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "minPrice": _fmt(tick), "maxPrice": "10000000", "tickSize": str(tick)},
+                    {"filterType": "LOT_SIZE", "stepSize": str(step), "maxQty": "10000", "minQty": str(step)},
+                    {"filterType": "MARKET_LOT_SIZE", "stepSize": str(step), "maxQty": "1000", "minQty": str(step)},
+                    {"filterType": "MAX_NUM_ORDERS", "limit": 200},
+                    {"filterType": "MIN_NOTIONAL", "notional": "5"},
+                ],
+                "orderTypes": ["LIMIT", "MARKET"],
+                "timeInForce": ["GTC", "IOC", "FOK", "GTX"],
+            })
+        return {
+            "timezone": "UTC",
+            "serverTime": int(time.time() * 1000),
+            "rateLimits": [
+                {"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1, "limit": 2400},
+                {"rateLimitType": "ORDERS", "interval": "MINUTE", "intervalNum": 1, "limit": 1200},
+                {"rateLimitType": "ORDERS", "interval": "SECOND", "intervalNum": 10, "limit": 300},
+            ],
+            "symbols": symbols,
+        }
+
+
+class MockBinanceServer:
+    """
+    HTTP front end for MatchingEngine that speaks the Binance REST dialect.
+
+    Usage:
+        server = MockBinanceServer(api_keys={"key": "secret"})
+        server.start()
+        client = BinanceClient(api_key="key", api_secret="secret", base_url=server.url)
+        ...
+        server.stop()
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, api_keys: Optional[Dict[str, str]] = None,
+                 engine: Optional[MatchingEngine] = None, latency: float = 0.0, latency_jitter: float = 0.0,
+                 error_rate: float = 0.0, ambiguous_rate: float = 0.0, clock_offset_ms: int = 0,
+                 weight_limit: int = 2400, order_limit_10s: int = 300, order_limit_1m: int = 1200):
+        """
+        Args:
+            api_keys: Accepted key -> secret pairs (any key is accepted if None,
+                      and signatures are then checked against "secret")
+            engine: Matching engine to use (a default one is created)
+            latency: Seconds added to every response
+            latency_jitter: Extra random latency, uniform in [0, jitter]
+            error_rate: Chance a request fails with 503/-1001 before doing anything
+            ambiguous_rate: Chance a request is processed but still answered with 503/-1007
+            clock_offset_ms: How far the server clock runs ahead of ours
+        """
+        self.api_keys = api_keys
+        self.engine = engine or MatchingEngine()
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.ambiguous_rate = ambiguous_rate
+        self.clock_offset_ms = clock_offset_ms
+        self.limits = {"weight": weight_limit, "orders_10s": order_limit_10s, "orders_1m": order_limit_1m}
+
+        self._usage_lock = threading.Lock()
+        self._usage: Dict[str, List[int]] = {}  # window name -> [window id, used]
+        self.request_count = 0
+        self._listen_keys: Dict[str, str] = {}  # api key -> listenKey
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockBinanceServer":
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-binance", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def server_time(self) -> int:
+        return int(time.time() * 1000) + self.clock_offset_ms
+
+    def _charge(self, method: str, path: str, params: Dict[str, str]) -> Dict[str, str]:
+        """Count the request against the limits, like the exchange does."""
+        weight, orders_10s, orders_1m = request_cost(method, path, params)
+        now = time.time()
+        with self._usage_lock:
+            headers = {}
+            over = False
+            for name, seconds, cost, header in (("weight", 60, weight, "X-MBX-USED-WEIGHT-1M"),
+                                                ("orders_10s", 10, orders_10s, "X-MBX-ORDER-COUNT-10S"),
+                                                ("orders_1m", 60, orders_1m, "X-MBX-ORDER-COUNT-1M")):
+                window_id = int(now // seconds)
+                usage = self._usage.setdefault(name, [window_id, 0])
+                if usage[0] != window_id:
+                    usage[0], usage[1] = window_id, 0
+                usage[1] += cost
+                over = over or usage[1] > self.limits[name]
+                if header != "X-MBX-USED-WEIGHT-1M" and cost == 0:
+                    continue
+                headers[header] = str(usage[1])
+            if over:
+                headers["Retry-After"] = str(int(60 - now % 60) + 1)
+                raise _RateLimited(headers)
+            return headers
+
+    def _authenticate(self, headers, raw_params: str, params: Dict[str, str]) -> str:
+        api_key = headers.get("X-MBX-APIKEY")
+        if not api_key:
+            raise ApiError(-2014, "API-key format invalid.", 401)
+        if self.api_keys is not None and api_key not in self.api_keys:
+            raise ApiError(-2015, "Invalid API-key, IP, or permissions for action.", 401)
+        secret = self.api_keys[api_key] if self.api_keys is not None else "secret"
+
+        # Binance signs the exact query string with the signature stripped off
+        payload, _, signature = raw_params.rpartition("&signature=")
+        expected = hmac.new(secret.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).hexdigest()
+        if not signature or not hmac.compare_digest(signature, expected):
+            raise ApiError(-1022, "Signature for this request is not valid.")
+
+        try:
+            timestamp = int(params["timestamp"])
+            recv_window = int(params.get("recvWindow", 5000))
+        except (KeyError, ValueError):
+            raise ApiError(-1102, "Mandatory parameter 'timestamp' was not sent, was empty/null, or malformed.")
+        server_time = self.server_time()
+        if timestamp > server_time + 1000 or server_time - timestamp > recv_window:
+            raise ApiError(-1021, "Timestamp for this request is outside of the recvWindow.")
+        return api_key
+
+    def _route(self, method: str, path: str, headers, raw_params: str, params: Dict[str, str]) -> Any:
+        engine = self.engine
+        if (method, path) == ("GET", "/fapi/v1/ping"):
+            return {}
+        if (method, path) == ("GET", "/fapi/v1/time"):
+            return {"serverTime": self.server_time()}
+        if (method, path) == ("GET", "/fapi/v1/exchangeInfo"):
+            return engine.exchange_info()
+        if (method, path) == ("GET", "/fapi/v1/depth"):
+            return engine.depth(params.get("symbol", ""), int(params.get("limit", 500)))
+        if (method, path) == ("GET", "/fapi/v1/ticker/24hr"):
+            return engine.ticker_24hr(params.get("symbol"))
+        if (method, path) == ("GET", "/fapi/v1/premiumIndex"):
+            return engine.premium_index(params.get("symbol"))
+        if (method, path) == ("GET", "/fapi/v1/ticker/bookTicker"):
+            return engine.book_ticker(params.get("symbol"))
+
+        if path == "/fapi/v1/listenKey" and method in ("POST", "PUT", "DELETE"):
+            return self._listen_key(method, headers)
+
+        signed_routes = {
+            ("POST", "/fapi/v1/order"): lambda key: engine.submit(key, params),
+            ("GET", "/fapi/v1/order"): lambda key: engine.find(key, params).to_json(),
+            ("DELETE", "/fapi/v1/order"): lambda key: engine.cancel(key, params),
+            ("PUT", "/fapi/v1/order"): lambda key: engine.modify(key, params),
+            ("POST", "/fapi/v1/batchOrders"): lambda key: self._batch(key, params, engine.submit),
+            ("PUT", "/fapi/v1/batchOrders"): lambda key: self._batch(key, params, engine.modify),
+            ("DELETE", "/fapi/v1/batchOrders"): lambda key: self._batch_cancel(key, params),
+            ("DELETE", "/fapi/v1/allOpenOrders"): lambda key: engine.cancel_all(key, params.get("symbol", "")),
+            ("GET", "/fapi/v1/openOrders"): lambda key: engine.open_orders(key, params.get("symbol")),
+            ("GET", "/fapi/v2/account"): lambda key: engine.account_info(key),
+            ("GET", "/fapi/v2/positionRisk"): lambda key: engine.positions(key, params.get("symbol")),
+            ("GET", "/fapi/v1/leverageBracket"): lambda key: engine.leverage_brackets(params.get("symbol")),
+        }
+        handler = signed_routes.get((method, path))
+        if handler is None:
+            raise ApiError(-5000, f"Path {path}, Method {method} is invalid", 404)
+        api_key = self._authenticate(headers, raw_params, params)
+        return handler(api_key)
+
+    def _listen_key(self, method: str, headers) -> Dict[str, Any]:
+        """USER_STREAM endpoints - API key only, no signature."""
+        api_key = headers.get("X-MBX-APIKEY")
+        if not api_key or (self.api_keys is not None and api_key not in self.api_keys):
+            raise ApiError(-2015, "Invalid API-key, IP, or permissions for action.", 401)
+        if method == "DELETE":
+            self._listen_keys.pop(api_key, None)
+            return {}
+        if method == "PUT" and api_key not in self._listen_keys:
+            raise ApiError(-1125, "This listenKey does not exist.")
+        # Binance hands back the existing key while it's still alive
+        listen_key = self._listen_keys.setdefault(api_key, secrets.token_hex(32))
+        return {"listenKey": listen_key} if method == "POST" else {}
+
+    def _batch(self, api_key: str, params: Dict[str, str], action) -> List[Dict[str, Any]]:
+        try:
+            orders = json.loads(params["batchOrders"])
+        except (KeyError, ValueError):
+            raise ApiError(-1102, "Mandatory parameter 'batchOrders' was not sent, was empty/null, or malformed.")
+        if not isinstance(orders, list) or not 1 <= len(orders) <= 5:
+            raise ApiError(-1102, "batchOrders must hold between 1 and 5 orders.")
+        results = []
+        for order in orders:
+            try:
+                results.append(action(api_key, {key: str(value) for key, value in order.items()}))
+            except ApiError as e:
+                results.append({"code": e.code, "msg": e.msg})
+        return results
+
+    def _batch_cancel(self, api_key: str, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        key, list_key = ("orderId", "orderIdList") if "orderIdList" in params else \
+            ("origClientOrderId", "origClientOrderIdList")
+        try:
+            ids = json.loads(params[list_key])
+        except (KeyError, ValueError):
+            raise ApiError(-1102, "Either orderIdList or origClientOrderIdList must be sent.")
+        if not isinstance(ids, list) or not 1 <= len(ids) <= 10:
+            raise ApiError(-1102, f"{list_key} must hold between 1 and 10 IDs.")
+        results = []
+        for order_id in ids:
+            try:
+                results.append(self.engine.cancel(api_key, {"symbol": params.get("symbol", ""), key: str(order_id)}))
+            except ApiError as e:
+                results.append({"code": e.code, "msg": e.msg})
+        return results
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes - without this, Nagle
+            # holds the body back until the client's delayed ACK (~40ms)
+            disable_nagle_algorithm = True
+
+            def _handle(self, method: str) -> None:
+                server.request_count += 1
+                split = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else ""
+                # Binance treats query string + body as one parameter string
+                raw_params = split.query + body
+                params = dict(parse_qsl(raw_params, keep_blank_values=True))
+
+                if server.latency or server.latency_jitter:
+                    time.sleep(server.latency + random.uniform(0, server.latency_jitter))
+
+                headers: Dict[str, str] = {}
+                try:
+                    headers = server._charge(method, split.path, params)
+                    if random.random() < server.error_rate:
+                        raise ApiError(-1001, "Internal error; unable to process your request. Please try again.", 503)
+                    payload = server._route(method, split.path, self.headers, raw_params, params)
+                    status = 200
+                    if random.random() < server.ambiguous_rate:
+                        # The work is done but the caller can't know that
+                        raise ApiError(-1007, "Timeout waiting for response from backend server. "
+                                              "Send status unknown; execution status unknown.", 503)
+                except _RateLimited as e:
+                    headers = e.headers
+                    status, payload = 429, {"code": -1003, "msg": "Too many requests; current limit is exceeded."}
+                except ApiError as e:
+                    status, payload = e.status, {"code": e.code, "msg": e.msg}
+                except Exception as e:
+                    status, payload = 500, {"code": -1000, "msg": f"An unknown error occurred: {e}"}
+
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_PUT(self):
+                self._handle("PUT")
+
+            def do_DELETE(self):
+                self._handle("DELETE")
+
+            def log_message(self, format, *args):
+                # Keep the console quiet - benchmarks push thousands of requests
+                pass
+
+        return Handler
+
+
+class _RateLimited(Exception):
+    def __init__(self, headers: Dict[str, str]):
+        super().__init__("rate limited")
+        self.headers = headers
+
+
+def main():
+    """Entry point when running as a script."""
+    parser = argparse.ArgumentParser(description="Local mock of the Binance USDT-M Futures API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--api-key", help="Only accept this key (needs --api-secret)")
+    parser.add_argument("--api-secret", help="Secret used to check signatures")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Chance of a 503 before processing")
+    parser.add_argument("--ambiguous-rate", type=float, default=0.0, help="Chance of a 503 after processing")
+    parser.add_argument("--clock-offset-ms", type=int, default=0, help="Server clock skew")
+    args = parser.parse_args()
+
+    api_keys = {args.api_key: args.api_secret} if args.api_key and args.api_secret else None
+    server = MockBinanceServer(args.host, args.port, api_keys=api_keys, latency=args.latency,
+                               latency_jitter=args.jitter, error_rate=args.error_rate,
+                               ambiguous_rate=args.ambiguous_rate, clock_offset_ms=args.clock_offset_ms)
+    print(f"\nMock Binance Futures API on {server.url}")
+    print(f"  export BINANCE_BASE_URL={server.url}")
+    if api_keys is None:
+        print("  Any API key is accepted - sign requests with the secret 'secret'")
+    print("  Ctrl+C to stop\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
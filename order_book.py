@@ -0,0 +1,374 @@
+"""
+Local L2 order books kept in sync from the depth diff stream.
+Takes a REST depth snapshot, applies @depth diff events on top of it and
+re-snapshots whenever the update ID sequence has a gap, so strategies can
+read the book without spending weight on REST depth calls.
+"""
+import asyncio
+import json
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+# Handle both direct execution and module execution
+try:
+    from .config import config
+    from .logger import logger
+except ImportError:
+    from config import config
+    from logger import logger
+
+
+# Binance allows up to 200 streams on one combined connection
+STREAMS_PER_CONNECTION = 200
+
+Level = Tuple[float, float]
+
+
+class BookSide:
+    """
+    Price levels for one side of the book, stored in two parallel float arrays.
+
+    Levels are kept sorted so the best price is always the last element:
+    bids by price, asks by negated price. Best bid/ask is then O(1), a level
+    is found by binary search, and updates near the top of the book (where
+    nearly all of them happen) only shift a few entries.
+    """
+
+    __slots__ = ("is_bid", "_keys", "_qtys")
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self._keys = array("d")
+        self._qtys = array("d")
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self) -> None:
+        del self._keys[:]
+        del self._qtys[:]
+
+    def update(self, price: float, qty: float) -> None:
+        """Set the quantity at a price level (0 removes the level)."""
+        key = price if self.is_bid else -price
+        keys = self._keys
+        i = bisect_left(keys, key)
+        found = i < len(keys) and keys[i] == key
+        if qty == 0:
+            if found:
+                del keys[i]
+                del self._qtys[i]
+        elif found:
+            self._qtys[i] = qty
+        else:
+            keys.insert(i, key)
+            self._qtys.insert(i, qty)
+
+    def best(self) -> Optional[Level]:
+        if not self._keys:
+            return None
+        key = self._keys[-1]
+        return (key if self.is_bid else -key, self._qtys[-1])
+
+    def top(self, n: int) -> List[Level]:
+        """Best n levels, best first."""
+        keys, qtys = self._keys, self._qtys
+        count = min(n, len(keys))
+        sign = 1.0 if self.is_bid else -1.0
+        return [(sign * keys[-1 - i], qtys[-1 - i]) for i in range(count)]
+
+    def trim(self, depth: int) -> None:
+        """Drop everything beyond the best depth levels."""
+        extra = len(self._keys) - depth
+        if extra > 0:
+            del self._keys[:extra]
+            del self._qtys[:extra]
+
+
+class OrderBook:
+    """
+    One symbol's book, following Binance's futures diff-depth rules:
+    events older than the snapshot are dropped, the first event applied must
+    straddle the snapshot's lastUpdateId, and after that every event's pu
+    must equal the previous event's u.
+
+    Prices and quantities are floats - good enough for reading the market,
+    but run them through the validators before putting one on an order.
+    """
+
+    def __init__(self, symbol: str, max_depth: int = 1000):
+        """
+        Args:
+            symbol: Trading pair symbol
+            max_depth: Levels kept per side (deep levels the snapshot
+                       didn't cover would be stale anyway)
+        """
+        self.symbol = symbol
+        self.max_depth = max_depth
+        self.bids = BookSide(True)
+        self.asks = BookSide(False)
+        self.last_update_id = 0
+        self.event_time = 0
+        # False until a snapshot is loaded, and again after a sequence gap
+        self.synced = False
+        self._first_event = True
+        self._lock = threading.Lock()
+
+    def load_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """Replace the book with a /fapi/v1/depth response."""
+        with self._lock:
+            self.bids.clear()
+            self.asks.clear()
+            self._apply_levels(snapshot.get("bids", []), snapshot.get("asks", []))
+            self.last_update_id = snapshot["lastUpdateId"]
+            self.event_time = snapshot.get("E", 0)
+            self._first_event = True
+            self.synced = True
+
+    def apply_diff(self, event: Dict[str, Any]) -> bool:
+        """
+        Apply one depthUpdate event.
+
+        Returns:
+            False if the event doesn't follow on from the book (a gap) - the
+            book is then marked unsynced and needs a fresh snapshot
+        """
+        with self._lock:
+            if not self.synced:
+                return False
+            if event["u"] < self.last_update_id:
+                return True  # Already part of the snapshot
+            if self._first_event:
+                in_sequence = event["U"] <= self.last_update_id
+            else:
+                in_sequence = event["pu"] == self.last_update_id
+            if not in_sequence:
+                self.synced = False
+                return False
+
+            self._apply_levels(event.get("b", []), event.get("a", []))
+            self.last_update_id = event["u"]
+            self.event_time = event.get("E", self.event_time)
+            self._first_event = False
+            return True
+
+    def _apply_levels(self, bids: Iterable, asks: Iterable) -> None:
+        for price, qty in bids:
+            self.bids.update(float(price), float(qty))
+        for price, qty in asks:
+            self.asks.update(float(price), float(qty))
+        self.bids.trim(self.max_depth)
+        self.asks.trim(self.max_depth)
+
+    def best_bid(self) -> Optional[Level]:
+        with self._lock:
+            return self.bids.best()
+
+    def best_ask(self) -> Optional[Level]:
+        with self._lock:
+            return self.asks.best()
+
+    def mid_price(self) -> Optional[float]:
+        with self._lock:
+            bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def spread(self) -> Optional[float]:
+        with self._lock:
+            bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def top(self, n: int = 5) -> Dict[str, Any]:
+        """
+        Consistent copy of the best n levels per side.
+
+        Returns:
+            Dict with bids and asks as [(price, qty), ...] best first,
+            plus lastUpdateId and synced
+        """
+        with self._lock:
+            return {
+                "symbol": self.symbol,
+                "lastUpdateId": self.last_update_id,
+                "synced": self.synced,
+                "bids": self.bids.top(n),
+                "asks": self.asks.top(n),
+            }
+
+
+class OrderBookManager:
+    """
+    Keeps local books for many symbols from combined @depth streams.
+
+    Diff events for a symbol that isn't synced yet are buffered while its
+    snapshot downloads, then replayed on top of it. A sequence gap or a
+    reconnect sends the symbol back through the same path.
+
+    run() is a coroutine for asyncio programs; start()/stop() run it on a
+    background thread for everything else.
+    """
+
+    def __init__(self, client, symbols: Iterable[str], depth_limit: int = 1000, speed: str = "100ms",
+                 ws_url: Optional[str] = None, reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0):
+        """
+        Args:
+            client: BinanceClient used for the REST snapshots
+            symbols: Symbols to follow
+            depth_limit: Levels per snapshot (5, 10, 20, 50, 100, 500 or 1000)
+            speed: Diff stream update speed ("100ms", "250ms" or "500ms")
+            ws_url: Websocket base URL (defaults to testnet/production from config)
+        """
+        self.client = client
+        self.depth_limit = depth_limit
+        self.speed = speed
+        self.ws_url = (ws_url or config.ws_url_for(client.testnet)).rstrip("/")
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.books: Dict[str, OrderBook] = {
+            symbol.upper(): OrderBook(symbol.upper(), max_depth=depth_limit) for symbol in symbols
+        }
+        self._pending: Dict[str, List[Dict[str, Any]]] = {symbol: [] for symbol in self.books}
+        self._snapshotting: set = set()
+
+        self._stopping = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __getitem__(self, symbol: str) -> OrderBook:
+        return self.books[symbol.upper()]
+
+    def top(self, symbol: str, n: int = 5) -> Dict[str, Any]:
+        """Best n levels per side for one symbol."""
+        return self[symbol].top(n)
+
+    @property
+    def synced(self) -> bool:
+        return all(book.synced for book in self.books.values())
+
+    async def run(self) -> None:
+        """Follow every symbol until stop() is called."""
+        symbols = list(self.books)
+        groups = [symbols[i:i + STREAMS_PER_CONNECTION] for i in range(0, len(symbols), STREAMS_PER_CONNECTION)]
+        await asyncio.gather(*(self._run_connection(group) for group in groups))
+
+    async def _run_connection(self, symbols: List[str]) -> None:
+        streams = "/".join(f"{symbol.lower()}@depth@{self.speed}" for symbol in symbols)
+        url = f"{self.ws_url}/stream?streams={streams}"
+        delay = self.reconnect_delay
+        while not self._stopping:
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(url, heartbeat=60) as ws:
+                        logger.info("Depth stream connected - %d symbols", len(symbols))
+                        delay = self.reconnect_delay
+                        await self._consume(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Depth stream error: %s", e)
+
+            # Events were missed while disconnected - every book needs a new snapshot
+            for symbol in symbols:
+                self.books[symbol].synced = False
+                self._pending[symbol].clear()
+            if self._stopping:
+                break
+            logger.info("Reconnecting depth stream in %.0fs", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _consume(self, ws) -> None:
+        async for message in ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                if message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    return
+                continue
+            event = json.loads(message.data).get("data", {})
+            if event.get("e") == "depthUpdate":
+                self._on_event(event)
+
+    def _on_event(self, event: Dict[str, Any]) -> None:
+        symbol = event["s"]
+        book = self.books.get(symbol)
+        if book is None:
+            return
+        if book.synced and book.apply_diff(event):
+            return
+        # Not synced (or just fell out of sync) - hold events until a snapshot lands
+        self._pending[symbol].append(event)
+        if symbol not in self._snapshotting:
+            if book.last_update_id:
+                logger.warning("%s depth sequence gap at %s - resyncing", symbol, book.last_update_id)
+            self._snapshotting.add(symbol)
+            asyncio.ensure_future(self._resync(symbol))
+
+    async def _resync(self, symbol: str) -> None:
+        book = self.books[symbol]
+        loop = asyncio.get_running_loop()
+        try:
+            while not self._stopping:
+                try:
+                    snapshot = await loop.run_in_executor(None, self.client.get_depth, symbol, self.depth_limit)
+                except Exception as e:
+                    logger.warning("%s depth snapshot failed: %s", symbol, e)
+                    self._pending[symbol].clear()
+                    await asyncio.sleep(self.reconnect_delay)
+                    continue
+
+                book.load_snapshot(snapshot)
+                pending, self._pending[symbol] = self._pending[symbol], []
+                # The snapshot may be older than the first buffered event - then it's useless
+                if all(book.apply_diff(event) for event in pending):
+                    logger.info("%s order book synced at %s", symbol, book.last_update_id)
+                    return
+        finally:
+            self._snapshotting.discard(symbol)
+
+    def start(self, wait: float = 10.0) -> bool:
+        """
+        Run the streams on a background thread.
+
+        Args:
+            wait: Seconds to wait for every book to sync (0 to return right away)
+
+        Returns:
+            True if every book is synced when this returns
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run_thread, name="order-books", daemon=True)
+            self._thread.start()
+        deadline = time.monotonic() + wait
+        while not self.synced and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return self.synced
+
+    def _run_thread(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._task = self._loop.create_task(self.run())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stopping = True
+        if self._loop is not None and self._task is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
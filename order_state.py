@@ -0,0 +1,590 @@
+"""
+Own-order state - every order sent through the client, kept in memory.
+Records are built from order responses and user stream events, indexed by
+client order ID, exchange order ID, symbol and price level, so "do I
+already have this order?" is a dict lookup instead of a round trip to
+/fapi/v1/openOrders. A cheap reconciliation against the exchange fixes
+any drift (missed events, orders that timed out on the way in).
+"""
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import requests
+
+# Handle both direct execution and module execution
+try:
+    from .config import config
+    from .logger import logger
+    from .retry import ORDER_DOES_NOT_EXIST, UNKNOWN_STATUS_ERROR_CODES, error_code, is_ambiguous, is_transient
+except ImportError:
+    from config import config
+    from logger import logger
+    from retry import ORDER_DOES_NOT_EXIST, UNKNOWN_STATUS_ERROR_CODES, error_code, is_ambiguous, is_transient
+
+
+# Local status for an order that was sent but hasn't been answered yet
+SENDING = "SENDING"
+# Local status for an order that left openOrders without us seeing how -
+# the reconciler looks these up to find out whether they filled
+MISSING = "MISSING"
+
+OPEN_STATUSES = {SENDING, "NEW", "PARTIALLY_FILLED"}
+CLOSED_STATUSES = {"FILLED", "CANCELED", "EXPIRED", "REJECTED", "EXPIRED_IN_MATCH"}
+
+# Statuses only move forward, so a late or repeated update can't reopen an
+# order. MISSING is our own guess, so anything from the exchange overrides it.
+_STATUS_RANK = {MISSING: -1, SENDING: 0, "NEW": 1, "PARTIALLY_FILLED": 2}
+
+# Endpoints whose responses carry order state
+TRACKED_ENDPOINTS = {"/fapi/v1/order", "/fapi/v1/batchOrders", "/fapi/v1/openOrders", "/fapi/v1/allOpenOrders"}
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value) if value not in (None, "") else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class RecordState(NamedTuple):
+    """The parts of an order that change exposure, before or after an update."""
+    is_open: bool
+    side: str
+    price: float
+    remaining: float
+    executed_qty: float
+    avg_price: float
+
+
+class OrderRecord:
+    """One of our orders. Prices and quantities are floats for fast comparisons."""
+
+    __slots__ = ("client_order_id", "order_id", "symbol", "side", "type", "time_in_force", "price",
+                 "stop_price", "orig_qty", "executed_qty", "avg_price", "status", "reduce_only",
+                 "update_time", "seen", "presumed_rejected")
+
+    def __init__(self, client_order_id: str, symbol: str, side: str = "", order_type: str = ""):
+        self.client_order_id = client_order_id
+        self.order_id: Optional[int] = None
+        self.symbol = symbol
+        self.side = side
+        self.type = order_type
+        self.time_in_force = ""
+        self.price = 0.0
+        self.stop_price = 0.0
+        self.orig_qty = 0.0
+        self.executed_qty = 0.0
+        self.avg_price = 0.0
+        self.status = SENDING
+        self.reduce_only = False
+        # Exchange time of the last update we applied (ms)
+        self.update_time = 0
+        # Local perf_counter time of the last change - used to tell whether
+        # a snapshot was taken before or after we last heard of the order
+        self.seen = time.perf_counter()
+        # Closed by us because a lookup couldn't find it, not by the exchange
+        self.presumed_rejected = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.status in OPEN_STATUSES
+
+    @property
+    def remaining(self) -> float:
+        return self.orig_qty - self.executed_qty
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Roughly the REST order shape, for logging and display."""
+        return {
+            "orderId": self.order_id,
+            "clientOrderId": self.client_order_id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "type": self.type,
+            "timeInForce": self.time_in_force,
+            "price": self.price,
+            "stopPrice": self.stop_price,
+            "origQty": self.orig_qty,
+            "executedQty": self.executed_qty,
+            "avgPrice": self.avg_price,
+            "status": self.status,
+            "reduceOnly": self.reduce_only,
+            "updateTime": self.update_time,
+        }
+
+    def state(self) -> RecordState:
+        return RecordState(self.is_open, self.side, self.price, self.remaining, self.executed_qty, self.avg_price)
+
+    def __repr__(self) -> str:
+        return (f"OrderRecord({self.symbol} {self.side} {self.orig_qty:g} @ {self.price:g} "
+                f"{self.status} id={self.order_id} cid={self.client_order_id})")
+
+
+class OrderTracker:
+    """
+    State of every order this process placed.
+
+    The client feeds it from its response path (record_response), so
+    orders placed, looked up, cancelled or listed through BinanceClient are
+    all picked up without any extra requests. on_event() takes user stream
+    events (see UserDataStream / AccountMirror.add_listener).
+
+    Indexes are plain dicts: get() by client order ID, by_order_id(),
+    open_orders(symbol) and at_price(symbol, side, price) are O(1) (well,
+    O(orders returned)). Writes take a lock; reads don't need one.
+
+    Closed orders are kept for lookups until there are more than
+    max_closed of them, then the oldest are dropped.
+
+    add_listener() callbacks get every change as (record, before, after)
+    RecordStates - before is None for orders seen for the first time.
+    They run after the tracker's lock is released.
+    """
+
+    def __init__(self, client=None, reconcile_interval: Optional[float] = None, max_closed: int = 10000,
+                 max_lookups: int = 20):
+        """
+        Args:
+            client: BinanceClient used by reconcile() (not needed for tracking)
+            reconcile_interval: Seconds between background reconciliations
+                                (default: BINANCE_RECONCILE_INTERVAL)
+            max_closed: Closed orders to remember
+            max_lookups: Most single-order lookups one reconcile() may spend
+                         on orders whose fate is unknown
+        """
+        self.client = client
+        self.reconcile_interval = reconcile_interval or config.reconcile_interval
+        self.max_closed = max_closed
+        self.max_lookups = max_lookups
+
+        self._lock = threading.RLock()
+        self._by_client_id: Dict[str, OrderRecord] = {}
+        self._by_order_id: Dict[int, OrderRecord] = {}
+        # symbol -> {client order ID: record}, open orders only
+        self._open_by_symbol: Dict[str, Dict[str, OrderRecord]] = {}
+        # (symbol, side, price) -> {client order ID: record}, open orders only
+        self._open_by_price: Dict[Tuple[str, str, float], Dict[str, OrderRecord]] = {}
+        # Closed orders, oldest first (dicts keep insertion order)
+        self._closed: Dict[str, OrderRecord] = {}
+        # symbol (None = all) -> perf_counter time the last openOrders snapshot was requested
+        self._last_snapshot: Dict[Optional[str], float] = {}
+        self.drift_fixed = 0
+        self._listeners: List[Callable[[OrderRecord, Optional[RecordState], RecordState], None]] = []
+        self._changes: deque = deque()
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------- lookups
+
+    def get(self, client_order_id: str) -> Optional[OrderRecord]:
+        return self._by_client_id.get(client_order_id)
+
+    def by_order_id(self, order_id: int) -> Optional[OrderRecord]:
+        return self._by_order_id.get(order_id)
+
+    def open_orders(self, symbol: Optional[str] = None, side: Optional[str] = None) -> List[OrderRecord]:
+        """Open orders (including ones still being sent), optionally for one symbol and side."""
+        if symbol is None:
+            groups = list(self._open_by_symbol.values())
+        else:
+            groups = [self._open_by_symbol.get(symbol, {})]
+        return [record for group in groups for record in list(group.values()) if side is None or record.side == side]
+
+    def at_price(self, symbol: str, side: str, price: Any) -> List[OrderRecord]:
+        """Open orders resting at exactly this price."""
+        return list(self._open_by_price.get((symbol, side, float(price)), {}).values())
+
+    def has_open(self, symbol: str, side: Optional[str] = None, price: Any = None) -> bool:
+        """True if we have an open order on symbol (and side, and price, if given)."""
+        if price is not None and side is not None:
+            return bool(self._open_by_price.get((symbol, side, float(price))))
+        if side is None:
+            return bool(self._open_by_symbol.get(symbol))
+        return any(record.side == side for record in list(self._open_by_symbol.get(symbol, {}).values()))
+
+    def symbols(self) -> List[str]:
+        """Symbols with open orders."""
+        return [symbol for symbol, group in list(self._open_by_symbol.items()) if group]
+
+    def __len__(self) -> int:
+        return len(self._by_client_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {"tracked": len(self._by_client_id), "open": sum(len(g) for g in list(self._open_by_symbol.values())),
+                "closed": len(self._closed), "drift_fixed": self.drift_fixed}
+
+    # ------------------------------------------------------------- updates
+
+    def add_listener(self, callback: Callable[[OrderRecord, Optional[RecordState], RecordState], None]) -> None:
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[OrderRecord, Optional[RecordState], RecordState], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _changed(self, record: OrderRecord, before: Optional[RecordState]) -> None:
+        if self._listeners:
+            self._changes.append((record, before, record.state()))
+
+    def _notify(self) -> None:
+        # Changes are queued under the lock and delivered outside it, so a
+        # listener can take its own lock without risking a deadlock
+        while True:
+            try:
+                record, before, after = self._changes.popleft()
+            except IndexError:
+                return
+            for callback in list(self._listeners):
+                try:
+                    callback(record, before, after)
+                except Exception as e:
+                    logger.error("Order state listener failed: %s", e)
+
+    def submitted(self, params: Dict[str, Any]) -> OrderRecord:
+        """Record an order that is about to be sent (status SENDING)."""
+        client_order_id = params["newClientOrderId"]
+        with self._lock:
+            record = self._by_client_id.get(client_order_id)
+            if record is not None:
+                # Resend of an order we already know about - it's in flight
+                # again, so reconcile mustn't give up on it yet
+                if record.status == SENDING:
+                    record.seen = time.perf_counter()
+                return record
+            record = OrderRecord(client_order_id, params["symbol"], params.get("side", ""), params.get("type", ""))
+            record.time_in_force = params.get("timeInForce", "")
+            record.price = _number(params.get("price"))
+            record.stop_price = _number(params.get("stopPrice"))
+            record.orig_qty = _number(params.get("quantity"))
+            record.reduce_only = str(params.get("reduceOnly", "")).lower() == "true"
+            self._by_client_id[client_order_id] = record
+            self._index(record)
+            self._changed(record, None)
+        self._notify()
+        return record
+
+    def apply(self, order: Dict[str, Any]) -> Optional[OrderRecord]:
+        """
+        Apply an order in the REST shape (a response, an openOrders entry or
+        a converted stream event). Stale updates are ignored: an update
+        older than what we have, or one that would move the status
+        backwards (e.g. NEW after FILLED), changes nothing.
+
+        Returns:
+            The record, or None if the order can't be identified
+        """
+        record = self._apply(order)
+        self._notify()
+        return record
+
+    def _apply(self, order: Dict[str, Any]) -> Optional[OrderRecord]:
+        client_order_id = order.get("clientOrderId")
+        order_id = order.get("orderId")
+        with self._lock:
+            record = self._by_client_id.get(client_order_id) if client_order_id else None
+            if record is None and order_id is not None:
+                record = self._by_order_id.get(order_id)
+            if record is None:
+                if not client_order_id or not order.get("symbol"):
+                    return None
+                # Placed by another process (or before a restart) - track it from now on
+                record = OrderRecord(client_order_id, order["symbol"])
+                self._by_client_id[client_order_id] = record
+                self._index(record)
+                self._update(record, order, new=True)
+            else:
+                self._update(record, order)
+            return record
+
+    def _update(self, record: OrderRecord, order: Dict[str, Any], new: bool = False) -> None:
+        status = order.get("status") or record.status
+        update_time = int(order.get("updateTime") or order.get("time") or 0)
+        if record.status in CLOSED_STATUSES:
+            # A resend can land after a lookup found nothing - the exchange has the last word
+            if not (record.presumed_rejected and order.get("orderId") is not None):
+                return
+            record.presumed_rejected = False
+        if update_time and update_time < record.update_time:
+            return
+        if (not update_time or update_time == record.update_time) and \
+                _STATUS_RANK.get(status, 9) < _STATUS_RANK.get(record.status, 9):
+            return
+
+        before = None if new else record.state()
+        if record.order_id is None and order.get("orderId") is not None:
+            record.order_id = int(order["orderId"])
+            self._by_order_id[record.order_id] = record
+        # Price, side and status are all part of the index keys
+        self._unindex(record)
+        record.side = order.get("side") or record.side
+        record.type = order.get("type") or record.type
+        record.time_in_force = order.get("timeInForce") or record.time_in_force
+        if "price" in order:
+            record.price = _number(order["price"])
+        if "stopPrice" in order:
+            record.stop_price = _number(order["stopPrice"])
+        if "origQty" in order:
+            record.orig_qty = _number(order["origQty"])
+        if "executedQty" in order:
+            record.executed_qty = max(record.executed_qty, _number(order["executedQty"]))
+        if "avgPrice" in order:
+            record.avg_price = _number(order["avgPrice"]) or record.avg_price
+        if "reduceOnly" in order:
+            record.reduce_only = bool(order["reduceOnly"])
+        record.update_time = max(record.update_time, update_time)
+        record.seen = time.perf_counter()
+        record.status = status
+        self._index(record)
+        self._changed(record, before)
+
+    def _close(self, record: OrderRecord, status: str) -> None:
+        if record.status in CLOSED_STATUSES:
+            return
+        before = record.state()
+        self._unindex(record)
+        record.status = status
+        record.seen = time.perf_counter()
+        self._index(record)
+        self._changed(record, before)
+
+    def _index(self, record: OrderRecord) -> None:
+        if record.is_open:
+            self._open_by_symbol.setdefault(record.symbol, {})[record.client_order_id] = record
+            self._open_by_price.setdefault((record.symbol, record.side, record.price), {})[
+                record.client_order_id] = record
+        elif record.status in CLOSED_STATUSES:
+            self._closed[record.client_order_id] = record
+            while len(self._closed) > self.max_closed:
+                oldest = next(iter(self._closed))
+                dropped = self._closed.pop(oldest)
+                self._by_client_id.pop(oldest, None)
+                if dropped.order_id is not None:
+                    self._by_order_id.pop(dropped.order_id, None)
+
+    def _unindex(self, record: OrderRecord) -> None:
+        group = self._open_by_symbol.get(record.symbol)
+        if group is not None:
+            group.pop(record.client_order_id, None)
+        key = (record.symbol, record.side, record.price)
+        level = self._open_by_price.get(key)
+        if level is not None:
+            level.pop(record.client_order_id, None)
+            if not level:
+                del self._open_by_price[key]
+        self._closed.pop(record.client_order_id, None)
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        """AccountMirror listener - applies ORDER_TRADE_UPDATE events."""
+        if event.get("e") != "ORDER_TRADE_UPDATE":
+            return
+        o = event.get("o", {})
+        self.apply({"orderId": o.get("i"), "clientOrderId": o.get("c"), "symbol": o.get("s"), "side": o.get("S"),
+                    "type": o.get("o"), "timeInForce": o.get("f"), "price": o.get("p"), "stopPrice": o.get("sp"),
+                    "origQty": o.get("q"), "executedQty": o.get("z"), "avgPrice": o.get("ap"),
+                    "status": o.get("X"), "reduceOnly": o.get("R"), "updateTime": o.get("T")})
+
+    def record_response(self, method: str, endpoint: str, params: Dict[str, Any], response: Any,
+                        sent_at: float) -> None:
+        """
+        Apply whatever order state a successful response carries.
+
+        Args:
+            method: HTTP method
+            endpoint: API path
+            params: Request parameters as sent
+            response: Decoded JSON body
+            sent_at: time.perf_counter() when the request went out
+        """
+        if endpoint not in TRACKED_ENDPOINTS:
+            return
+        try:
+            if endpoint == "/fapi/v1/openOrders":
+                self.reconcile_snapshot(params.get("symbol"), response, sent_at)
+            elif endpoint == "/fapi/v1/allOpenOrders":
+                if method == "DELETE":
+                    self._close_all(params.get("symbol"), sent_at)
+            elif endpoint == "/fapi/v1/batchOrders" and method in ("POST", "PUT"):
+                sent = json.loads(params.get("batchOrders") or "[]")
+                for request, reply in zip(sent, response):
+                    self._apply_reply(request, reply)
+            elif isinstance(response, list):
+                for reply in response:
+                    self._apply_reply(params, reply)
+            else:
+                self._apply_reply(params, response)
+        except Exception as e:
+            # Bookkeeping must never break trading
+            logger.error("Order tracker update failed: %s", e)
+        self._notify()
+
+    def _apply_reply(self, request: Dict[str, Any], reply: Any) -> None:
+        if not isinstance(reply, dict):
+            return
+        if "orderId" in reply:
+            self._apply(reply)
+            return
+        # A new order (or one entry of a batch) the exchange refused
+        client_order_id = request.get("newClientOrderId")
+        if client_order_id and "code" in reply and reply["code"] not in UNKNOWN_STATUS_ERROR_CODES:
+            with self._lock:
+                record = self._by_client_id.get(client_order_id)
+                if record is not None and record.status == SENDING:
+                    self._close(record, "REJECTED")
+
+    def record_error(self, method: str, endpoint: str, params: Dict[str, Any], error: Exception) -> None:
+        """
+        A new order failed. If the exchange answered with a definite no,
+        it's closed as REJECTED. Anything that might be retried with the
+        same client ID, or might have landed anyway, leaves it SENDING until
+        a response, an event or reconcile() settles it.
+        """
+        if method != "POST" or endpoint not in ("/fapi/v1/order", "/fapi/v1/batchOrders"):
+            return
+        if getattr(error, "response", None) is None or is_ambiguous(error) or is_transient(error):
+            return
+        if endpoint == "/fapi/v1/order":
+            client_order_ids = [params.get("newClientOrderId")]
+        else:
+            client_order_ids = [order.get("newClientOrderId") for order in json.loads(params.get("batchOrders") or "[]")]
+        with self._lock:
+            for client_order_id in client_order_ids:
+                record = self._by_client_id.get(client_order_id)
+                if record is not None and record.status == SENDING:
+                    self._close(record, "REJECTED")
+        self._notify()
+
+    def _close_all(self, symbol: Optional[str], sent_at: float) -> None:
+        with self._lock:
+            for record in self.open_orders(symbol):
+                if record.seen <= sent_at and record.status != SENDING:
+                    self._close(record, "CANCELED")
+
+    # ----------------------------------------------------------- reconciling
+
+    def reconcile_snapshot(self, symbol: Optional[str], open_orders: Iterable[Dict[str, Any]],
+                           sent_at: float) -> int:
+        """
+        Bring the state in line with an openOrders snapshot.
+
+        Everything in the snapshot is applied. Orders we think are open but
+        the snapshot doesn't have are marked MISSING - unless we heard about
+        them after the snapshot was requested (the snapshot is simply older
+        than what we know) or they are still being sent.
+
+        Args:
+            symbol: Symbol the snapshot covers (None = all symbols)
+            open_orders: The openOrders response
+            sent_at: time.perf_counter() when the snapshot was requested
+
+        Returns:
+            How many orders had drifted
+        """
+        drifted = 0
+        with self._lock:
+            present = set()
+            for order in open_orders:
+                record = self._by_client_id.get(order.get("clientOrderId"))
+                before = None if record is None else (record.status, record.executed_qty, record.price)
+                record = self._apply(order)
+                if record is None:
+                    continue
+                present.add(record.client_order_id)
+                if before is not None and before != (record.status, record.executed_qty, record.price):
+                    drifted += 1
+            for record in self.open_orders(symbol):
+                if record.client_order_id not in present and record.seen <= sent_at and record.status != SENDING:
+                    before = record.state()
+                    self._unindex(record)
+                    record.status = MISSING
+                    self._changed(record, before)
+                    drifted += 1
+            self._last_snapshot[symbol] = sent_at
+            self.drift_fixed += drifted
+        self._notify()
+        if drifted:
+            logger.info("Order state: %d order(s) had drifted from the exchange", drifted)
+        return drifted
+
+    def missing(self) -> List[OrderRecord]:
+        """Orders whose final status is unknown, plus SENDING orders nothing answered for a while."""
+        cutoff = time.perf_counter() - self.reconcile_interval
+        return [record for record in list(self._by_client_id.values())
+                if record.status == MISSING or (record.status == SENDING and record.seen < cutoff)]
+
+    def reconcile(self) -> int:
+        """
+        Check our open orders against the exchange.
+
+        Only symbols where we have open orders and no fresh snapshot are
+        fetched - one weight-1 openOrders call per symbol, or a single
+        weight-40 call for all symbols when that's cheaper. Then up to
+        max_lookups orders in the MISSING state are looked up one by one
+        to learn how they ended (filled or cancelled).
+
+        Returns:
+            How many orders had drifted
+        """
+        if self.client is None:
+            raise ValueError("OrderTracker needs a client to reconcile")
+        now = time.perf_counter()
+        fresh_all = now - self._last_snapshot.get(None, 0.0) < self.reconcile_interval
+        stale = [symbol for symbol in self.symbols()
+                 if not fresh_all and now - self._last_snapshot.get(symbol, 0.0) >= self.reconcile_interval]
+        drift_before = self.drift_fixed
+        # The responses come back through record_response, which does the work
+        if len(stale) > 40:
+            self.client.get_open_orders()
+        else:
+            for symbol in stale:
+                self.client.get_open_orders(symbol)
+
+        for record in self.missing()[:self.max_lookups]:
+            self._resolve(record)
+        return self.drift_fixed - drift_before
+
+    def _resolve(self, record: OrderRecord) -> None:
+        try:
+            if record.order_id is not None:
+                self.client.get_order(record.symbol, order_id=record.order_id)
+            else:
+                self.client.get_order(record.symbol, orig_client_order_id=record.client_order_id)
+        except requests.exceptions.HTTPError as e:
+            if error_code(e) == ORDER_DOES_NOT_EXIST:
+                # Never reached the exchange (so far - see _update)
+                with self._lock:
+                    if record.status in CLOSED_STATUSES:
+                        return
+                    self._close(record, "REJECTED")
+                    record.presumed_rejected = True
+                self._notify()
+            else:
+                logger.warning("Could not look up order %s: %s", record.client_order_id, e)
+        except requests.exceptions.RequestException as e:
+            logger.warning("Could not look up order %s: %s", record.client_order_id, e)
+
+    def start(self) -> None:
+        """Reconcile every reconcile_interval seconds from a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="order-reconcile", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the background thread to exit after stop()."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.reconcile_interval):
+            try:
+                self.reconcile()
+            except Exception as e:
+                logger.warning("Order reconciliation failed: %s", e)
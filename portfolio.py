@@ -0,0 +1,288 @@
+"""
+Portfolio maths over all positions at once.
+Parses positionRisk into NumPy arrays once, takes mark price updates in
+place, and works out unrealized PnL, maintenance margin (per leverage
+bracket) and liquidation prices for every position in one vectorized pass.
+The leverage bracket tables are cached in memory and on disk.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Handle both direct execution and module execution
+try:
+    from .config import config
+    from .logger import logger
+except ImportError:
+    from config import config
+    from logger import logger
+
+
+class Brackets(NamedTuple):
+    """One symbol's leverage brackets, lowest notional first."""
+    floor: np.ndarray           # notionalFloor of each bracket
+    maint_margin_rate: np.ndarray
+    maint_amount: np.ndarray    # "cum" - makes the tiered margin continuous
+    max_leverage: np.ndarray
+
+
+# What a symbol without bracket data is margined at - Binance's smallest tier
+DEFAULT_BRACKETS = Brackets(np.zeros(1), np.array([0.004]), np.zeros(1), np.array([125.0]))
+
+
+def parse_brackets(entry: Dict[str, Any]) -> Brackets:
+    """Build Brackets from one entry of /fapi/v1/leverageBracket."""
+    rows = sorted(entry.get("brackets", []), key=lambda b: float(b["notionalFloor"]))
+    if not rows:
+        return DEFAULT_BRACKETS
+    return Brackets(
+        floor=np.array([float(b["notionalFloor"]) for b in rows]),
+        maint_margin_rate=np.array([float(b["maintMarginRatio"]) for b in rows]),
+        maint_amount=np.array([float(b.get("cum", 0)) for b in rows]),
+        max_leverage=np.array([float(b["initialLeverage"]) for b in rows]),
+    )
+
+
+class LeverageBracketCache:
+    """
+    Leverage brackets for every symbol, from one /fapi/v1/leverageBracket
+    call (weight 1). They hardly ever change, so they are kept for ttl
+    seconds and written to disk for the next process, like exchange info.
+    """
+
+    def __init__(self, client, ttl: Optional[float] = None, path: Optional[Path] = None):
+        """
+        Args:
+            client: BinanceClient (anything with get_leverage_brackets())
+            ttl: Seconds before the brackets are fetched again
+            path: Where to keep them between runs (defaults to the cache dir)
+        """
+        self.client = client
+        self.ttl = ttl if ttl is not None else config.leverage_bracket_ttl
+        if path is None:
+            mode = "testnet" if client.testnet else "production"
+            path = Path(config.cache_dir) / f"leverage_brackets_{mode}.json"
+        self.path = Path(path)
+        self._raw: List[Dict[str, Any]] = []
+        self._brackets: Dict[str, Brackets] = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._load()
+
+    def is_fresh(self) -> bool:
+        return bool(self._brackets) and time.time() - self._fetched_at < self.ttl
+
+    def get(self, symbol: str) -> Brackets:
+        """Brackets for a symbol (DEFAULT_BRACKETS if the exchange has none)."""
+        if not self.is_fresh():
+            try:
+                self.refresh()
+            except Exception as e:
+                if not self._brackets:
+                    raise
+                logger.warning("Leverage bracket refresh failed, using cached tables: %s", e)
+        return self._brackets.get(symbol, DEFAULT_BRACKETS)
+
+    def refresh(self) -> None:
+        with self._lock:
+            raw = self.client.get_leverage_brackets()
+            self._brackets = {entry["symbol"]: parse_brackets(entry) for entry in raw}
+            self._raw = raw
+            self._fetched_at = time.time()
+            logger.info("Leverage brackets refreshed - %d symbols", len(self._brackets))
+            self._save()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("base_url") != self.client.base_url:
+                return
+            self._brackets = {entry["symbol"]: parse_brackets(entry) for entry in data["brackets"]}
+            self._raw = data["brackets"]
+            self._fetched_at = float(data["fetched_at"])
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable leverage bracket cache %s: %s", self.path, e)
+
+    def _save(self) -> None:
+        data = {"base_url": self.client.base_url, "fetched_at": self._fetched_at, "brackets": self._raw}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not write leverage bracket cache %s: %s", self.path, e)
+
+
+class PortfolioSnapshot(NamedTuple):
+    """Result of Portfolio.compute() - one array entry per position, plus account totals."""
+    symbol: np.ndarray
+    position: np.ndarray            # signed, base asset
+    entry_price: np.ndarray
+    mark_price: np.ndarray
+    notional: np.ndarray            # absolute, at mark
+    unrealized_pnl: np.ndarray
+    maint_margin_rate: np.ndarray
+    maint_margin: np.ndarray
+    liquidation_price: np.ndarray   # NaN when the position can't be liquidated
+    liquidation_distance: np.ndarray  # |mark - liquidation| / mark
+    total_unrealized_pnl: float
+    total_maint_margin: float
+    margin_balance: float           # cross wallet + cross unrealized PnL
+    margin_ratio: float             # cross maintenance margin / margin_balance
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Per-position dicts, for printing."""
+        fields = ("position", "entry_price", "mark_price", "notional", "unrealized_pnl",
+                  "maint_margin_rate", "maint_margin", "liquidation_price", "liquidation_distance")
+        columns = [getattr(self, field).tolist() for field in fields]
+        return [dict(zip(("symbol",) + fields, values)) for values in zip(self.symbol.tolist(), *columns)]
+
+
+class Portfolio:
+    """
+    All open positions as columns.
+
+    load() (or refresh() with a client) parses the positions and looks up
+    their bracket tables once. update_mark() / update_marks() only write
+    into the mark price column, and compute() does the maths for every
+    position together, so recomputing after each tick is cheap no matter
+    how many symbols are held.
+
+    Liquidation prices follow Binance's formula for one-way mode:
+
+        LP = (WB - TMM1 + UPNL1 + cum - side * size * entry) / (size * MMR - side * size)
+
+    WB is the cross wallet balance (the isolated wallet for isolated
+    positions), TMM1 / UPNL1 are the maintenance margin and PnL of the
+    other cross positions. The bracket is picked at the current notional,
+    so a position close to a bracket boundary can be slightly off.
+    """
+
+    def __init__(self, client=None, brackets: Optional[LeverageBracketCache] = None):
+        """
+        Args:
+            client: BinanceClient for refresh() (optional with load())
+            brackets: Bracket tables (default: client.leverage_brackets)
+        """
+        self.client = client
+        self.brackets = brackets if brackets is not None or client is None else client.leverage_brackets
+        self.wallet_balance = 0.0
+        self.symbols = np.array([], dtype=object)
+        self.position = np.zeros(0)
+        self.entry_price = np.zeros(0)
+        self.mark_price = np.zeros(0)
+        self.isolated = np.zeros(0, dtype=bool)
+        self.isolated_wallet = np.zeros(0)
+        self._rows: Dict[str, np.ndarray] = {}
+        # Bracket tables padded to the same width - floors past the end are inf
+        self._floor = np.zeros((0, 1))
+        self._rate = np.zeros((0, 1))
+        self._amount = np.zeros((0, 1))
+
+    def __len__(self) -> int:
+        return len(self.position)
+
+    def refresh(self) -> None:
+        """Fetch positions and the cross wallet balance and load them."""
+        account = self.client.get_account_info()
+        wallet = account.get("totalCrossWalletBalance", account.get("totalWalletBalance", 0))
+        self.load(self.client.get_position_info(), float(wallet))
+
+    def load(self, positions: List[Dict[str, Any]], wallet_balance: Optional[float] = None) -> None:
+        """
+        Replace the positions with positionRisk rows (flat rows are dropped).
+
+        Args:
+            positions: /fapi/v2/positionRisk response
+            wallet_balance: Cross wallet balance (keeps the current one if None)
+        """
+        rows = [row for row in positions if float(row.get("positionAmt") or 0)]
+        if wallet_balance is not None:
+            self.wallet_balance = float(wallet_balance)
+        self.symbols = np.array([row["symbol"] for row in rows], dtype=object)
+        self.position = np.array([float(row["positionAmt"]) for row in rows])
+        self.entry_price = np.array([float(row["entryPrice"]) for row in rows])
+        self.mark_price = np.array([float(row["markPrice"]) for row in rows])
+        self.isolated = np.array([row.get("marginType", "cross").lower() == "isolated" for row in rows], dtype=bool)
+        self.isolated_wallet = np.array([float(row.get("isolatedWallet") or 0) for row in rows])
+
+        index: Dict[str, List[int]] = {}
+        for i, row in enumerate(rows):
+            index.setdefault(row["symbol"], []).append(i)
+        self._rows = {symbol: np.array(indices) for symbol, indices in index.items()}
+
+        tables = [self.brackets.get(symbol) if self.brackets is not None else DEFAULT_BRACKETS
+                  for symbol in self.symbols]
+        width = max((len(table.floor) for table in tables), default=1)
+        self._floor = np.full((len(tables), width), np.inf)
+        self._rate = np.zeros((len(tables), width))
+        self._amount = np.zeros((len(tables), width))
+        for i, table in enumerate(tables):
+            n = len(table.floor)
+            self._floor[i, :n] = table.floor
+            self._rate[i, :n] = table.maint_margin_rate
+            self._amount[i, :n] = table.maint_amount
+
+    def update_mark(self, symbol: str, price: Any) -> None:
+        """New mark price for a symbol (ignored if nothing is held in it)."""
+        rows = self._rows.get(symbol)
+        if rows is not None:
+            self.mark_price[rows] = float(price)
+
+    def update_marks(self, prices: Dict[str, Any]) -> None:
+        """Several mark prices at once, e.g. from the !markPrice@arr stream."""
+        for symbol, price in prices.items():
+            self.update_mark(symbol, price)
+
+    def compute(self) -> PortfolioSnapshot:
+        """PnL, maintenance margin and liquidation price for every position."""
+        size = np.abs(self.position)
+        side = np.sign(self.position)
+        notional = size * self.mark_price
+        pnl = self.position * (self.mark_price - self.entry_price)
+
+        # Highest bracket whose floor the notional has reached
+        bracket = np.maximum((notional[:, None] >= self._floor).sum(axis=1) - 1, 0)
+        rows = np.arange(len(bracket))
+        rate = self._rate[rows, bracket]
+        amount = self._amount[rows, bracket]
+        maint = notional * rate - amount
+
+        cross = ~self.isolated
+        cross_maint = float(maint[cross].sum())
+        cross_pnl = float(pnl[cross].sum())
+        # Every cross position sees the wallet plus everyone else's PnL and margin
+        wallet = np.where(cross, self.wallet_balance - (cross_maint - maint) + (cross_pnl - pnl),
+                          self.isolated_wallet)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            liquidation = (wallet + amount - side * size * self.entry_price) / (size * rate - side * size)
+            liquidation = np.where(liquidation > 0, liquidation, np.nan)
+            distance = np.abs(self.mark_price - liquidation) / self.mark_price
+
+        margin_balance = self.wallet_balance + cross_pnl
+        return PortfolioSnapshot(
+            symbol=self.symbols,
+            position=self.position.copy(),
+            entry_price=self.entry_price.copy(),
+            mark_price=self.mark_price.copy(),
+            notional=notional,
+            unrealized_pnl=pnl,
+            maint_margin_rate=rate,
+            maint_margin=maint,
+            liquidation_price=liquidation,
+            liquidation_distance=distance,
+            total_unrealized_pnl=float(pnl.sum()),
+            total_maint_margin=float(maint.sum()),
+            margin_balance=margin_balance,
+            margin_ratio=cross_maint / margin_balance if margin_balance > 0 else float("inf"),
+        )
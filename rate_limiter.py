@@ -0,0 +1,296 @@
+"""
+Client-side rate limiting for the Binance Futures API.
+Keeps request weight and order counts under the exchange limits so we slow
+down a little instead of hitting 429s and then 418 IP bans.
+"""
+import bisect
+import itertools
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+# Handle both direct execution and module execution
+try:
+    from .logger import logger
+except ImportError:
+    from logger import logger
+
+
+# Lower number = sent first when requests are queued
+PRIORITY_CANCEL = 0
+PRIORITY_RISK_REDUCING = 1
+PRIORITY_ORDER = 2
+PRIORITY_DATA = 3
+
+# (IP weight, 10s order count, 1m order count) per endpoint, from the API docs.
+# Anything not listed costs 1 weight and no orders.
+ENDPOINT_COSTS: Dict[Tuple[str, str], Tuple[int, int, int]] = {
+    ("GET", "/fapi/v1/ping"): (1, 0, 0),
+    ("GET", "/fapi/v1/time"): (1, 0, 0),
+    ("GET", "/fapi/v1/exchangeInfo"): (1, 0, 0),
+    ("POST", "/fapi/v1/order"): (0, 1, 1),
+    ("POST", "/fapi/v1/batchOrders"): (5, 5, 1),
+    ("PUT", "/fapi/v1/order"): (0, 1, 1),
+    ("PUT", "/fapi/v1/batchOrders"): (5, 5, 1),
+    ("DELETE", "/fapi/v1/order"): (1, 0, 0),
+    ("DELETE", "/fapi/v1/batchOrders"): (1, 0, 0),
+    ("DELETE", "/fapi/v1/allOpenOrders"): (1, 0, 0),
+    ("GET", "/fapi/v1/order"): (1, 0, 0),
+    ("GET", "/fapi/v2/account"): (5, 0, 0),
+    ("GET", "/fapi/v2/positionRisk"): (5, 0, 0),
+    ("POST", "/fapi/v1/listenKey"): (1, 0, 0),
+    ("PUT", "/fapi/v1/listenKey"): (1, 0, 0),
+    ("DELETE", "/fapi/v1/listenKey"): (1, 0, 0),
+}
+
+# Response headers Binance uses to report what we've used so far
+WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+ORDER_COUNT_10S_HEADER = "X-MBX-ORDER-COUNT-10S"
+ORDER_COUNT_1M_HEADER = "X-MBX-ORDER-COUNT-1M"
+
+
+def depth_weight(limit: int) -> int:
+    """Weight of a /fapi/v1/depth call for a given limit."""
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
+def klines_weight(limit: int) -> int:
+    """Weight of a /fapi/v1/klines call for a given limit."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def request_cost(method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Tuple[int, int, int]:
+    """Work out what a request costs: (weight, 10s order count, 1m order count)."""
+    params = params or {}
+    # Some endpoints cost more when they return every symbol
+    if (method, endpoint) == ("GET", "/fapi/v1/openOrders"):
+        return (1, 0, 0) if params.get("symbol") else (40, 0, 0)
+    if (method, endpoint) == ("GET", "/fapi/v1/ticker/24hr"):
+        return (1, 0, 0) if params.get("symbol") else (40, 0, 0)
+    if (method, endpoint) == ("GET", "/fapi/v1/premiumIndex"):
+        return (1, 0, 0) if params.get("symbol") else (10, 0, 0)
+    if (method, endpoint) == ("GET", "/fapi/v1/ticker/bookTicker"):
+        return (2, 0, 0) if params.get("symbol") else (5, 0, 0)
+    if (method, endpoint) == ("GET", "/fapi/v1/depth"):
+        return (depth_weight(int(params.get("limit", 500))), 0, 0)
+    if (method, endpoint) == ("GET", "/fapi/v1/klines"):
+        return (klines_weight(int(params.get("limit", 500))), 0, 0)
+    return ENDPOINT_COSTS.get((method, endpoint), (1, 0, 0))
+
+
+def request_priority(method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Pick a queue priority for a request.
+    Cancels go first, then orders that reduce risk, then other orders, then data.
+    """
+    params = params or {}
+    if method == "DELETE":
+        return PRIORITY_CANCEL
+    if method in ("POST", "PUT") and "order" in endpoint.lower():
+        if str(params.get("reduceOnly", "")).lower() == "true" or str(params.get("closePosition", "")).lower() == "true":
+            return PRIORITY_RISK_REDUCING
+        return PRIORITY_ORDER
+    return PRIORITY_DATA
+
+
+class _Window:
+    """Usage counter for one fixed exchange window (e.g. the current minute)."""
+
+    def __init__(self, seconds: int, limit: int):
+        self.seconds = seconds
+        self.limit = limit
+        self.window_id = 0
+        self.used = 0
+
+    def roll(self, now: float) -> None:
+        window_id = int(now // self.seconds)
+        if window_id != self.window_id:
+            self.window_id = window_id
+            self.used = 0
+
+    def fits(self, cost: int, budget: int) -> bool:
+        # A single request bigger than the budget still goes on an empty window
+        return cost == 0 or self.used + cost <= budget or self.used == 0
+
+    def time_to_reset(self, now: float) -> float:
+        return (self.window_id + 1) * self.seconds - now
+
+
+class RateLimiter:
+    """
+    Tracks request weight and order-count budgets per exchange window.
+
+    Each request is charged its known cost before it is sent (acquire), and
+    the counters are corrected from the X-MBX-* headers on every response
+    (update_from_headers). Requests that don't fit in the current window
+    wait in a priority queue, so cancels and reduce-only orders go ahead of
+    data polls when the budget is tight.
+
+    Only a fraction (safety_margin) of each limit is used, leaving room for
+    anything else sharing the same IP or account.
+    """
+
+    def __init__(self, weight_limit: int = 2400, order_limit_10s: int = 300, order_limit_1m: int = 1200,
+                 safety_margin: float = 0.9):
+        self.weight = _Window(60, weight_limit)
+        self.orders_10s = _Window(10, order_limit_10s)
+        self.orders_1m = _Window(60, order_limit_1m)
+        self.safety_margin = safety_margin
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._blocked_until = 0.0
+
+    def _windows(self):
+        return (self.weight, self.orders_10s, self.orders_1m)
+
+    def _budget(self, window: _Window) -> int:
+        return int(window.limit * self.safety_margin)
+
+    def _fits(self, costs: Tuple[int, int, int]) -> bool:
+        return all(window.fits(cost, self._budget(window)) for window, cost in zip(self._windows(), costs))
+
+    def _orders_fit(self, costs: Tuple[int, int, int]) -> bool:
+        return self._fits((0, costs[1], costs[2]))
+
+    def _can_go(self, ticket) -> bool:
+        """Check whether a queued request may be sent now."""
+        if time.monotonic() < self._blocked_until:
+            return False
+        costs = ticket[2]
+        for other in self._waiting:
+            if other is ticket:
+                break
+            other_costs = other[2]
+            # An order stuck on the order-count budget doesn't hold back
+            # requests that only need weight
+            if costs[1] == 0 and costs[2] == 0 and not self._orders_fit(other_costs) and self._fits((other_costs[0], 0, 0)):
+                continue
+            return False
+        return self._fits(costs)
+
+    def _wait_time(self, now: float) -> float:
+        waits = [window.time_to_reset(now) for window in self._windows()]
+        blocked = self._blocked_until - time.monotonic()
+        if blocked > 0:
+            waits.append(blocked)
+        return max(min(min(waits), 1.0), 0.001)
+
+    def acquire(self, weight: int, orders_10s: int = 0, orders_1m: int = 0,
+                priority: int = PRIORITY_DATA) -> float:
+        """
+        Block until the request fits in the budget, then charge it.
+
+        Returns:
+            Seconds spent waiting
+        """
+        costs = (weight, orders_10s, orders_1m)
+        ticket = (priority, next(self._sequence), costs)
+        start = time.monotonic()
+
+        with self._cond:
+            bisect.insort(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.time()
+                    for window in self._windows():
+                        window.roll(now)
+                    if self._can_go(ticket):
+                        break
+                    self._cond.wait(timeout=self._wait_time(now))
+            finally:
+                self._waiting.remove(ticket)
+
+            for window, cost in zip(self._windows(), costs):
+                window.used += cost
+            # Whoever is next in line may fit now that the queue moved
+            self._cond.notify_all()
+
+        waited = time.monotonic() - start
+        if waited > 0.5:
+            logger.warning("Rate limiter held request for %.2fs (weight used %s)", waited, self.weight.used)
+        return waited
+
+    def try_acquire(self, weight: int, orders_10s: int = 0, orders_1m: int = 0,
+                    priority: int = PRIORITY_DATA) -> bool:
+        """
+        Charge the request if it can go right now, without waiting.
+        Lets an event loop skip a thread hop when there's budget to spare.
+
+        Returns:
+            True if charged, False if the caller has to acquire() instead
+        """
+        costs = (weight, orders_10s, orders_1m)
+        ticket = (priority, next(self._sequence), costs)
+        with self._cond:
+            now = time.time()
+            for window in self._windows():
+                window.roll(now)
+            bisect.insort(self._waiting, ticket)
+            try:
+                if not self._can_go(ticket):
+                    return False
+            finally:
+                self._waiting.remove(ticket)
+            for window, cost in zip(self._windows(), costs):
+                window.used += cost
+        return True
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Sync the counters with what the exchange says we've used."""
+        with self._cond:
+            now = time.time()
+            for header, window in ((WEIGHT_HEADER, self.weight),
+                                   (ORDER_COUNT_10S_HEADER, self.orders_10s),
+                                   (ORDER_COUNT_1M_HEADER, self.orders_1m)):
+                value = headers.get(header)
+                if value is None:
+                    continue
+                window.roll(now)
+                # Requests still in flight aren't in the header yet, so never lower our count
+                window.used = max(window.used, int(value))
+
+    def on_rate_limited(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        """
+        Stop sending after a 429 (rate limited) or 418 (IP banned) response.
+        Waits as long as the Retry-After header says, or a cautious default.
+        """
+        try:
+            delay = float(retry_after) if retry_after else 0.0
+        except ValueError:
+            delay = 0.0
+        if delay <= 0:
+            delay = 120.0 if status_code == 418 else 60.0
+
+        with self._cond:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            # Treat the current windows as used up
+            for window in self._windows():
+                window.used = max(window.used, window.limit)
+
+        logger.error("Binance returned %s - pausing requests for %.0fs", status_code, delay)
+
+    def usage(self) -> Dict[str, int]:
+        """Current usage per window, handy for logging."""
+        with self._cond:
+            now = time.time()
+            for window in self._windows():
+                window.roll(now)
+            return {
+                "weight_1m": self.weight.used,
+                "orders_10s": self.orders_10s.used,
+                "orders_1m": self.orders_1m.used,
+            }
@@ -0,0 +1,124 @@
+"""
+Requote planning - turn "these are the quotes I want" into the fewest
+order actions. Existing orders that already match are left alone, the
+rest are amended in place where possible (one request per order instead
+of a cancel plus a new order), and only what's left over is cancelled or
+created. BinanceClient.requote() sends the plan in batches.
+"""
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+# Handle both direct execution and module execution
+try:
+    from .validators import format_decimal
+except ImportError:
+    from validators import format_decimal
+
+
+class Quote(NamedTuple):
+    """One resting order we want: side, limit price and quantity still open."""
+    side: str
+    price: Any
+    quantity: Any
+
+
+class RequotePlan(NamedTuple):
+    """What requote() will send. amend and create are ready-made request dicts."""
+    keep: List[Any]                 # OrderRecords that already match a quote
+    amend: List[Dict[str, Any]]     # modify_orders() entries
+    cancel: List[Any]               # OrderRecords to cancel
+    create: List[Dict[str, Any]]    # place_orders() entries
+
+    @property
+    def actions(self) -> int:
+        return len(self.amend) + len(self.cancel) + len(self.create)
+
+
+def _same(a: float, b: float) -> bool:
+    return abs(a - b) <= 1e-9 * max(1.0, abs(a), abs(b))
+
+
+def plan_requote(symbol: str, quotes: Iterable[Quote], open_orders: Iterable[Any],
+                 time_in_force: str = "GTC") -> RequotePlan:
+    """
+    Work out the smallest set of actions that turns open_orders into quotes.
+
+    Per side:
+      1. orders whose price and open quantity already match a quote are kept
+      2. orders at a wanted price but with the wrong size get their quantity
+         amended (a smaller size keeps its queue position on Binance)
+      3. the remaining orders and quotes are paired best price first and
+         the orders are amended to the new price
+      4. orders left over are cancelled, quotes left over are created
+
+    Only LIMIT orders are touched - stops and other order types on the same
+    symbol are left alone, and so are orders still being sent.
+
+    Args:
+        symbol: Symbol the quotes are for
+        quotes: Wanted orders (prices and sizes already on the symbol's grid)
+        open_orders: Our current orders (OrderRecords, see order_state.py)
+        time_in_force: For newly created orders
+
+    Returns:
+        RequotePlan
+    """
+    wanted: Dict[str, List[Quote]] = {"BUY": [], "SELL": []}
+    for quote in quotes:
+        if quote.side not in wanted:
+            raise ValueError(f"Quote side must be BUY or SELL, got {quote.side!r}")
+        wanted[quote.side].append(quote)
+    have: Dict[str, List[Any]] = {"BUY": [], "SELL": []}
+    for order in open_orders:
+        if order.symbol == symbol and order.type == "LIMIT" and order.status in ("NEW", "PARTIALLY_FILLED") \
+                and order.side in have:
+            have[order.side].append(order)
+
+    plan = RequotePlan([], [], [], [])
+    for side in ("BUY", "SELL"):
+        quotes_left = [(float(q.price), float(q.quantity), q) for q in wanted[side]]
+        orders_left = list(have[side])
+
+        # 1. Exact matches
+        unmatched = []
+        for price, qty, quote in quotes_left:
+            match = next((o for o in orders_left if _same(o.price, price) and _same(o.remaining, qty)), None)
+            if match is None:
+                unmatched.append((price, qty, quote))
+            else:
+                orders_left.remove(match)
+                plan.keep.append(match)
+        quotes_left = unmatched
+
+        # 2. Same price, different size
+        unmatched = []
+        for price, qty, quote in quotes_left:
+            match = next((o for o in orders_left if _same(o.price, price)), None)
+            if match is None:
+                unmatched.append((price, qty, quote))
+            else:
+                orders_left.remove(match)
+                plan.amend.append(_amend(match, quote))
+        quotes_left = unmatched
+
+        # 3. Move the rest, best price first so the top of the book changes first
+        best_first = side == "BUY"
+        quotes_left.sort(key=lambda item: item[0], reverse=best_first)
+        orders_left.sort(key=lambda order: order.price, reverse=best_first)
+        pairs: List[Tuple[Any, Quote]] = list(zip(orders_left, (quote for _, _, quote in quotes_left)))
+        for order, quote in pairs:
+            plan.amend.append(_amend(order, quote))
+
+        # 4. Leftovers
+        plan.cancel.extend(orders_left[len(pairs):])
+        for _, _, quote in quotes_left[len(pairs):]:
+            plan.create.append({"symbol": symbol, "side": side, "order_type": "LIMIT", "quantity": quote.quantity,
+                                "price": quote.price, "time_in_force": time_in_force})
+    return plan
+
+
+def _amend(order: Any, quote: Quote) -> Dict[str, Any]:
+    # Binance's quantity on a modify is the order's total, filled part included
+    quantity = Decimal(str(order.executed_qty)) + Decimal(str(quote.quantity))
+    return {"symbol": order.symbol, "side": order.side, "order_id": order.order_id,
+            "quantity": format_decimal(quantity), "price": quote.price}
@@ -0,0 +1,117 @@
+"""
+Retry helpers for the Binance client.
+Decides which failures are worth retrying, how long to wait, and gives every
+order a client order ID that its retries reuse, so a retry can never
+double-fill.
+"""
+import hashlib
+import itertools
+import random
+import secrets
+from typing import Any, Dict, Optional
+
+import requests
+
+# Binance error codes that mean "try again" rather than "you sent something wrong"
+TRANSIENT_ERROR_CODES = {
+    -1001,  # Internal error; unable to process your request
+    -1003,  # Too many requests
+    -1007,  # Timeout waiting for response from backend server
+}
+
+# Error codes where the order may or may not have been accepted
+UNKNOWN_STATUS_ERROR_CODES = {-1001, -1007}
+
+# Order lookups by client ID answer this when the order never arrived
+ORDER_DOES_NOT_EXIST = -2013
+
+# Cancels answer this when the order is already filled, cancelled or unknown
+UNKNOWN_ORDER = -2011
+
+
+def error_code(e: Exception) -> Optional[int]:
+    """Binance error code from a failed request, if the response had one."""
+    response = getattr(e, "response", None)
+    if response is None:
+        return None
+    try:
+        return response.json().get("code")
+    except Exception:
+        return None
+
+
+def is_transient(e: Exception) -> bool:
+    """True for failures that are likely to go away if we try again."""
+    if isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    response = getattr(e, "response", None)
+    if response is None:
+        return False
+    if response.status_code == 429 or response.status_code >= 500:
+        return True
+    return error_code(e) in TRANSIENT_ERROR_CODES
+
+
+def is_ambiguous(e: Exception) -> bool:
+    """
+    True if the request may have reached the exchange even though it failed.
+    For orders this means we have to look before sending again.
+    """
+    # Never connected, so the request never left
+    if isinstance(e, requests.exceptions.ConnectTimeout):
+        return False
+    if isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    response = getattr(e, "response", None)
+    if response is None:
+        return False
+    return response.status_code >= 500 or error_code(e) in UNKNOWN_STATUS_ERROR_CODES
+
+
+# Random per process, so two runs placing the same order never share IDs
+_PROCESS_NONCE = secrets.token_hex(16)
+
+# Counts orders across every client in this process
+_order_sequence = itertools.count()
+
+
+def make_client_order_id(params: Dict[str, Any]) -> str:
+    """
+    Build a newClientOrderId for a new order.
+
+    The ID is a hash of the order itself, a random per-process nonce and
+    the order's position in this process. It is made once per order and
+    then reused for every retry of that order, which is what lets a retry
+    look the order up instead of placing it twice. Separate orders - even
+    identical ones, or the same order from two CLI runs - always get
+    different IDs.
+
+    Returns:
+        A 36 character ID (Binance's maximum)
+    """
+    fields = [str(params.get(key, "")) for key in
+              ("symbol", "side", "type", "quantity", "price", "stopPrice", "reduceOnly", "positionSide")]
+    fields.append(_PROCESS_NONCE)
+    fields.append(str(next(_order_sequence)))
+    digest = hashlib.sha256("|".join(fields).encode("utf-8")).hexdigest()
+    return f"bot-{digest[:32]}"
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.2, max_delay: float = 5.0):
+        """
+        Args:
+            max_attempts: Total tries including the first one
+            base_delay: Backoff before the first retry (seconds)
+            max_delay: Upper bound for any single backoff (seconds)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after the given failed attempt (1-based)."""
+        # Full jitter keeps a crowd of clients from retrying in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
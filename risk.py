@@ -0,0 +1,297 @@
+"""
+Pre-trade risk checks that run in memory.
+Keeps per-symbol position, open-order quantity and exposure, plus an
+account-wide total and an order rate bucket. Everything is updated
+incrementally from the order tracker (order_state.py), so a check is a
+handful of arithmetic operations - no position request before each order.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+# Handle both direct execution and module execution
+try:
+    from .config import config
+    from .logger import logger
+    from .order_state import OrderRecord, RecordState
+except ImportError:
+    from config import config
+    from logger import logger
+    from order_state import OrderRecord, RecordState
+
+
+class RiskError(ValueError):
+    """The order breaks a risk limit. A ValueError, so CLIs report it like bad input."""
+
+
+class RiskLimits(NamedTuple):
+    """
+    Limits checked before every order. None means no limit. Notional
+    limits are in the quote asset (USDT) at the symbol's reference price.
+    """
+    max_order_notional: Optional[float] = None
+    # Worst case per symbol: the position if every open order on one side filled
+    max_position_notional: Optional[float] = None
+    # The same worst case, summed over all symbols
+    max_gross_notional: Optional[float] = None
+    max_open_orders: Optional[int] = None
+    max_orders_per_second: Optional[float] = None
+    # Per-symbol max_position_notional overrides
+    symbol_limits: Dict[str, float] = {}
+    # Cut orders down to what fits instead of rejecting them
+    clip: bool = False
+
+    @classmethod
+    def from_config(cls) -> "RiskLimits":
+        """Limits from the BINANCE_RISK_* environment variables."""
+        return cls(
+            max_order_notional=config.risk_max_order_notional,
+            max_position_notional=config.risk_max_position_notional,
+            max_gross_notional=config.risk_max_gross_notional,
+            max_open_orders=config.risk_max_open_orders,
+            max_orders_per_second=config.risk_max_orders_per_second,
+            symbol_limits=dict(config.risk_symbol_limits),
+            clip=config.risk_clip,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return any(limit is not None for limit in (self.max_order_notional, self.max_position_notional,
+                                                   self.max_gross_notional, self.max_open_orders,
+                                                   self.max_orders_per_second)) or bool(self.symbol_limits)
+
+    @property
+    def needs_positions(self) -> bool:
+        return self.max_position_notional is not None or self.max_gross_notional is not None \
+            or bool(self.symbol_limits)
+
+
+class _SymbolRisk:
+    """Running totals for one symbol (quantities in base asset)."""
+
+    __slots__ = ("position", "open_buy", "open_sell", "price", "exposure")
+
+    def __init__(self):
+        self.position = 0.0
+        self.open_buy = 0.0
+        self.open_sell = 0.0
+        # Reference price for notional - last fill, mark price or update_price()
+        self.price = 0.0
+        # Worst-case notional currently counted in the account total
+        self.exposure = 0.0
+
+    def worst_qty(self) -> float:
+        return max(abs(self.position + self.open_buy), abs(self.position - self.open_sell))
+
+
+class RiskEngine:
+    """
+    Checks orders against RiskLimits before they go out.
+
+    Positions are loaded once (positionRisk, lazily on the first check
+    that needs them) and from then on follow the fills the order tracker
+    sees. Open-order quantity follows every order state change, including
+    orders still being sent, so two orders placed back to back can't
+    both use the same headroom.
+
+    check() is O(1): a few dict lookups and arithmetic. With no limits set
+    it returns straight away.
+    """
+
+    def __init__(self, limits: Optional[RiskLimits] = None,
+                 load_positions: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+                 load_price: Optional[Callable[[str], float]] = None):
+        """
+        Args:
+            limits: Limits to enforce (default: BINANCE_RISK_* from config)
+            load_positions: Returns positionRisk rows (e.g. client.get_position_info)
+            load_price: Returns a price for a symbol nothing has been seen for yet
+                        (only needed for market orders)
+        """
+        self.limits = limits if limits is not None else RiskLimits.from_config()
+        self.load_positions = load_positions
+        self.load_price = load_price
+        # Held across check() and recording the order, see BinanceClient.place_order
+        self.lock = threading.RLock()
+        self._symbols: Dict[str, _SymbolRisk] = {}
+        self.gross_exposure = 0.0
+        self.open_orders = 0
+        self._positions_loaded = False
+        # Token bucket for the order rate
+        self._tokens = self.limits.max_orders_per_second or 0.0
+        self._refilled = time.monotonic()
+        self.rejected = 0
+        self.clipped = 0
+
+    def _symbol(self, symbol: str) -> _SymbolRisk:
+        state = self._symbols.get(symbol)
+        if state is None:
+            state = self._symbols[symbol] = _SymbolRisk()
+        return state
+
+    def _revalue(self, symbol: str, state: _SymbolRisk) -> None:
+        exposure = state.worst_qty() * state.price
+        self.gross_exposure += exposure - state.exposure
+        state.exposure = exposure
+
+    # ------------------------------------------------------------ state
+
+    def set_positions(self, positions: List[Dict[str, Any]]) -> None:
+        """Replace positions (and mark prices) with positionRisk rows."""
+        with self.lock:
+            for state in self._symbols.values():
+                state.position = 0.0
+            for row in positions:
+                state = self._symbol(row["symbol"])
+                state.position += float(row.get("positionAmt") or 0)
+                mark = float(row.get("markPrice") or 0)
+                if mark:
+                    state.price = mark
+            for symbol, state in self._symbols.items():
+                self._revalue(symbol, state)
+            self._positions_loaded = True
+
+    def update_price(self, symbol: str, price: Any) -> None:
+        """Give the engine a fresher reference price (e.g. from a market data stream)."""
+        with self.lock:
+            state = self._symbol(symbol)
+            state.price = float(price)
+            self._revalue(symbol, state)
+
+    def on_order_change(self, record: OrderRecord, before: Optional[RecordState], after: RecordState) -> None:
+        """OrderTracker listener - moves open quantity and applies fills."""
+        with self.lock:
+            state = self._symbol(record.symbol)
+            if before is not None and before.is_open:
+                self.open_orders -= 1
+                if before.side == "BUY":
+                    state.open_buy -= before.remaining
+                else:
+                    state.open_sell -= before.remaining
+            if after.is_open:
+                self.open_orders += 1
+                if after.side == "BUY":
+                    state.open_buy += after.remaining
+                else:
+                    state.open_sell += after.remaining
+            # Orders seen for the first time are already in the loaded positions
+            if before is not None and after.executed_qty > before.executed_qty:
+                filled = after.executed_qty - before.executed_qty
+                state.position += filled if after.side == "BUY" else -filled
+                # Price of just this fill, backed out of the running average
+                notional = after.avg_price * after.executed_qty - before.avg_price * before.executed_qty
+                fill_price = notional / filled if notional > 0 else after.avg_price or after.price
+                if fill_price:
+                    state.price = fill_price
+            elif not state.price and after.price:
+                state.price = after.price
+            self._revalue(record.symbol, state)
+
+    def ensure_positions(self) -> None:
+        """Load positions now if they haven't been (check() does it on first use otherwise)."""
+        if self._positions_loaded or self.load_positions is None:
+            return
+        try:
+            self.set_positions(self.load_positions())
+        except Exception as e:
+            # Checking against a zero position beats not trading at all; try again next time
+            logger.warning("Could not load positions for risk checks: %s", e)
+
+    # ------------------------------------------------------------ checks
+
+    def check(self, symbol: str, side: str, quantity: Any, price: Any = None, reduce_only: bool = False,
+              clip: Optional[bool] = None) -> Any:
+        """
+        Check a new order against the limits.
+
+        Args:
+            symbol: Trading pair symbol
+            side: BUY or SELL
+            quantity: Order quantity
+            price: Limit price (None for market orders - the reference price is used)
+            reduce_only: Reduce-only orders skip the exposure limits
+            clip: Cut the quantity down to what fits (default: limits.clip)
+
+        Returns:
+            The quantity to send - as passed in, or smaller (a float) when clipped
+
+        Raises:
+            RiskError: The order doesn't fit (or would be clipped to nothing)
+        """
+        limits = self.limits
+        if not limits.enabled:
+            return quantity
+        clip = limits.clip if clip is None else clip
+        with self.lock:
+            if limits.max_open_orders is not None and self.open_orders >= limits.max_open_orders:
+                self._reject(f"{self.open_orders} orders already open (limit {limits.max_open_orders})")
+            if limits.max_orders_per_second is not None:
+                self._refill(limits.max_orders_per_second)
+                if self._tokens < 1:
+                    self._reject(f"Order rate above {limits.max_orders_per_second:g}/s")
+
+            qty = float(quantity)
+            if limits.needs_positions:
+                self.ensure_positions()
+            state = self._symbol(symbol)
+            if not state.price and not price and self.load_price is not None:
+                state.price = float(self.load_price(symbol))
+                self._revalue(symbol, state)
+            reference = float(price) if price else state.price
+            allowed = qty
+            if limits.max_order_notional is not None:
+                allowed = min(allowed, self._per_price(limits.max_order_notional, reference, symbol))
+            if not reduce_only:
+                cap = limits.symbol_limits.get(symbol, limits.max_position_notional)
+                if limits.max_gross_notional is not None:
+                    others = self.gross_exposure - state.exposure
+                    cap = limits.max_gross_notional - others if cap is None else \
+                        min(cap, limits.max_gross_notional - others)
+                if cap is not None:
+                    max_qty = self._per_price(cap, state.price or reference, symbol)
+                    if side == "BUY":
+                        headroom = max_qty - (state.position + state.open_buy)
+                    else:
+                        headroom = max_qty + (state.position - state.open_sell)
+                    allowed = min(allowed, max(headroom, 0.0))
+
+            if allowed < qty * (1 - 1e-9):
+                if not clip or allowed <= 0:
+                    self._reject(f"{side} {quantity} {symbol} is over the risk limits "
+                                 f"(at most {allowed:g} fits right now)")
+                self.clipped += 1
+                logger.warning("Risk: clipped %s %s %s to %g", side, quantity, symbol, allowed)
+                quantity = allowed
+            if limits.max_orders_per_second is not None:
+                self._tokens -= 1
+            return quantity
+
+    def _per_price(self, notional: float, price: float, symbol: str) -> float:
+        if not price:
+            self._reject(f"No reference price for {symbol} - can't check notional limits")
+        return notional / price
+
+    def _refill(self, rate: float) -> None:
+        now = time.monotonic()
+        self._tokens = min(rate, self._tokens + (now - self._refilled) * rate)
+        self._refilled = now
+
+    def _reject(self, reason: str) -> None:
+        self.rejected += 1
+        raise RiskError(f"Risk limit: {reason}")
+
+    def exposure(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Current numbers behind the checks.
+
+        Returns:
+            Per symbol (or for one symbol): position, open_buy, open_sell,
+            price and worst-case exposure, plus account totals
+        """
+        with self.lock:
+            symbols = {name: {"position": s.position, "open_buy": s.open_buy, "open_sell": s.open_sell,
+                              "price": s.price, "exposure": s.exposure}
+                       for name, s in self._symbols.items()
+                       if (symbol is None or name == symbol) and (s.position or s.open_buy or s.open_sell)}
+            return {"symbols": symbols, "gross_exposure": self.gross_exposure, "open_orders": self.open_orders,
+                    "rejected": self.rejected, "clipped": self.clipped}
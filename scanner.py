@@ -0,0 +1,303 @@
+"""
+All-symbol market scanner.
+Pulls the 24hr ticker, premium index (mark price and funding) and book
+ticker for every symbol - one request each - into NumPy columns, and runs
+screens over them as vectorized expressions. Refreshes only re-parse the
+rows that changed since the last pull.
+
+Run with:
+    python scanner.py                          # every built-in screen
+    python scanner.py --screen funding --limit 10
+    python scanner.py --watch 5                # rescan every 5 seconds
+"""
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+# Handle both direct execution and module execution
+try:
+    from .binance_client import BinanceClient
+    from .config import config
+    from .logger import logger
+except ImportError:
+    from binance_client import BinanceClient
+    from config import config
+    from logger import logger
+
+
+class MarketColumns(NamedTuple):
+    """One array per field, one entry per symbol (NaN where a source has no row)."""
+    symbol: np.ndarray
+    # /fapi/v1/ticker/24hr
+    last_price: np.ndarray
+    price_change_pct: np.ndarray
+    high_price: np.ndarray
+    low_price: np.ndarray
+    volume: np.ndarray
+    quote_volume: np.ndarray
+    trade_count: np.ndarray
+    # /fapi/v1/premiumIndex
+    mark_price: np.ndarray
+    index_price: np.ndarray
+    funding_rate: np.ndarray
+    next_funding_time: np.ndarray
+    # /fapi/v1/ticker/bookTicker
+    bid_price: np.ndarray
+    bid_qty: np.ndarray
+    ask_price: np.ndarray
+    ask_qty: np.ndarray
+    # Derived
+    mid_price: np.ndarray
+    spread_bps: np.ndarray
+    basis_bps: np.ndarray           # mark over index
+
+
+class _Source(NamedTuple):
+    name: str
+    fetch: str                      # BinanceClient method
+    fields: Dict[str, str]          # column -> JSON key
+    change_key: Callable[[Dict[str, Any]], Any]
+
+
+SOURCES = (
+    _Source("ticker", "get_ticker_24hr",
+            {"last_price": "lastPrice", "price_change_pct": "priceChangePercent", "high_price": "highPrice",
+             "low_price": "lowPrice", "volume": "volume", "quote_volume": "quoteVolume", "trade_count": "count"},
+            # Moves with every trade
+            lambda row: (row.get("closeTime"), row.get("count"))),
+    _Source("premium", "get_premium_index",
+            {"mark_price": "markPrice", "index_price": "indexPrice", "funding_rate": "lastFundingRate",
+             "next_funding_time": "nextFundingTime"},
+            # "time" is the response time, so compare the values themselves
+            lambda row: (row.get("markPrice"), row.get("indexPrice"), row.get("lastFundingRate"),
+                         row.get("nextFundingTime"))),
+    _Source("book", "get_book_ticker",
+            {"bid_price": "bidPrice", "bid_qty": "bidQty", "ask_price": "askPrice", "ask_qty": "askQty"},
+            lambda row: (row.get("lastUpdateId"), row.get("bidPrice"), row.get("bidQty"),
+                         row.get("askPrice"), row.get("askQty"))),
+)
+
+RAW_COLUMNS = [column for source in SOURCES for column in source.fields]
+
+# A screen is a boolean mask over the columns
+Screen = Callable[[MarketColumns], np.ndarray]
+RankBy = Union[str, Callable[[MarketColumns], np.ndarray]]
+
+
+class NamedScreen(NamedTuple):
+    where: Screen
+    rank_by: RankBy
+    descending: bool = True
+
+
+# Built-in screens for the CLI - anything else can be passed to scan() directly
+SCREENS: Dict[str, NamedScreen] = {
+    "volume": NamedScreen(lambda c: c.quote_volume > 0, "quote_volume"),
+    "gainers": NamedScreen(lambda c: c.quote_volume > 0, "price_change_pct"),
+    "losers": NamedScreen(lambda c: c.quote_volume > 0, "price_change_pct", descending=False),
+    "funding": NamedScreen(lambda c: c.spread_bps < 10, lambda c: np.abs(c.funding_rate)),
+    "tight": NamedScreen(lambda c: c.quote_volume > 0, "spread_bps", descending=False),
+}
+
+
+class MarketScanner:
+    """
+    Columnar snapshot of every symbol's market data.
+
+    refresh() sends the three all-symbol requests at once (weight 40 + 10
+    + 5) and only converts the rows whose contents changed. Readers get a
+    MarketColumns that is swapped in whole, so a scan never sees half a
+    refresh. scan() is a few NumPy operations over a few hundred rows.
+    """
+
+    def __init__(self, client: BinanceClient, interval: Optional[float] = None):
+        """
+        Args:
+            client: Client to fetch market data with
+            interval: Seconds between refreshes once start() is called
+        """
+        self.client = client
+        self.interval = interval or config.scan_interval
+        self._index: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._raw = {column: np.zeros(0) for column in RAW_COLUMNS}
+        self._keys: Dict[str, Dict[str, Any]] = {source.name: {} for source in SOURCES}
+        self.columns: Optional[MarketColumns] = None
+        self.refreshed_at = 0.0
+        # Rows converted on the last refresh, per source
+        self.parsed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # One request per source in flight at once, on threads that outlive each refresh
+        self._pool = ThreadPoolExecutor(max_workers=len(SOURCES), thread_name_prefix="market-scanner")
+
+    def refresh(self) -> MarketColumns:
+        """Pull all three endpoints and update the columns."""
+        responses = list(self._pool.map(lambda source: getattr(self.client, source.fetch)(), SOURCES))
+        with self._lock:
+            for source, rows in zip(SOURCES, responses):
+                for row in rows:
+                    if row["symbol"] not in self._index:
+                        self._index[row["symbol"]] = len(self._symbols)
+                        self._symbols.append(row["symbol"])
+            size = len(self._symbols)
+            # Copies, so the columns handed out before stay as they were
+            raw = {column: np.concatenate([values, np.full(size - len(values), np.nan)])
+                   for column, values in self._raw.items()}
+            for source, rows in zip(SOURCES, responses):
+                self.parsed[source.name] = self._apply(source, rows, raw)
+            self._raw = raw
+            self.columns = self._derive(raw)
+            self.refreshed_at = time.time()
+        return self.columns
+
+    def _apply(self, source: _Source, rows: List[Dict[str, Any]], raw: Dict[str, np.ndarray]) -> int:
+        keys = self._keys[source.name]
+        seen = set()
+        changed_rows, changed_at = [], []
+        for row in rows:
+            symbol = row["symbol"]
+            seen.add(symbol)
+            key = source.change_key(row)
+            if keys.get(symbol) != key:
+                keys[symbol] = key
+                changed_rows.append(row)
+                changed_at.append(self._index[symbol])
+        if changed_rows:
+            at = np.array(changed_at)
+            for column, field in source.fields.items():
+                raw[column][at] = np.array([row.get(field) or np.nan for row in changed_rows], dtype=float)
+        # Symbols this endpoint stopped listing (delisted) go back to NaN
+        for symbol in [symbol for symbol in keys if symbol not in seen]:
+            del keys[symbol]
+            for column in source.fields:
+                raw[column][self._index[symbol]] = np.nan
+        return len(changed_rows)
+
+    def _derive(self, raw: Dict[str, np.ndarray]) -> MarketColumns:
+        bid, ask = raw["bid_price"], raw["ask_price"]
+        mid = (bid + ask) / 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spread = (ask - bid) / mid * 1e4
+            basis = (raw["mark_price"] / raw["index_price"] - 1) * 1e4
+        return MarketColumns(symbol=np.array(self._symbols, dtype=object), mid_price=mid, spread_bps=spread,
+                             basis_bps=basis, **raw)
+
+    def scan(self, where: Optional[Screen] = None, rank_by: RankBy = "quote_volume", descending: bool = True,
+             limit: Optional[int] = 20, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Filter and rank symbols.
+
+            scanner.scan(lambda c: (c.spread_bps < 2) & (c.quote_volume > 5e7),
+                         rank_by=lambda c: np.abs(c.funding_rate), limit=10)
+
+        Args:
+            where: Boolean mask over MarketColumns (combine with & and |)
+            rank_by: Column name or a function returning the values to sort by
+            descending: Highest first
+            limit: How many symbols to return (None for all)
+            columns: Fields to include per row (default: all)
+
+        Returns:
+            Ranked rows: {"symbol", "rank_value", <columns>}
+        """
+        market = self.columns if self.columns is not None else self.refresh()
+        values = getattr(market, rank_by) if isinstance(rank_by, str) else rank_by(market)
+        values = np.asarray(values, dtype=float)
+        with np.errstate(invalid="ignore"):
+            mask = ~np.isnan(values)
+            if where is not None:
+                mask &= np.asarray(where(market), dtype=bool)
+        selected = np.flatnonzero(mask)
+        order = np.argsort(-values[selected] if descending else values[selected], kind="stable")
+        selected = selected[order][:limit]
+
+        fields = columns or [field for field in MarketColumns._fields if field != "symbol"]
+        picked = {field: getattr(market, field)[selected].tolist() for field in fields}
+        return [dict({"symbol": market.symbol[i], "rank_value": float(values[i])},
+                     **{field: picked[field][n] for field in fields}) for n, i in enumerate(selected)]
+
+    def run(self, name: str, limit: Optional[int] = 20) -> List[Dict[str, Any]]:
+        """Run one of the SCREENS by name."""
+        if name not in SCREENS:
+            raise ValueError(f"Unknown screen {name} - choose from {', '.join(SCREENS)}")
+        screen = SCREENS[name]
+        return self.scan(screen.where, screen.rank_by, screen.descending, limit)
+
+    def start(self) -> None:
+        """Refresh every interval seconds from a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="market-scanner", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def close(self) -> None:
+        """Stop the refresh thread and the fetch pool's workers."""
+        self.stop()
+        if self._thread is not None:
+            self._thread.join()
+        self._pool.shutdown(wait=True)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("Market scan refresh failed: %s", e)
+            if self._stop_event.wait(self.interval):
+                return
+
+
+def _print_rows(title: str, rows: List[Dict[str, Any]]) -> None:
+    print(f"\n{title}")
+    print(f"  {'SYMBOL':<14}{'LAST':>14}{'24H %':>9}{'QUOTE VOL':>16}{'FUNDING %':>11}{'SPREAD BPS':>12}")
+    for row in rows:
+        print(f"  {row['symbol']:<14}{row['last_price']:>14.6g}{row['price_change_pct']:>9.2f}"
+              f"{row['quote_volume']:>16,.0f}{row['funding_rate'] * 100:>11.4f}{row['spread_bps']:>12.2f}")
+
+
+def main():
+    """Entry point when running as a script."""
+    parser = argparse.ArgumentParser(description="Screen every futures symbol from three requests")
+    parser.add_argument("--screen", choices=list(SCREENS), action="append",
+                        help="Screen to run (repeatable, default: all)")
+    parser.add_argument("--limit", type=int, default=10, help="Symbols per screen (default 10)")
+    parser.add_argument("--watch", type=float, metavar="SECONDS", help="Keep rescanning at this interval")
+    args = parser.parse_args()
+
+    scanner = MarketScanner(BinanceClient())
+    try:
+        while True:
+            started = time.perf_counter()
+            scanner.refresh()
+            fetched = time.perf_counter()
+            results = {name: scanner.run(name, args.limit) for name in args.screen or SCREENS}
+            scanned = time.perf_counter()
+            for name, rows in results.items():
+                _print_rows(name, rows)
+            print(f"\n{len(scanner.columns.symbol)} symbols - fetched in {(fetched - started) * 1e3:.0f} ms "
+                  f"(re-parsed {scanner.parsed}), screened in {(scanned - fetched) * 1e3:.2f} ms\n")
+            if not args.watch:
+                break
+            time.sleep(args.watch)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"\nScan failed: {e}\n")
+        sys.exit(1)
+    finally:
+        scanner.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Shared fixtures. Every test runs against an in-process mock_server.py, so
+nothing here needs network access or API keys.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Config is read at import time - start from no limits whatever the shell has
+# set, and keep bot.log, caches and the journal out of the checkout
+for name in [name for name in os.environ if name.startswith("BINANCE_")]:
+    del os.environ[name]
+WORK_DIR = tempfile.mkdtemp(prefix="binance-bot-tests-")
+os.environ.update({"BINANCE_CACHE_DIR": os.path.join(WORK_DIR, "cache"),
+                   "BINANCE_DATA_DIR": os.path.join(WORK_DIR, "data"), "BINANCE_JOURNAL": ""})
+_cwd = os.getcwd()
+os.chdir(WORK_DIR)  # bot.log is opened relative to the working directory
+try:
+    from binance_client import BinanceClient  # noqa: E402
+    from mock_server import HOUSE, MockBinanceServer  # noqa: E402
+finally:
+    os.chdir(_cwd)
+
+
+@pytest.fixture
+def server():
+    server = MockBinanceServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    client = BinanceClient(api_key="key", api_secret="secret", testnet=True, base_url=server.url)
+    yield client
+    client.close()
+
+
+def own_orders(server, status=None):
+    """Orders the test account has on the mock (the house ladder left out)."""
+    return [order for order in server.engine.orders.values()
+            if order.account != HOUSE and (status is None or order.status == status)]
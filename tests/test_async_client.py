@@ -0,0 +1,108 @@
+"""Async client: risk checks run off the event loop, limits and clock shared with BinanceClient."""
+import asyncio
+import time
+
+import pytest
+
+from async_client import AsyncBinanceClient
+from binance_client import BinanceClient
+from conftest import own_orders
+from mock_server import MockBinanceServer
+from risk import RiskEngine, RiskError, RiskLimits
+
+
+def test_risk_check_does_not_block_the_loop(server):
+    def slow_price(symbol):
+        time.sleep(0.3)  # a REST call for a symbol the engine hasn't priced yet
+        return 42000.0
+
+    async def go():
+        client = AsyncBinanceClient(api_key="key", api_secret="secret", testnet=True, base_url=server.url)
+        client.risk = RiskEngine(RiskLimits(max_order_notional=1000), load_price=slow_price)
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        try:
+            await client.place_order("BTCUSDT", "BUY", "MARKET", 0.001)
+            with pytest.raises(RiskError):
+                await client.place_order("BTCUSDT", "BUY", "MARKET", 0.1)
+            results = await client.place_orders([
+                {"symbol": "BTCUSDT", "side": "BUY", "order_type": "MARKET", "quantity": 0.1},
+                {"symbol": "BTCUSDT", "side": "BUY", "order_type": "MARKET", "quantity": 0.001},
+            ])
+        finally:
+            ticker.cancel()
+            await client.close()
+        return ticks, results
+
+    ticks, results = asyncio.run(go())
+
+    assert ticks >= 10
+    assert results[0]["code"] == -2010 and results[1]["status"] == "FILLED"
+    assert len(own_orders(server)) == 2
+
+
+def test_shares_the_rate_limiter(client, server):
+    async def go():
+        async_client = AsyncBinanceClient(api_key="key", api_secret="secret", testnet=True, base_url=server.url)
+        async_client.rate_limiter = client.rate_limiter
+        try:
+            await async_client.get_position_info()
+        finally:
+            await async_client.close()
+
+    client.get_account_info()
+    used = client.rate_limiter.weight.used
+    asyncio.run(go())
+
+    # Charged before sending, and the header agrees
+    assert client.rate_limiter.weight.used >= used + 5
+
+
+def test_resyncs_the_clock_once():
+    # The exchange clock is 10s behind ours - every timestamp is in its future
+    server = MockBinanceServer(clock_offset_ms=-10000).start()
+    try:
+        client = BinanceClient(api_key="key", api_secret="secret", testnet=True, base_url=server.url)
+
+        async def go():
+            async_client = AsyncBinanceClient(api_key="key", api_secret="secret", testnet=True, base_url=server.url)
+            async_client.time_sync = client.time_sync
+            try:
+                return await async_client.get_account_info()
+            finally:
+                await async_client.close()
+
+        assert "totalWalletBalance" in asyncio.run(go())
+        assert client.time_sync.synced
+    finally:
+        server.stop()
+
+
+def test_ambiguous_order_is_looked_up_not_resent(server):
+    async def go():
+        client = AsyncBinanceClient(api_key="key", api_secret="secret", testnet=True, base_url=server.url)
+        send = client._send
+
+        async def flaky_send(method, endpoint, *args):
+            # Every order is executed but answered with 503 / -1007, lookups work
+            server.ambiguous_rate = 1.0 if method == "POST" else 0.0
+            return await send(method, endpoint, *args)
+
+        client._send = flaky_send
+        try:
+            return await client.place_order("BTCUSDT", "BUY", "LIMIT", 0.001, 41000)
+        finally:
+            await client.close()
+
+    response = asyncio.run(go())
+
+    orders = own_orders(server)
+    assert len(orders) == 1
+    assert response["clientOrderId"] == orders[0].client_order_id
@@ -0,0 +1,33 @@
+"""place_orders: results come back in input order, failures stay in their slot."""
+from conftest import own_orders
+
+
+def test_results_follow_input_order_across_chunks(client, server):
+    # 12 orders is three batchOrders chunks, sent in parallel
+    orders = [{"symbol": "BTCUSDT", "side": "BUY", "order_type": "LIMIT", "quantity": 0.001,
+               "price": 41000 - i} for i in range(12)]
+
+    results = client.place_orders(orders)
+
+    assert [float(result["price"]) for result in results] == [41000.0 - i for i in range(12)]
+    assert all(result["status"] == "NEW" for result in results)
+    assert len(own_orders(server, "NEW")) == 12
+
+
+def test_partial_failure_keeps_slots(client, server):
+    orders = [
+        {"symbol": "BTCUSDT", "side": "BUY", "order_type": "LIMIT", "quantity": 0.001, "price": 41000},
+        # Below the minimum quantity - rejected locally, never sent
+        {"symbol": "BTCUSDT", "side": "BUY", "order_type": "LIMIT", "quantity": 0.0001, "price": 41000},
+        # Unknown symbol - rejected by the exchange inside the batch
+        {"symbol": "NOPEUSDT", "side": "BUY", "order_type": "LIMIT", "quantity": 1, "price": 1},
+        {"symbol": "ETHUSDT", "side": "SELL", "order_type": "LIMIT", "quantity": 0.01, "price": 2300},
+    ]
+
+    results = client.place_orders(orders, validate=True)
+
+    assert results[0]["status"] == "NEW" and results[0]["symbol"] == "BTCUSDT"
+    assert results[1]["code"] == -1013
+    assert "code" in results[2]
+    assert results[3]["status"] == "NEW" and results[3]["symbol"] == "ETHUSDT"
+    assert len(own_orders(server)) == 2
@@ -0,0 +1,30 @@
+"""BinanceClient.close() stops what a long-running bot starts."""
+import threading
+import time
+
+from binance_client import BinanceClient
+
+PREFIXES = ("time-sync", "connection-", "order-reconcile", "binance-client", "exchange-info")
+
+
+def client_threads():
+    return [thread.name for thread in threading.enumerate() if thread.name.startswith(PREFIXES)]
+
+
+def test_close_leaves_no_threads(server):
+    before = client_threads()
+    for _ in range(3):
+        client = BinanceClient(api_key="key", api_secret="secret", testnet=True, base_url=server.url)
+        client.time_sync.start()
+        client.connections.start()
+        client.orders.start()
+        client.exchange_cache.start_auto_refresh()
+        client.place_orders([{"symbol": "BTCUSDT", "side": "BUY", "order_type": "LIMIT", "quantity": 0.001,
+                              "price": 41000 - i} for i in range(10)])
+        client.close()
+
+    # Idle executor workers exit once they see the shutdown
+    deadline = time.monotonic() + 2
+    while set(client_threads()) - set(before) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert set(client_threads()) <= set(before)
@@ -0,0 +1,54 @@
+"""Order daemon: environment check and socket permissions."""
+import os
+import stat
+
+from conftest import WORK_DIR, own_orders
+from daemon import OrderDaemon
+
+
+def order_request(client, **overrides):
+    request = {"op": "order", "symbol": "BTCUSDT", "side": "BUY", "order_type": "LIMIT", "quantity": "0.001",
+               "price": "41000", "testnet": client.testnet, "base_url": client.base_url}
+    request.update(overrides)
+    return request
+
+
+def test_orders_for_another_environment_are_refused(client, server):
+    daemon = OrderDaemon(client, socket_path=os.path.join(WORK_DIR, "unused.sock"))
+
+    assert not daemon.handle(order_request(client, testnet=False))["ok"]
+    assert not daemon.handle(order_request(client, base_url="https://fapi.binance.com"))["ok"]
+    assert own_orders(server) == []
+    assert daemon.handle(order_request(client))["ok"]
+    assert len(own_orders(server)) == 1
+
+
+def test_unexpected_errors_still_get_a_reply(client, server):
+    daemon = OrderDaemon(client, socket_path=os.path.join(WORK_DIR, "unused.sock"))
+    client.place_order = lambda **kwargs: 1 / 0
+
+    reply = daemon.handle(order_request(client))
+
+    assert not reply["ok"] and "ZeroDivisionError" in reply["error"]
+
+
+def test_socket_is_owner_only(client):
+    daemon = OrderDaemon(client, socket_path=os.path.join(WORK_DIR, "daemon", "test.sock"))
+    daemon.start()
+    try:
+        assert stat.S_IMODE(os.stat(daemon.socket_path).st_mode) == 0o600
+    finally:
+        daemon.stop()
+
+
+def test_stop_closes_the_client(client):
+    daemon = OrderDaemon(client, socket_path=os.path.join(WORK_DIR, "daemon", "stop.sock"))
+    daemon.start()
+    daemon.warm_up()
+    assert client.orders._thread.is_alive()
+
+    daemon.stop()
+
+    assert not client.orders._thread.is_alive()
+    assert not client.time_sync._thread.is_alive()
+    assert not os.path.exists(daemon.socket_path)
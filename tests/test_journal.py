@@ -0,0 +1,45 @@
+"""Trade journal: one record per order request, lookups left out."""
+import pytest
+
+from journal import Journal
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = Journal(str(tmp_path / "journal.bin"))
+    yield journal
+    journal.close()
+
+
+def test_lookups_after_a_fill_are_not_counted(client, journal):
+    client.journal = journal
+    order = client.place_order("BTCUSDT", "BUY", "MARKET", 0.01)
+    client.get_order("BTCUSDT", order_id=order["orderId"])
+    client.get_order("BTCUSDT", orig_client_order_id=order["clientOrderId"])
+
+    fills = journal.fills("BTCUSDT")
+
+    assert len(journal) == 1
+    assert len(fills) == 1
+    assert fills["executed_qty"][0] == pytest.approx(0.01)
+
+
+def test_get_is_skipped_for_every_caller(journal):
+    # The sync and async clients both go through record_request
+    reply = {"orderId": 1, "symbol": "BTCUSDT", "status": "FILLED", "executedQty": "0.01", "avgPrice": "42000"}
+    journal.record_request("GET", "/fapi/v1/order", {"symbol": "BTCUSDT", "orderId": 1}, reply, 100)
+    journal.record_request("POST", "/fapi/v1/order", {"symbol": "BTCUSDT"}, reply, 100)
+
+    assert len(journal) == 1
+    assert journal.query()["method"][0] == b"POST"
+
+
+def test_batch_records_follow_the_orders(client, journal):
+    client.journal = journal
+    client.place_orders([
+        {"symbol": "BTCUSDT", "side": "BUY", "order_type": "LIMIT", "quantity": 0.001, "price": 41000},
+        {"symbol": "ETHUSDT", "side": "SELL", "order_type": "MARKET", "quantity": 0.01},
+    ])
+
+    assert journal.symbols() == ["BTCUSDT", "ETHUSDT"]
+    assert len(journal.fills()) == 1 and journal.fills()["symbol"][0] == b"ETHUSDT"
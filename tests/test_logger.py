@@ -0,0 +1,29 @@
+"""Logger setup: leaves the logging module alone, rotates by file age."""
+import logging
+import os
+import time
+
+from logger import RotatingLogHandler, logger
+
+
+def test_logging_globals_untouched():
+    assert logging._srcfile is not None
+    assert logging.logProcesses
+    assert logger.findCaller()[0] == "(unknown file)"
+    assert logging.getLogger("someone-else").findCaller()[0] != "(unknown file)"
+
+
+def test_first_rollover_counts_from_the_last_write(tmp_path):
+    path = tmp_path / "bot.log"
+    path.write_text("old line\n")
+    two_days_ago = time.time() - 2 * 86400
+    os.utime(path, (two_days_ago, two_days_ago))
+
+    handler = RotatingLogHandler(path, max_bytes=0, rotate_hours=24, backups=1)
+    try:
+        record = logging.LogRecord("x", logging.INFO, "", 0, "new line", None, None)
+        assert handler.shouldRollover(record)
+        handler.doRollover()
+        assert handler.rollover_at > time.time() + 23 * 3600
+    finally:
+        handler.close()
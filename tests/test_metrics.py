@@ -0,0 +1,37 @@
+"""Latency histograms: counts survive their threads, shards don't pile up."""
+import gc
+import threading
+
+from metrics import Histogram, summarize
+
+
+def test_finished_threads_fold_into_the_base():
+    histogram = Histogram()
+    threads = [threading.Thread(target=histogram.record, args=(1000 * (i + 1),)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    del threads
+    gc.collect()
+
+    assert histogram.shard_count == 0
+    summary = summarize(histogram.snapshot())
+    assert summary["count"] == 20
+    assert summary["max_us"] == 20.0
+
+
+def test_batches_reuse_the_client_pool(client):
+    orders = [{"symbol": "BTCUSDT", "side": "BUY", "order_type": "LIMIT", "quantity": 0.001,
+               "price": 40000 - i} for i in range(6)]
+    # The metrics are process-wide, so count from here
+    histogram = client.metrics.histogram("total", "/fapi/v1/batchOrders")
+    before = summarize(histogram.snapshot())["count"]
+    shards_before = histogram.shard_count
+    for _ in range(20):
+        client.place_orders(orders)
+    gc.collect()
+
+    assert summarize(histogram.snapshot())["count"] - before == 40
+    # At most the calling thread and a pool thread - not one per call
+    assert histogram.shard_count - shards_before <= 2
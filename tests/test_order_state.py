@@ -0,0 +1,32 @@
+"""Order tracker: reconcile doesn't lose orders that are still being resent."""
+import time
+
+PARAMS = {"symbol": "BTCUSDT", "side": "BUY", "type": "LIMIT", "quantity": "0.001", "price": "41000",
+          "timeInForce": "GTC", "newClientOrderId": "slow-order"}
+
+
+def test_resend_keeps_order_out_of_reconcile(client):
+    tracker = client.orders
+    tracker.reconcile_interval = 0.05
+    record = tracker.submitted(PARAMS)
+    time.sleep(0.1)
+    assert record in tracker.missing()
+
+    # _place_with_retry resends under the same client ID
+    tracker.submitted(PARAMS)
+    assert record not in tracker.missing()
+
+
+def test_late_resend_reopens_presumed_rejection(client, server):
+    tracker = client.orders
+    tracker.reconcile_interval = 0.05
+    record = tracker.submitted(PARAMS)
+    time.sleep(0.1)
+    tracker.reconcile()
+    assert record.status == "REJECTED"
+
+    # ... then a resend lands after all
+    client._request("POST", "/fapi/v1/order", params=dict(PARAMS), signed=True, retry=False)
+
+    assert record.status == "NEW"
+    assert [r.client_order_id for r in tracker.open_orders("BTCUSDT")] == ["slow-order"]
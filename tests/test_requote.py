@@ -0,0 +1,50 @@
+"""plan_requote and BinanceClient.requote."""
+from types import SimpleNamespace
+
+from requote import Quote, plan_requote
+
+
+def resting(order_id, side, price, qty, executed=0.0, symbol="BTCUSDT", order_type="LIMIT", status="NEW"):
+    return SimpleNamespace(order_id=order_id, symbol=symbol, side=side, type=order_type, status=status,
+                           price=price, remaining=qty - executed, executed_qty=executed)
+
+
+def test_plan_keeps_amends_cancels_and_creates():
+    orders = [
+        resting(1, "BUY", 100.0, 1.0),      # matches exactly
+        resting(2, "BUY", 99.0, 1.0),       # right price, wrong size
+        resting(3, "BUY", 90.0, 1.0),       # moved to the remaining quote
+        resting(4, "BUY", 80.0, 1.0),       # nothing left for it
+        resting(5, "SELL", 110.0, 1.0, order_type="STOP_MARKET"),  # never touched
+    ]
+    quotes = [Quote("BUY", 100, 1), Quote("BUY", 99, 2), Quote("BUY", 98, 1), Quote("SELL", 101, 1)]
+
+    plan = plan_requote("BTCUSDT", quotes, orders)
+
+    assert [order.order_id for order in plan.keep] == [1]
+    assert [(a["order_id"], a["price"], a["quantity"]) for a in plan.amend] == [(2, 99, "2"), (3, 98, "1")]
+    assert [order.order_id for order in plan.cancel] == [4]
+    assert [(c["side"], c["price"]) for c in plan.create] == [("SELL", 101)]
+    assert plan.actions == 4
+
+
+def test_amend_quantity_includes_filled_part():
+    plan = plan_requote("BTCUSDT", [Quote("BUY", 100, 1)], [resting(1, "BUY", 100.0, 2.0, executed=0.5)])
+
+    # Binance wants the order's new total, so 0.5 filled + 1 wanted
+    assert plan.amend[0]["quantity"] == "1.5"
+
+
+def test_requote_twice_sends_nothing_the_second_time(client):
+    client.place_order("BTCUSDT", "BUY", "LIMIT", 0.002, 41000)
+    client.place_order("BTCUSDT", "BUY", "LIMIT", 0.002, 40000)
+    quotes = [Quote("BUY", "41000", "0.001"), Quote("BUY", "40900", "0.001"), Quote("SELL", "43000", "0.001")]
+
+    first = client.requote("BTCUSDT", quotes, validate=True)
+    second = client.requote("BTCUSDT", quotes, validate=True)
+
+    assert first["plan"].actions == 3
+    assert all("code" not in result for result in first["amended"] + first["created"])
+    assert second["plan"].actions == 0
+    open_orders = sorted((o.side, o.price, o.remaining) for o in client.orders.open_orders("BTCUSDT"))
+    assert open_orders == [("BUY", 40900.0, 0.001), ("BUY", 41000.0, 0.001), ("SELL", 43000.0, 0.001)]
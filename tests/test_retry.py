@@ -0,0 +1,35 @@
+"""Retries reuse one client order ID and never place an order twice."""
+from decimal import Decimal
+
+from conftest import own_orders
+from retry import make_client_order_id
+
+
+def test_identical_orders_get_different_ids():
+    params = {"symbol": "BTCUSDT", "side": "BUY", "type": "LIMIT", "quantity": "0.001", "price": "41000"}
+
+    assert make_client_order_id(params) != make_client_order_id(params)
+
+
+def test_ambiguous_failure_is_not_resent(client, server):
+    send = client._request
+
+    def request(method, endpoint, *args, **kwargs):
+        # Every order is executed but answered with 503 / -1007, lookups work
+        server.ambiguous_rate = 1.0 if method == "POST" else 0.0
+        return send(method, endpoint, *args, **kwargs)
+
+    client._request = request
+    response = client.place_order("BTCUSDT", "BUY", "LIMIT", 0.001, 41000)
+
+    orders = own_orders(server)
+    assert len(orders) == 1
+    assert response["clientOrderId"] == orders[0].client_order_id
+    assert orders[0].orig_qty == Decimal("0.001")
+
+
+def test_repeated_order_is_placed_again(client, server):
+    client.place_order("BTCUSDT", "BUY", "LIMIT", 0.001, 41000)
+    client.place_order("BTCUSDT", "BUY", "LIMIT", 0.001, 41000)
+
+    assert len(own_orders(server, "NEW")) == 2
@@ -0,0 +1,53 @@
+"""Pre-trade risk checks, on their own and on the order path."""
+import pytest
+
+from conftest import own_orders
+from order_state import RecordState
+from risk import RiskEngine, RiskError, RiskLimits
+
+
+def test_order_notional_rejects_or_clips():
+    risk = RiskEngine(RiskLimits(max_order_notional=1000))
+
+    assert risk.check("BTCUSDT", "BUY", 0.02, 40000) == 0.02
+    with pytest.raises(RiskError):
+        risk.check("BTCUSDT", "BUY", 0.03, 40000)
+    assert risk.check("BTCUSDT", "BUY", 0.03, 40000, clip=True) == pytest.approx(0.025)
+
+
+def test_open_orders_use_up_position_headroom():
+    risk = RiskEngine(RiskLimits(max_position_notional=1000))
+    record = type("Record", (), {"symbol": "BTCUSDT"})()
+    # An order for 0.02 @ 40000 is in flight
+    risk.on_order_change(record, None, RecordState(True, "BUY", 40000.0, 0.02, 0.0, 0.0))
+
+    with pytest.raises(RiskError):
+        risk.check("BTCUSDT", "BUY", 0.01, 40000)
+    # Selling is still fine, and so is anything reduce-only
+    assert risk.check("BTCUSDT", "SELL", 0.01, 40000) == 0.01
+    assert risk.check("BTCUSDT", "BUY", 0.01, 40000, reduce_only=True) == 0.01
+
+
+def test_order_rate():
+    risk = RiskEngine(RiskLimits(max_orders_per_second=2))
+
+    risk.check("BTCUSDT", "BUY", 0.001, 40000)
+    risk.check("BTCUSDT", "BUY", 0.001, 40000)
+    with pytest.raises(RiskError):
+        risk.check("BTCUSDT", "BUY", 0.001, 40000)
+
+
+def test_rejected_orders_are_never_sent(client, server):
+    client.risk = RiskEngine(RiskLimits(max_order_notional=1000))
+    client.orders.add_listener(client.risk.on_order_change)
+
+    with pytest.raises(RiskError):
+        client.place_order("BTCUSDT", "BUY", "LIMIT", 0.1, 41000)
+    results = client.place_orders([
+        {"symbol": "BTCUSDT", "side": "BUY", "order_type": "LIMIT", "quantity": 0.001, "price": 41000},
+        {"symbol": "BTCUSDT", "side": "BUY", "order_type": "LIMIT", "quantity": 0.1, "price": 41000},
+    ])
+
+    assert results[0]["status"] == "NEW"
+    assert results[1]["code"] == -2010
+    assert len(own_orders(server)) == 1
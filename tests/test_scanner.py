@@ -0,0 +1,15 @@
+"""Market scanner: screens over the mock's symbols, and no threads left after close()."""
+import threading
+
+from scanner import MarketScanner
+
+
+def test_scan_and_close(client):
+    scanner = MarketScanner(client, interval=0.05)
+    rows = scanner.scan(rank_by="last_price", limit=None)
+    scanner.start()
+
+    prices = [row["last_price"] for row in rows]
+    assert len(rows) == len(scanner.columns.symbol) and prices == sorted(prices, reverse=True)
+    scanner.close()
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("market-scanner")]
@@ -0,0 +1,75 @@
+"""TWAP slices: what gets carried to the next slice and what doesn't."""
+import asyncio
+from decimal import Decimal
+
+from conftest import own_orders
+from advanced.twap import TwapExecutor
+
+
+def run(executor, quantity, slices, interval=0.0):
+    async def go():
+        order = executor.submit("BTCUSDT", "BUY", Decimal(quantity), slices, interval)
+        await executor.wait()
+        return order
+    try:
+        return asyncio.run(go())
+    finally:
+        executor.close()
+
+
+def test_rejected_slice_is_carried(client, server):
+    place_order = client.place_order
+
+    def reject_first(symbol, side, order_type, quantity, **kwargs):
+        if kwargs["newClientOrderId"].endswith("-0"):
+            # Off the step size - the exchange answers 400 / -1111
+            quantity += Decimal("0.0001")
+        return place_order(symbol, side, order_type, quantity, **kwargs)
+
+    client.place_order = reject_first
+    # Far enough apart that slice 0 is back before slice 1 goes out
+    order = run(TwapExecutor(client, max_workers=1), "0.003", 3, interval=0.3)
+
+    assert len(order.errors) == 1
+    assert order.filled_qty == Decimal("0.003")
+    assert order.status == "DONE"
+    assert sorted(o.executed_qty for o in own_orders(server)) == [Decimal("0.001"), Decimal("0.002")]
+
+
+def test_ambiguous_slice_is_looked_up_not_resent(client, server):
+    client.retry_policy.max_attempts = 1
+    place_order = client.place_order
+
+    def time_out_first(symbol, side, order_type, quantity, **kwargs):
+        if not kwargs["newClientOrderId"].endswith("-0"):
+            return place_order(symbol, side, order_type, quantity, **kwargs)
+        # Executed, but answered with 503 / -1007
+        server.ambiguous_rate = 1.0
+        try:
+            return place_order(symbol, side, order_type, quantity, **kwargs)
+        finally:
+            server.ambiguous_rate = 0.0
+
+    client.place_order = time_out_first
+    order = run(TwapExecutor(client, max_workers=1), "0.003", 3)
+
+    assert order.errors == []
+    assert order.filled_qty == Decimal("0.003")
+    assert len(own_orders(server, "FILLED")) == 3
+
+
+def test_cancel_before_start(client, server):
+    executor = TwapExecutor(client)
+
+    async def go():
+        order = executor.submit("BTCUSDT", "BUY", Decimal("0.003"), 3, 0)
+        executor.cancel(order.parent_id)
+        await executor.wait()
+        return order
+    try:
+        order = asyncio.run(go())
+    finally:
+        executor.close()
+
+    assert order.status == "CANCELED"
+    assert own_orders(server) == []
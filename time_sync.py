@@ -0,0 +1,118 @@
+"""
+Server clock synchronization.
+Signed requests carry a timestamp that Binance checks against its own clock,
+so a drifting local clock gets orders rejected with -1021. This keeps an
+estimate of the offset to the server clock and applies it to every timestamp.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+# Handle both direct execution and module execution
+try:
+    from .logger import logger
+except ImportError:
+    from logger import logger
+
+
+class TimeSync:
+    """
+    NTP-style estimate of the offset between our clock and Binance's.
+
+    Each sample asks /fapi/v1/time for the server time and assumes it was
+    read halfway through the round trip. The sample with the smallest round
+    trip is the least noisy, so that one is kept.
+
+    The estimate is anchored to time.monotonic(), so adjustments of the
+    local wall clock after a sync don't throw it off.
+    """
+
+    def __init__(self, fetch_server_time: Callable[[], int], samples: int = 5, interval: float = 300.0):
+        """
+        Args:
+            fetch_server_time: Returns the server time in ms (one API call)
+            samples: Round trips per sync - the fastest one wins
+            interval: Seconds between background syncs
+        """
+        self.fetch_server_time = fetch_server_time
+        self.samples = samples
+        self.interval = interval
+
+        self.offset_ms = 0.0
+        self.rtt_ms: Optional[float] = None
+        self.last_sync: Optional[float] = None
+
+        # Server time in ms at the monotonic instant _anchor_monotonic
+        self._anchor_server_ms: Optional[float] = None
+        self._anchor_monotonic = 0.0
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def synced(self) -> bool:
+        return self._anchor_server_ms is not None
+
+    def now_ms(self) -> int:
+        """Current server time estimate in milliseconds."""
+        if self._anchor_server_ms is None:
+            return int(time.time() * 1000)
+        return int(self._anchor_server_ms + (time.monotonic() - self._anchor_monotonic) * 1000)
+
+    def sync(self) -> float:
+        """
+        Take a fresh set of samples and update the offset.
+
+        Returns:
+            The new offset in ms (server minus local)
+        """
+        best = None
+        for _ in range(max(self.samples, 1)):
+            sent_wall, sent_mono = time.time(), time.monotonic()
+            server_ms = self.fetch_server_time()
+            received_mono = time.monotonic()
+
+            rtt = received_mono - sent_mono
+            if best is None or rtt < best[0]:
+                best = (rtt, server_ms, sent_wall, sent_mono)
+
+        rtt, server_ms, sent_wall, sent_mono = best
+        midpoint_mono = sent_mono + rtt / 2
+        with self._lock:
+            self._anchor_server_ms = float(server_ms)
+            self._anchor_monotonic = midpoint_mono
+            self.offset_ms = server_ms - (sent_wall + rtt / 2) * 1000
+            self.rtt_ms = rtt * 1000
+            self.last_sync = time.time()
+
+        logger.info("Clock synced - offset %+.1fms, rtt %.1fms", self.offset_ms, self.rtt_ms)
+        return self.offset_ms
+
+    def start(self) -> None:
+        """Sync now and keep re-syncing every interval seconds in the background."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="time-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sync thread."""
+        self._stop_event.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the background thread to exit after stop()."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.sync()
+                wait = self.interval
+            except Exception as e:
+                logger.warning("Clock sync failed: %s", e)
+                wait = min(self.interval, 30)
+            if self._stop_event.wait(wait):
+                return
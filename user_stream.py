@@ -0,0 +1,301 @@
+"""
+User data stream - account, position and order updates pushed over a websocket.
+Keeps a local mirror of balances, positions and open orders so bots can read
+them without polling the weight-heavy account/positionRisk endpoints.
+"""
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+# Handle both direct execution and module execution
+try:
+    from .config import config
+    from .logger import logger
+except ImportError:
+    from config import config
+    from logger import logger
+
+
+# Order statuses that mean the order is no longer on the book
+CLOSED_ORDER_STATUSES = {"FILLED", "CANCELED", "EXPIRED", "REJECTED", "EXPIRED_IN_MATCH"}
+
+
+def order_from_event(o: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn the "o" payload of ORDER_TRADE_UPDATE into the REST order shape."""
+    return {
+        "orderId": o.get("i"),
+        "clientOrderId": o.get("c"),
+        "symbol": o.get("s"),
+        "side": o.get("S"),
+        "type": o.get("o"),
+        "timeInForce": o.get("f"),
+        "origQty": o.get("q"),
+        "price": o.get("p"),
+        "avgPrice": o.get("ap"),
+        "stopPrice": o.get("sp"),
+        "status": o.get("X"),
+        "executedQty": o.get("z"),
+        "reduceOnly": o.get("R"),
+        "positionSide": o.get("ps"),
+        "updateTime": o.get("T"),
+        # Fill details only the stream has
+        "executionType": o.get("x"),
+        "lastFilledQty": o.get("l"),
+        "lastFilledPrice": o.get("L"),
+        "commission": o.get("n"),
+        "commissionAsset": o.get("N"),
+        "realizedProfit": o.get("rp"),
+    }
+
+
+class AccountMirror:
+    """
+    In-memory copy of balances, positions and open orders.
+
+    Loaded from a REST snapshot, then kept current by applying user data
+    stream events. Positions and orders use the same dict shapes as
+    positionRisk and openOrders, so code can switch between the two freely.
+    All reads are local and thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.balances: Dict[str, Dict[str, Any]] = {}
+        self.positions: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.open_orders: Dict[int, Dict[str, Any]] = {}
+        self.last_event_time = 0
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Call callback(event) for every stream event, after the mirror applied it.
+        After every REST snapshot it gets {"e": "SNAPSHOT"} instead.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def load_snapshot(self, account: Dict[str, Any], positions: List[Dict[str, Any]],
+                      open_orders: List[Dict[str, Any]]) -> None:
+        """Replace everything with fresh REST data (account, positionRisk, openOrders)."""
+        balances = {asset["asset"]: dict(asset) for asset in account.get("assets", [])}
+        position_map = {(p["symbol"], p.get("positionSide", "BOTH")): dict(p) for p in positions}
+        order_map = {order["orderId"]: dict(order) for order in open_orders}
+        with self._lock:
+            self.balances = balances
+            self.positions = position_map
+            self.open_orders = order_map
+
+        # Listeners that track orders need to know events may have been missed
+        self._notify({"e": "SNAPSHOT", "E": int(time.time() * 1000)})
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """Apply one user data stream event."""
+        event_type = event.get("e")
+        with self._lock:
+            self.last_event_time = max(self.last_event_time, event.get("E", 0))
+            if event_type == "ACCOUNT_UPDATE":
+                self._apply_account_update(event.get("a", {}))
+            elif event_type == "ORDER_TRADE_UPDATE":
+                self._apply_order_update(event.get("o", {}))
+
+        self._notify(event)
+
+    def _notify(self, event: Dict[str, Any]) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error("User stream listener failed: %s", e)
+
+    def _apply_account_update(self, data: Dict[str, Any]) -> None:
+        for balance in data.get("B", []):
+            entry = self.balances.setdefault(balance["a"], {"asset": balance["a"]})
+            entry["walletBalance"] = balance.get("wb", entry.get("walletBalance"))
+            entry["crossWalletBalance"] = balance.get("cw", entry.get("crossWalletBalance"))
+
+        for position in data.get("P", []):
+            key = (position["s"], position.get("ps", "BOTH"))
+            entry = self.positions.setdefault(key, {"symbol": position["s"], "positionSide": key[1]})
+            entry["positionAmt"] = position.get("pa", entry.get("positionAmt"))
+            entry["entryPrice"] = position.get("ep", entry.get("entryPrice"))
+            entry["unRealizedProfit"] = position.get("up", entry.get("unRealizedProfit"))
+            entry["marginType"] = position.get("mt", entry.get("marginType"))
+            entry["isolatedWallet"] = position.get("iw", entry.get("isolatedWallet"))
+
+    def _apply_order_update(self, data: Dict[str, Any]) -> None:
+        order = order_from_event(data)
+        order_id = order["orderId"]
+        existing = self.open_orders.get(order_id)
+        # Events can arrive out of order - never go back in time
+        if existing is not None and (existing.get("updateTime") or 0) > (order["updateTime"] or 0):
+            return
+        if order["status"] in CLOSED_ORDER_STATUSES:
+            self.open_orders.pop(order_id, None)
+        else:
+            self.open_orders[order_id] = order
+
+    def get_balance(self, asset: str = "USDT") -> Optional[Dict[str, Any]]:
+        with self._lock:
+            balance = self.balances.get(asset)
+            return dict(balance) if balance is not None else None
+
+    def get_positions(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(p) for (name, _), p in self.positions.items() if symbol is None or name == symbol]
+
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(o) for o in self.open_orders.values() if symbol is None or o["symbol"] == symbol]
+
+
+class UserDataStream:
+    """
+    Keeps an AccountMirror in sync with the exchange.
+
+    Creates the listenKey, keeps it alive, consumes ORDER_TRADE_UPDATE and
+    ACCOUNT_UPDATE events, and reloads the REST snapshot every time the
+    socket (re)connects, so nothing missed while disconnected is lost.
+
+    run() is a coroutine for asyncio programs; start()/stop() run it on a
+    background thread for everything else.
+    """
+
+    # Binance expires listen keys after 60 minutes without a keepalive
+    KEEPALIVE_INTERVAL = 30 * 60
+
+    def __init__(self, client, mirror: Optional[AccountMirror] = None, ws_url: Optional[str] = None,
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0):
+        """
+        Args:
+            client: BinanceClient used for the listenKey and REST snapshots
+            mirror: Mirror to keep updated (a new one is created by default)
+            ws_url: Websocket base URL (defaults to testnet/production from config)
+        """
+        self.client = client
+        self.mirror = mirror or AccountMirror()
+        self.ws_url = (ws_url or config.ws_url_for(client.testnet)).rstrip("/")
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        # Set while the mirror is known to match the exchange
+        self.synced = threading.Event()
+        self.listen_key: Optional[str] = None
+
+        self._stopping = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def _call(self, func, *args):
+        """Run a blocking client call without stalling the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def resync(self) -> None:
+        """Reload balances, positions and open orders from REST."""
+        account, positions, open_orders = await asyncio.gather(
+            self._call(self.client.get_account_info),
+            self._call(self.client.get_position_info),
+            self._call(self.client.get_open_orders),
+        )
+        self.mirror.load_snapshot(account, positions, open_orders)
+        self.synced.set()
+        logger.info("Account mirror synced - %d open orders", len(open_orders))
+
+    async def _keepalive(self) -> None:
+        while True:
+            await asyncio.sleep(self.KEEPALIVE_INTERVAL)
+            try:
+                await self._call(self.client.keepalive_listen_key)
+            except Exception as e:
+                logger.warning("listenKey keepalive failed: %s", e)
+
+    async def run(self) -> None:
+        """Consume the stream until stop() is called, reconnecting as needed."""
+        delay = self.reconnect_delay
+        while not self._stopping:
+            try:
+                self.listen_key = await self._call(self.client.create_listen_key)
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(f"{self.ws_url}/ws/{self.listen_key}", heartbeat=60) as ws:
+                        # Snapshot after the socket is up so no event falls in the gap
+                        await self.resync()
+                        delay = self.reconnect_delay
+                        keepalive = asyncio.ensure_future(self._keepalive())
+                        try:
+                            await self._consume(ws)
+                        finally:
+                            keepalive.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("User data stream error: %s", e)
+
+            # Whatever happened, the mirror can't be trusted until the next resync
+            self.synced.clear()
+            if self._stopping:
+                break
+            logger.info("Reconnecting user data stream in %.0fs", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _consume(self, ws) -> None:
+        async for message in ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                if message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    return
+                continue
+            event = json.loads(message.data)
+            if event.get("e") == "listenKeyExpired":
+                logger.warning("listenKey expired - reconnecting")
+                return
+            self.mirror.apply_event(event)
+
+    def start(self, wait: float = 10.0) -> bool:
+        """
+        Run the stream on a background thread.
+
+        Args:
+            wait: Seconds to wait for the first snapshot (0 to return right away)
+
+        Returns:
+            True if the mirror is synced when this returns
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return self.synced.is_set()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run_thread, name="user-data-stream", daemon=True)
+        self._thread.start()
+        return self.synced.wait(wait) if wait else self.synced.is_set()
+
+    def _run_thread(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._task = self._loop.create_task(self.run())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    def stop(self) -> None:
+        """Stop the background thread and close the listenKey."""
+        self._stopping = True
+        if self._loop is not None and self._task is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.synced.clear()
+        if self.listen_key is not None:
+            try:
+                self.client.close_listen_key()
+            except Exception as e:
+                logger.warning("Could not close listenKey: %s", e)
+            self.listen_key = None
@@ -1,8 +1,13 @@
 """
-Input validation for CLI arguments.
-Quick sanity checks before hitting the API.
+Input validation for CLI arguments and orders.
+Quick sanity checks before hitting the API, plus exchange-filter checks
+so orders Binance would reject never leave the machine.
+
+Numbers are kept as Decimal all the way through - floats turn 0.1 + 0.2
+into 0.30000000000000004, which Binance rejects for too much precision.
 """
-from typing import Tuple
+from decimal import ROUND_DOWN, ROUND_UP, Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 def validate_symbol(symbol: str) -> str:
@@ -34,11 +39,50 @@ def validate_side(side: str) -> str:
     return side
 
 
-def validate_quantity(quantity: str) -> float:
+def to_decimal(value: Any) -> Decimal:
+    """
+    Convert a CLI string, int, float or Decimal to Decimal.
+    Floats go through str() so 0.1 becomes Decimal("0.1"), not its binary expansion.
+    """
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        value = repr(value)
+    try:
+        result = Decimal(str(value).strip())
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError(f"Not a number: {value!r}")
+    if not result.is_finite():
+        raise ValueError(f"Not a finite number: {value!r}")
+    return result
+
+
+def format_decimal(value: Decimal) -> str:
+    """Format a Decimal the way Binance expects - no exponent, no trailing zeros."""
+    text = format(value.normalize(), "f")
+    return text if text != "-0" else "0"
+
+
+def round_to_step(value: Decimal, step: Decimal, rounding: str = ROUND_DOWN) -> Decimal:
+    """
+    Snap a value onto a tick/step grid.
+    
+    Args:
+        value: Price or quantity
+        step: tickSize or stepSize (0 means no grid)
+        rounding: decimal rounding mode, ROUND_DOWN by default
+    """
+    if step <= 0:
+        return value
+    steps = (value / step).to_integral_value(rounding=rounding)
+    return (steps * step).quantize(step)
+
+
+def validate_quantity(quantity: str) -> Decimal:
     """Check if quantity is a positive number."""
     try:
-        qty = float(quantity)
-    except (ValueError, TypeError):
+        qty = to_decimal(quantity)
+    except ValueError:
         raise ValueError("Quantity must be a number")
     
     if qty <= 0:
@@ -47,11 +91,11 @@ def validate_quantity(quantity: str) -> float:
     return qty
 
 
-def validate_price(price: str) -> float:
+def validate_price(price: str) -> Decimal:
     """Check if price is a positive number."""
     try:
-        prc = float(price)
-    except (ValueError, TypeError):
+        prc = to_decimal(price)
+    except ValueError:
         raise ValueError("Price must be a number")
     
     if prc <= 0:
@@ -60,7 +104,118 @@ def validate_price(price: str) -> float:
     return prc
 
 
-def parse_market_order_args(args: list) -> Tuple[str, str, float]:
+def apply_symbol_filters(filters, side: str, order_type: str, quantity: Any,
+                         price: Optional[Any] = None,
+                         reference_price: Optional[Any] = None) -> Tuple[Decimal, Optional[Decimal]]:
+    """
+    Snap an order onto the symbol's grid and check it against the exchange filters.
+    
+    Quantity is always rounded down to the step size so we never send more
+    than asked. Price is rounded to the tick in the direction that keeps it
+    no worse for us (down for BUY, up for SELL).
+    
+    Args:
+        filters: SymbolFilters for the symbol (see exchange_info.py)
+        side: BUY or SELL
+        order_type: MARKET, LIMIT, ...
+        quantity: Requested quantity
+        price: Limit price, if the order has one
+        reference_price: Price used for the min notional check when the order
+                         has no price of its own (e.g. last or mark price)
+        
+    Returns:
+        Tuple of (quantity, price) as Decimals ready to send
+        
+    Raises:
+        ValueError: If the order would be rejected by an exchange filter
+    """
+    symbol = filters.symbol
+    qty = to_decimal(quantity)
+    
+    if order_type == "MARKET":
+        step, min_qty, max_qty = filters.market_step_size, filters.market_min_qty, filters.market_max_qty
+    else:
+        step, min_qty, max_qty = filters.step_size, filters.min_qty, filters.max_qty
+    
+    requested_qty = qty
+    qty = round_to_step(qty, step, ROUND_DOWN)
+    if qty <= 0 or qty < min_qty:
+        raise ValueError(f"Quantity {format_decimal(requested_qty)} is below the minimum {format_decimal(min_qty)} for {symbol}")
+    if max_qty > 0 and qty > max_qty:
+        raise ValueError(f"Quantity {format_decimal(qty)} is above the maximum {format_decimal(max_qty)} for {symbol}")
+    
+    prc = None
+    if price is not None:
+        prc = round_to_step(to_decimal(price), filters.tick_size, ROUND_DOWN if side == "BUY" else ROUND_UP)
+        if prc <= 0 or prc < filters.min_price:
+            raise ValueError(f"Price {format_decimal(prc)} is below the minimum {format_decimal(filters.min_price)} for {symbol}")
+        if filters.max_price > 0 and prc > filters.max_price:
+            raise ValueError(f"Price {format_decimal(prc)} is above the maximum {format_decimal(filters.max_price)} for {symbol}")
+    
+    # Notional can only be checked when we know roughly what price it fills at
+    notional_price = prc if prc is not None else (to_decimal(reference_price) if reference_price is not None else None)
+    if notional_price is not None and filters.min_notional > 0:
+        notional = qty * notional_price
+        if notional < filters.min_notional:
+            raise ValueError(
+                f"Order value {format_decimal(notional)} is below the minimum notional "
+                f"{format_decimal(filters.min_notional)} for {symbol}"
+            )
+    
+    return qty, prc
+
+
+def validate_orders(orders: List[Dict[str, Any]],
+                    get_filters: Callable[[str], Any]) -> Tuple[List[Optional[Dict[str, Any]]], Dict[int, str]]:
+    """
+    Run apply_symbol_filters over a whole list of place_order-style dicts.
+    
+    Args:
+        orders: Dicts with symbol, side, order_type, quantity and optional price
+        get_filters: Lookup from symbol to SymbolFilters (e.g. client.get_symbol_filters)
+        
+    Returns:
+        Tuple of (checked, errors) - checked has one entry per input order
+        with quantity/price snapped (None for rejected orders), errors maps
+        the index of each rejected order to the reason
+    """
+    checked: List[Optional[Dict[str, Any]]] = []
+    errors: Dict[int, str] = {}
+    # Lists of orders usually repeat a handful of symbols
+    filters_by_symbol: Dict[str, Any] = {}
+    
+    for index, order in enumerate(orders):
+        try:
+            symbol = order["symbol"]
+            if symbol not in filters_by_symbol:
+                filters_by_symbol[symbol] = get_filters(symbol)
+            qty, prc = apply_symbol_filters(
+                filters_by_symbol[symbol],
+                order["side"],
+                order["order_type"],
+                order["quantity"],
+                order.get("price"),
+                order.get("reference_price"),
+            )
+        except KeyError as e:
+            checked.append(None)
+            errors[index] = f"Missing order field: {e}"
+            continue
+        except ValueError as e:
+            checked.append(None)
+            errors[index] = str(e)
+            continue
+        
+        adjusted = {key: value for key, value in order.items() if key != "reference_price"}
+        adjusted["quantity"] = qty
+        if prc is not None:
+            adjusted["price"] = prc
+        checked.append(adjusted)
+    
+    return checked, errors
+
+
+def parse_market_order_args(args: list) -> Tuple[str, str, Decimal]:
     """Parse CLI args for market orders."""
     if len(args) != 3:
         raise ValueError("Usage: python -m src.market_orders <SYMBOL> <SIDE> <QUANTITY>")
@@ -72,7 +227,7 @@ def parse_market_order_args(args: list) -> Tuple[str, str, float]:
     return symbol, side, quantity
 
 
-def parse_limit_order_args(args: list) -> Tuple[str, str, float, float]:
+def parse_limit_order_args(args: list) -> Tuple[str, str, Decimal, Decimal]:
     """Parse CLI args for limit orders."""
     if len(args) != 4:
         raise ValueError("Usage: python -m src.limit_orders <SYMBOL> <SIDE> <QUANTITY> <PRICE>")
@@ -83,3 +238,45 @@ def parse_limit_order_args(args: list) -> Tuple[str, str, float, float]:
     price = validate_price(args[3])
     
     return symbol, side, quantity, price
+
+
+def parse_twap_args(args: list) -> Tuple[str, str, Decimal, int, float]:
+    """Parse CLI args for TWAP orders."""
+    if len(args) != 5:
+        raise ValueError("Usage: python -m src.advanced.twap <SYMBOL> <SIDE> <QUANTITY> <SLICES> <INTERVAL_SECONDS>")
+    
+    symbol = validate_symbol(args[0])
+    side = validate_side(args[1])
+    quantity = validate_quantity(args[2])
+    
+    try:
+        slices = int(args[3])
+        interval = float(args[4])
+    except ValueError:
+        raise ValueError(f"Slices must be a whole number and interval a number of seconds, got {args[3]} and {args[4]}")
+    if slices < 1:
+        raise ValueError(f"Slices must be at least 1, got {slices}")
+    if interval < 0:
+        raise ValueError(f"Interval can't be negative, got {interval}")
+    
+    return symbol, side, quantity, slices, interval
+
+
+def parse_oco_args(args: list) -> Tuple[str, str, Decimal, Decimal, Decimal]:
+    """Parse CLI args for OCO orders."""
+    if len(args) != 5:
+        raise ValueError("Usage: python -m src.advanced.oco <SYMBOL> <SIDE> <QUANTITY> <TAKE_PROFIT> <STOP_LOSS>")
+    
+    symbol = validate_symbol(args[0])
+    side = validate_side(args[1])
+    quantity = validate_quantity(args[2])
+    take_profit = validate_price(args[3])
+    stop_loss = validate_price(args[4])
+    
+    # Side is the position being protected - a long exits above and below its entry
+    if side == "BUY" and take_profit <= stop_loss:
+        raise ValueError(f"For BUY, take-profit ({args[3]}) must be above stop-loss ({args[4]})")
+    if side == "SELL" and take_profit >= stop_loss:
+        raise ValueError(f"For SELL, take-profit ({args[3]}) must be below stop-loss ({args[4]})")
+    
+    return symbol, side, quantity, take_profit, stop_loss